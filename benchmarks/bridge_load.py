@@ -0,0 +1,394 @@
+#!/usr/bin/env python3
+"""
+Load generator for the bridge server.
+
+Opens N simulated browser clients against the bridge port. Each client
+sends timer_state and splits_updated messages at a fixed rate and measures
+how long acknowledgments take. Broadcast fan-out latency is measured from
+the timestamp in state updates sent by the server.
+
+By default a bridge server is started in a child process that broadcasts a
+state update at --broadcast-rate, so CPU and memory use can be sampled.
+Use --port (and --pid for resource use) to load a running SplitNotes instead.
+
+	python benchmarks/bridge_load.py
+	python benchmarks/bridge_load.py --clients 1,10,100 --duration 5 --output bridge.json
+	python benchmarks/bridge_load.py --port 16835 --pid 12345 --clients 10
+"""
+import argparse
+import collections
+import heapq
+import json
+import os
+import selectors
+import socket
+import subprocess
+import sys
+import time
+
+import common
+
+try:
+	import resource
+except ImportError:
+	resource = None  # Windows
+
+# Runs a standalone bridge server that broadcasts state like the GUI does on splits
+SERVER_SCRIPT = """
+import sys, time
+sys.path.insert(0, sys.argv[1])
+try:
+	import resource
+	soft, hard = resource.getrlimit(resource.RLIMIT_NOFILE)
+	resource.setrlimit(resource.RLIMIT_NOFILE, (hard, hard))
+except (ImportError, ValueError, OSError):
+	pass
+
+import bridge_server
+
+server = bridge_server.BridgeServer(int(sys.argv[2]))
+if not server.start():
+	sys.exit(1)
+
+interval = 1 / float(sys.argv[3])
+split = 0
+while True:
+	time.sleep(interval)
+	split = (split + 1) % 10
+	server.send_state_to_browsers({
+		"type": "state_update",
+		"currentSplit": split,
+		"timerRunning": True,
+		"totalSplits": 10,
+		"timestamp": time.time()
+	})
+"""
+
+SPLITS = [{"name": f"Split {i + 1}"} for i in range(10)]
+
+
+class LoadClient:
+	"""A simulated browser client"""
+
+	def __init__(self, index, client_socket):
+		self.index = index
+		self.socket = client_socket
+		self.inbuf = b""
+		self.outbuf = bytearray()
+		self.sent_times = collections.deque()
+		self.split = 0
+		self.closed = False
+
+
+class ProcessMonitor:
+	"""Samples CPU time and resident memory of a process"""
+
+	def __init__(self, pid):
+		self.pid = pid
+		self.psutil_process = None
+
+		if pid and not os.path.exists(f"/proc/{pid}/stat"):
+			try:
+				import psutil
+				self.psutil_process = psutil.Process(pid)
+			except Exception:
+				self.pid = None
+
+	def cpu_time(self):
+		"""Returns the CPU seconds used by the process so far, or None"""
+		if not self.pid:
+			return None
+		try:
+			if self.psutil_process:
+				times = self.psutil_process.cpu_times()
+				return times.user + times.system
+			with open(f"/proc/{self.pid}/stat", "r") as stat_file:
+				# Fields after the command name, which may contain spaces
+				fields = stat_file.read().rsplit(")", 1)[1].split()
+			return (int(fields[11]) + int(fields[12])) / os.sysconf("SC_CLK_TCK")
+		except Exception:
+			return None
+
+	def rss(self):
+		"""Returns the resident memory of the process in bytes, or None"""
+		if not self.pid:
+			return None
+		try:
+			if self.psutil_process:
+				return self.psutil_process.memory_info().rss
+			with open(f"/proc/{self.pid}/status", "r") as status_file:
+				for line in status_file:
+					if line.startswith("VmRSS:"):
+						return int(line.split()[1]) * 1024
+		except Exception:
+			pass
+		return None
+
+
+def raise_file_limit():
+	"""Raises the open file limit so a thousand clients fit"""
+	if resource is None:
+		return
+	try:
+		soft, hard = resource.getrlimit(resource.RLIMIT_NOFILE)
+		resource.setrlimit(resource.RLIMIT_NOFILE, (hard, hard))
+	except (ValueError, OSError):
+		pass
+
+
+def free_port():
+	"""Returns a port nobody is listening on right now"""
+	with socket.socket(socket.AF_INET, socket.SOCK_STREAM) as probe:
+		probe.bind(("localhost", 0))
+		return probe.getsockname()[1]
+
+
+def start_server(port, broadcast_rate):
+	"""Starts the bridge server child process and waits until it accepts connections"""
+	process = subprocess.Popen([sys.executable, "-c", SERVER_SCRIPT, common.REPO_DIR, str(port), str(broadcast_rate)],
+							   stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+
+	deadline = time.monotonic() + 10
+	while time.monotonic() < deadline:
+		if process.poll() is not None:
+			raise RuntimeError("Bridge server process exited")
+		try:
+			socket.create_connection(("localhost", port), timeout=0.5).close()
+			return process
+		except OSError:
+			time.sleep(0.05)
+
+	process.kill()
+	raise RuntimeError("Bridge server did not start")
+
+
+def connect_clients(count, port, selector):
+	"""Opens count clients, returns them and the time it took"""
+	clients = []
+	start = time.perf_counter()
+
+	for index in range(count):
+		client_socket = socket.create_connection(("localhost", port), timeout=10)
+		client_socket.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+		client_socket.setblocking(False)
+		client = LoadClient(index, client_socket)
+		selector.register(client_socket, selectors.EVENT_READ, client)
+		clients.append(client)
+
+	return clients, time.perf_counter() - start
+
+
+def queue_message(client, message, selector):
+	"""Queues a JSON message on a client"""
+	if not client.outbuf and not client.closed:
+		selector.modify(client.socket, selectors.EVENT_READ | selectors.EVENT_WRITE, client)
+	client.outbuf += (json.dumps(message) + "\n").encode("utf-8")
+	client.sent_times.append(time.perf_counter())
+
+
+def handle_readable(client, stats, selector):
+	"""Reads acknowledgments and broadcasts from a client"""
+	try:
+		data = client.socket.recv(65536)
+	except (BlockingIOError, InterruptedError):
+		return
+	except OSError:
+		data = b""
+
+	if not data:
+		close_client(client, selector)
+		stats["disconnects"] += 1
+		return
+
+	now = time.perf_counter()
+	client.inbuf += data
+	*lines, client.inbuf = client.inbuf.split(b"\n")
+
+	for line in lines:
+		try:
+			message = json.loads(line)
+		except ValueError:
+			continue
+
+		if message.get("type") == "state_update":
+			# Broadcasts sent while clients were still connecting are not counted
+			if message["timestamp"] >= stats["start"]:
+				stats["fanout"].append((time.time() - message["timestamp"]) * 1000)
+		elif message.get("status") == "ok":
+			for _ in range(message.get("count", 1)):
+				if client.sent_times:
+					stats["ack"].append((now - client.sent_times.popleft()) * 1000)
+
+
+def handle_writable(client, selector):
+	"""Sends queued messages of a client"""
+	try:
+		sent = client.socket.send(client.outbuf)
+		del client.outbuf[:sent]
+	except (BlockingIOError, InterruptedError):
+		return
+	except OSError:
+		close_client(client, selector)
+		return
+
+	if not client.outbuf:
+		selector.modify(client.socket, selectors.EVENT_READ, client)
+
+
+def close_client(client, selector):
+	"""Closes a client connection"""
+	if client.closed:
+		return
+	client.closed = True
+	try:
+		selector.unregister(client.socket)
+	except Exception:
+		pass
+	client.socket.close()
+
+
+def run_level(count, args, port, monitor):
+	"""Runs the load with count clients, returns the measured statistics"""
+	selector = selectors.DefaultSelector()
+	clients, connect_time = connect_clients(count, port, selector)
+	stats = {"ack": [], "fanout": [], "sent": 0, "disconnects": 0, "start": time.time()}
+
+	# Schedule of (due time, client index, message kind), client start times are spread out
+	schedule = []
+	now = time.perf_counter()
+	for client in clients:
+		offset = client.index / max(1, count)
+		if args.state_rate > 0:
+			heapq.heappush(schedule, (now + offset / args.state_rate, client.index, "state"))
+		if args.splits_rate > 0:
+			heapq.heappush(schedule, (now + offset / args.splits_rate, client.index, "splits"))
+
+	cpu_start = monitor.cpu_time()
+	wall_start = time.perf_counter()
+	peak_rss = monitor.rss()
+	next_sample = wall_start + 1.0
+	end = wall_start + args.duration
+
+	while time.perf_counter() < end:
+		now = time.perf_counter()
+		while schedule and schedule[0][0] <= now:
+			due, index, kind = heapq.heappop(schedule)
+			client = clients[index]
+			if client.closed:
+				continue
+
+			if kind == "state":
+				client.split = (client.split + 1) % len(SPLITS)
+				queue_message(client, {
+					"type": "timer_state",
+					"running": True,
+					"currentSplit": client.split,
+					"splitName": SPLITS[client.split]["name"],
+					"ack": args.ack
+				}, selector)
+				heapq.heappush(schedule, (due + 1 / args.state_rate, index, kind))
+			else:
+				queue_message(client, {"type": "splits_updated", "splits": SPLITS, "ack": args.ack}, selector)
+				heapq.heappush(schedule, (due + 1 / args.splits_rate, index, kind))
+			stats["sent"] += 1
+
+		timeout = max(0.0, min(schedule[0][0] if schedule else end, end) - time.perf_counter())
+		for key, mask in selector.select(timeout):
+			if mask & selectors.EVENT_READ:
+				handle_readable(key.data, stats, selector)
+			if mask & selectors.EVENT_WRITE and not key.data.closed:
+				handle_writable(key.data, selector)
+
+		if time.perf_counter() >= next_sample:
+			next_sample += 1.0
+			rss = monitor.rss()
+			if rss is not None and (peak_rss is None or rss > peak_rss):
+				peak_rss = rss
+
+	wall_time = time.perf_counter() - wall_start
+	cpu_end = monitor.cpu_time()
+
+	for client in clients:
+		close_client(client, selector)
+	selector.close()
+
+	return {
+		"clients": count,
+		"connect_time": connect_time * 1000,
+		"sent": stats["sent"],
+		"acks": len(stats["ack"]),
+		"broadcasts": len(stats["fanout"]),
+		"disconnects": stats["disconnects"],
+		"ack_p50": common.percentile(stats["ack"], 50),
+		"ack_p99": common.percentile(stats["ack"], 99),
+		"fanout_p50": common.percentile(stats["fanout"], 50),
+		"fanout_p99": common.percentile(stats["fanout"], 99),
+		"cpu": None if cpu_start is None or cpu_end is None else (cpu_end - cpu_start) / wall_time * 100,
+		"rss": None if peak_rss is None else peak_rss / (1 << 20)
+	}
+
+
+def format_optional(value, spec):
+	"""Formats a value that may be missing"""
+	return "-" if value is None else format(value, spec)
+
+
+def main():
+	parser = argparse.ArgumentParser(description="Load test the SplitNotes bridge server")
+	parser.add_argument("--clients", default="1,10,100,1000", help="comma separated client counts (default %(default)s)")
+	parser.add_argument("--duration", type=float, default=10.0, help="seconds per client count (default 10)")
+	parser.add_argument("--state-rate", type=float, default=10.0, help="timer_state messages per client per second")
+	parser.add_argument("--splits-rate", type=float, default=0.2, help="splits_updated messages per client per second")
+	parser.add_argument("--broadcast-rate", type=float, default=10.0, help="state broadcasts per second of the started server")
+	parser.add_argument("--ack", choices=["each", "batched", "none"], default="batched", help="acknowledgment mode to request")
+	parser.add_argument("--port", type=int, help="load a running bridge server on this port instead of starting one")
+	parser.add_argument("--pid", type=int, help="process id of the running SplitNotes to sample with --port")
+	parser.add_argument("--output", help="write results as JSON to this file, - for stdout")
+	args = parser.parse_args()
+
+	counts = [int(count) for count in args.clients.split(",") if count.strip()]
+	raise_file_limit()
+
+	process = None
+	if args.port:
+		port = args.port
+		monitor = ProcessMonitor(args.pid)
+	else:
+		port = free_port()
+		process = start_server(port, args.broadcast_rate)
+		monitor = ProcessMonitor(process.pid)
+
+	report = sys.stderr if args.output == "-" else sys.stdout
+	print(f"{'clients':>8} {'connect':>8} {'sent':>8} {'acks':>8} {'ack p50':>9} {'ack p99':>9} "
+		  f"{'fan p50':>9} {'fan p99':>9} {'cpu %':>7} {'rss MB':>7}", file=report)
+
+	results = {}
+	try:
+		for count in counts:
+			level = run_level(count, args, port, monitor)
+			print(f"{count:>8} {level['connect_time']:>8.0f} {level['sent']:>8} {level['acks']:>8} {level['ack_p50']:>9.2f} {level['ack_p99']:>9.2f} "
+				  f"{level['fanout_p50']:>9.2f} {level['fanout_p99']:>9.2f} "
+				  f"{format_optional(level['cpu'], '>7.1f')} {format_optional(level['rss'], '>7.1f')}", file=report)
+
+			for name in ("ack_p50", "ack_p99", "fanout_p50", "fanout_p99", "connect_time"):
+				results[f"bridge.c{count}.{name}"] = {"value": level[name], "unit": "ms"}
+			if level["cpu"] is not None:
+				results[f"bridge.c{count}.cpu"] = {"value": level["cpu"], "unit": "%"}
+			if level["rss"] is not None:
+				results[f"bridge.c{count}.rss"] = {"value": level["rss"], "unit": "MB"}
+
+			# Let the server notice the disconnects before the next level
+			time.sleep(1.0)
+	finally:
+		if process:
+			process.terminate()
+			process.wait()
+
+	if args.output:
+		common.write_results(results, args.output)
+
+	return 0
+
+
+if __name__ == "__main__":
+	sys.exit(main())
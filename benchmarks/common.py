@@ -0,0 +1,126 @@
+"""
+Shared helpers for the benchmark scripts.
+Results are written as JSON and compared against stored baselines.
+
+Result files look like:
+	{
+		"meta": {"python": "3.11.4", "platform": "linux", "timestamp": 1700000000.0},
+		"results": {"importtime.config": {"value": 1.9, "unit": "ms"}, ...}
+	}
+
+Baseline files map the same names to a value and an optional
+tolerance, a result is a regression if it exceeds value * (1 + tolerance).
+Results with "gate": false depend too much on the machine to compare,
+they are only reported and never stored as baselines.
+"""
+import json
+import os
+import platform
+import sys
+import time
+
+BENCHMARK_DIR = os.path.dirname(os.path.abspath(__file__))
+REPO_DIR = os.path.dirname(BENCHMARK_DIR)
+BASELINE_PATH = os.path.join(BENCHMARK_DIR, "baselines.json")
+
+# Allowed slowdown before a result counts as a regression
+DEFAULT_TOLERANCE = 0.25
+
+# Make the application modules importable from the benchmark scripts
+if REPO_DIR not in sys.path:
+	sys.path.insert(0, REPO_DIR)
+
+
+def percentile(values, percent):
+	"""Returns the given percentile of values using linear interpolation"""
+	if not values:
+		return 0.0
+
+	ordered = sorted(values)
+	position = (len(ordered) - 1) * percent / 100
+	low = int(position)
+	high = min(low + 1, len(ordered) - 1)
+	return ordered[low] + (ordered[high] - ordered[low]) * (position - low)
+
+
+def median(values):
+	"""Returns the median of values"""
+	return percentile(values, 50)
+
+
+def metadata():
+	"""Returns information about the machine the benchmarks ran on"""
+	return {
+		"python": platform.python_version(),
+		"implementation": platform.python_implementation(),
+		"platform": sys.platform,
+		"machine": platform.machine(),
+		"timestamp": time.time()
+	}
+
+
+def write_results(results, path):
+	"""Writes results with metadata as JSON, '-' writes to stdout"""
+	document = json.dumps({"meta": metadata(), "results": results}, indent="\t", sort_keys=True)
+
+	if path == "-":
+		print(document)
+	else:
+		with open(path, "w", encoding="utf-8") as results_file:
+			results_file.write(document + "\n")
+
+
+def load_baselines(path=BASELINE_PATH):
+	"""Returns the stored baselines, or an empty dictionary if there are none"""
+	try:
+		with open(path, "r", encoding="utf-8") as baseline_file:
+			return json.load(baseline_file)
+	except (OSError, ValueError):
+		return {}
+
+
+def save_baselines(results, path=BASELINE_PATH, baselines=None):
+	"""Stores given results as new baselines, keeping existing tolerances"""
+	baselines = dict(baselines or {})
+
+	for name, result in results.items():
+		if not result.get("gate", True):
+			baselines.pop(name, None)
+			continue
+		entry = {"value": result["value"], "unit": result["unit"]}
+		if "tolerance" in baselines.get(name, {}):
+			entry["tolerance"] = baselines[name]["tolerance"]
+		baselines[name] = entry
+
+	with open(path, "w", encoding="utf-8") as baseline_file:
+		baseline_file.write(json.dumps(baselines, indent="\t", sort_keys=True) + "\n")
+
+
+def compare(results, baselines, default_tolerance=DEFAULT_TOLERANCE):
+	"""
+	Compares results against baselines.
+	Returns a list of (name, value, baseline value, limit) for every regression.
+	Results without a baseline or with "gate": false are not compared.
+	"""
+	regressions = []
+
+	for name, result in sorted(results.items()):
+		baseline = baselines.get(name)
+		if not baseline or not result.get("gate", True):
+			continue
+
+		limit = baseline["value"] * (1 + baseline.get("tolerance", default_tolerance))
+		if result["value"] > limit:
+			regressions.append((name, result["value"], baseline["value"], limit))
+
+	return regressions
+
+
+def print_results(results, baselines, file=None):
+	"""Prints results next to their baselines"""
+	for name, result in sorted(results.items()):
+		line = f"{name:<40} {result['value']:>12.3f} {result['unit']}"
+		if name in baselines:
+			change = (result["value"] / baselines[name]["value"] - 1) * 100 if baselines[name]["value"] else 0.0
+			line += f"  (baseline {baselines[name]['value']:.3f}, {change:+.1f}%)"
+		print(line, file=file or sys.stdout)
@@ -0,0 +1,241 @@
+#!/usr/bin/env python3
+"""
+Replays LiveSplit sessions recorded with "run_splitnoes.py --record FILE".
+
+	python benchmarks/ls_replay.py session.rec --info
+	python benchmarks/ls_replay.py session.rec --serve [--speed 2]
+	python benchmarks/ls_replay.py session.rec --fast --notes notes.txt [--gui] [--settings config.cfg]
+
+--serve answers on the LiveSplit port at real speed (or scaled by --speed),
+including the recorded response latencies, so an unmodified SplitNotes can
+connect to it.
+
+--fast feeds the recorded responses into the same poll, timer arbitration
+and render path the update loop uses, as fast as possible, and reports poll and render times.
+Rendering covers the overlay snapshot and HTML, with --gui also the
+Tk window (needs a display).
+"""
+import argparse
+import sys
+import time
+
+import common
+import config
+import ls_connection as con
+import ls_poller
+import ls_recorder
+import ls_simulator
+import timer_arbiter
+
+# Protocol command text to command name, e.g. "getsplitindex" -> "cur_split_index"
+COMMAND_NAMES = {text.strip(): name for name, text in config.LS_COMMANDS.items()}
+
+
+class ReplayClock:
+	"""Answers simulator commands from a recorded session"""
+
+	def __init__(self, records, speed=1.0):
+		self.records = records
+		self.speed = speed
+		self.player = ls_recorder.SessionPlayer(records, True, speed)
+
+	def respond(self, command):
+		"""Returns the recorded response, or None for commands SplitNotes never sent"""
+		name = COMMAND_NAMES.get(command)
+		if name is None:
+			return None
+
+		response = self.player.respond(name)
+		if response is False:
+			return None  # LiveSplit did not answer either
+		return response.rstrip("\r\n")
+
+
+def print_info(sessions):
+	"""Prints a summary of all sessions in a recording"""
+	for number, (start, records) in enumerate(sessions):
+		commands = {}
+		missed = 0
+		for record in records:
+			commands[record[2]] = commands.get(record[2], 0) + 1
+			if record[3] is False:
+				missed += 1
+
+		latencies = [record[1] * 1000 for record in records if record[3] is not False]
+		duration = records[-1][0] if records else 0.0
+		print(f"session {number}: started {time.ctime(start)}, {duration:.1f} s, {len(records)} exchanges, "
+			  f"{missed} unanswered")
+		print(f"  commands {commands}")
+		if latencies:
+			print(f"  latency p50 {common.percentile(latencies, 50):.2f} ms, "
+				  f"p99 {common.percentile(latencies, 99):.2f} ms, max {max(latencies):.2f} ms")
+
+
+def serve(records, args):
+	"""Serves the session on the LiveSplit port until interrupted"""
+	while True:
+		clock = ReplayClock(records, args.speed)
+		simulator = ls_simulator.LiveSplitSimulator(None, args.port, clock=clock)
+		port = simulator.start()
+		print(f"Replaying {clock.player.duration:.1f} s session on {simulator.host}:{port} at {args.speed}x")
+
+		try:
+			while not clock.player.finished:
+				time.sleep(0.1)
+		except KeyboardInterrupt:
+			simulator.stop()
+			return 0
+
+		simulator.stop()
+		print("Session finished")
+		if not args.loop:
+			return 0
+
+
+def gui_renderer(notes, typed):
+	"""Returns a render function drawing into a Tk window like the GUI does"""
+	import tkinter
+	import main_window
+
+	root = tkinter.Tk()
+	root.geometry(f"{typed.width}x{typed.height}")
+	main_window.runtime_info["typed_settings"] = typed
+	text1, text2 = main_window.create_note_slots(root, typed)
+	main_window.runtime_info["notes"] = notes
+	main_window.runtime_info["ls_connected"] = True
+
+	def render(runtime_info):
+		main_window.runtime_info["active_split"] = runtime_info["active_split"]
+		main_window.runtime_info["timer_running"] = runtime_info["timer_running"]
+		main_window.update_GUI(root, None, text1, text2)
+		root.update_idletasks()
+
+	return render
+
+
+def overlay_renderer(typed):
+	"""Returns a render function publishing to overlays like the update loop does"""
+	import overlay_server
+
+	def render(runtime_info):
+		overlay_server.render_notes(ls_poller.overlay_snapshot(runtime_info, typed))
+
+	return render
+
+
+def load_settings(path):
+	"""
+	Returns the typed settings to render with, None if they can't be read.
+	A given settings file is only read, without it the application's settings are used.
+	"""
+	import setting_handler
+
+	if path is None:
+		return setting_handler.load_typed_settings()
+	settings, _ = setting_handler.read_settings_from(path)
+	return setting_handler.typed_settings(settings) if settings else None
+
+
+def replay_fast(records, args, typed):
+	"""Drives polling and rendering with the recorded responses, returns the results"""
+	import note_reader
+
+	notes = note_reader.get_notes(args.notes, "new_line") if args.notes else []
+	runtime_info = {"active_split": -1, "timer_running": False, "notes": notes or []}
+	# The update loop polls LiveSplit as a source of the timer arbiter
+	arbiter = timer_arbiter.TimerArbiter(runtime_info)
+	render = gui_renderer(runtime_info["notes"], typed) if args.gui else overlay_renderer(typed)
+
+	polls = sum(1 for record in records if record[2] == "cur_split_index")
+	con.player = ls_recorder.SessionPlayer(records, realtime=False)
+	poll_times = []
+	render_times = []
+	lost = 0
+
+	start = time.perf_counter()
+	for _ in range(polls):
+		poll_start = time.perf_counter()
+		changed = ls_poller.poll_timer_source(arbiter, config.LS_SOURCE, None)
+		poll_times.append((time.perf_counter() - poll_start) * 1000)
+
+		if changed is None:
+			lost += 1
+		elif changed:
+			render_start = time.perf_counter()
+			render(runtime_info)
+			render_times.append((time.perf_counter() - render_start) * 1000)
+	total = time.perf_counter() - start
+	con.player = None
+
+	duration = records[-1][0] if records else 0.0
+	print(f"Replayed {polls} polls ({duration:.1f} s recorded) in {total * 1000:.1f} ms, "
+		  f"{len(render_times)} renders, {lost} unanswered polls")
+	print(f"  poll p50 {common.percentile(poll_times, 50):.4f} ms, p99 {common.percentile(poll_times, 99):.4f} ms")
+	print(f"  render p50 {common.percentile(render_times, 50):.4f} ms, p99 {common.percentile(render_times, 99):.4f} ms")
+
+	return {
+		"replay.total": {"value": total * 1000, "unit": "ms"},
+		"replay.poll_p50": {"value": common.percentile(poll_times, 50), "unit": "ms"},
+		"replay.poll_p99": {"value": common.percentile(poll_times, 99), "unit": "ms"},
+		"replay.render_p50": {"value": common.percentile(render_times, 50), "unit": "ms"},
+		"replay.render_p99": {"value": common.percentile(render_times, 99), "unit": "ms"}
+	}
+
+
+def main():
+	parser = argparse.ArgumentParser(description="Replay a recorded LiveSplit session")
+	parser.add_argument("recording", help="file written by run_splitnoes.py --record")
+	parser.add_argument("--session", type=int, default=-1, help="session in the file to replay (default: last)")
+	mode = parser.add_mutually_exclusive_group(required=True)
+	mode.add_argument("--info", action="store_true", help="summarize the recorded sessions")
+	mode.add_argument("--serve", action="store_true", help="answer on the LiveSplit port at recorded speed")
+	mode.add_argument("--fast", action="store_true", help="replay through polling and rendering as fast as possible")
+	parser.add_argument("--port", type=int, default=config.PORT, help="port for --serve (default %(default)s)")
+	parser.add_argument("--speed", type=float, default=1.0, help="playback speed for --serve")
+	parser.add_argument("--loop", action="store_true", help="start over when the session ends with --serve")
+	parser.add_argument("--notes", help="notes file to render with --fast")
+	parser.add_argument("--gui", action="store_true", help="also render into a Tk window with --fast")
+	parser.add_argument("--settings", help="settings file to render with --fast (default: the application's)")
+	parser.add_argument("--output", help="write --fast results as JSON to this file, - for stdout")
+	args = parser.parse_args()
+
+	try:
+		sessions = ls_recorder.read_sessions(args.recording)
+	except (OSError, ls_recorder.RecordingError) as e:
+		print(f"Error: {e}", file=sys.stderr)
+		return 1
+
+	if args.info:
+		print_info(sessions)
+		return 0
+
+	if not sessions:
+		print("Error: the recording has no sessions", file=sys.stderr)
+		return 1
+
+	try:
+		_, records = sessions[args.session]
+	except IndexError:
+		print(f"Error: there are only {len(sessions)} sessions", file=sys.stderr)
+		return 1
+
+	if not records:
+		print("Error: the session is empty", file=sys.stderr)
+		return 1
+
+	if args.serve:
+		return serve(records, args)
+
+	typed = load_settings(args.settings)
+	if typed is None:
+		print(f"Error: could not read the settings file {args.settings}", file=sys.stderr)
+		return 1
+
+	results = replay_fast(records, args, typed)
+	if args.output:
+		common.write_results(results, args.output)
+	return 0
+
+
+if __name__ == "__main__":
+	sys.exit(main())
@@ -0,0 +1,306 @@
+#!/usr/bin/env python3
+"""
+LiveSplit Server simulator for testing without LiveSplit.
+
+Speaks the parts of the LiveSplit Server protocol SplitNotes uses
+(getsplitindex, getcurrentsplitname, getcurrenttime, getbestpossibletime) and plays
+scripted runs in a loop. Latency, fragmented responses and
+disconnects can be injected to test polling and reconnect behavior.
+
+	python benchmarks/ls_simulator.py --splits 5 --split-time 3
+	python benchmarks/ls_simulator.py --script run.json --latency 0.05 --fragment 2
+
+A script file is JSON like:
+	{
+		"start_delay": 2.0,
+		"reset_delay": 3.0,
+		"splits": [{"name": "Forest", "time": 12.5}, {"name": "Castle", "time": 30.0}]
+	}
+Before the run starts the split index is -1, after the last split it is the
+number of splits until the run is reset, like in LiveSplit.
+"""
+import argparse
+import json
+import random
+import socket
+import sys
+import threading
+import time
+
+import common  # adds the application modules to the path
+import config
+
+
+def format_time(seconds):
+	"""Formats seconds like LiveSplit does, e.g. 1:02:03.45 or 3.45"""
+	hours, rest = divmod(seconds, 3600)
+	minutes, seconds = divmod(rest, 60)
+
+	if hours:
+		return f"{int(hours)}:{int(minutes):02d}:{seconds:05.2f}"
+	if minutes:
+		return f"{int(minutes)}:{seconds:05.2f}"
+	return f"{seconds:.2f}"
+
+
+def generated_script(splits, split_time, jitter=0.0, start_delay=1.0, reset_delay=2.0):
+	"""Returns a script with given number of splits"""
+	return {
+		"start_delay": start_delay,
+		"reset_delay": reset_delay,
+		"splits": [
+			{"name": f"Split {i + 1}", "time": max(0.01, split_time + random.uniform(-jitter, jitter))}
+			for i in range(splits)
+		]
+	}
+
+
+def load_script(path):
+	"""Reads a script file"""
+	with open(path, "r", encoding="utf-8") as script_file:
+		script = json.load(script_file)
+
+	if not script.get("splits"):
+		raise ValueError("Script has no splits")
+	return script
+
+
+class RunClock:
+	"""Timer state of a scripted run that repeats forever"""
+
+	def __init__(self, script, start=None):
+		self.splits = script["splits"]
+		self.start_delay = script.get("start_delay", 1.0)
+		self.reset_delay = script.get("reset_delay", 2.0)
+		self.run_time = sum(split["time"] for split in self.splits)
+		self.cycle = self.start_delay + self.run_time + self.reset_delay
+		self.start = time.monotonic() if start is None else start
+
+	def state(self, now=None):
+		"""Returns the split index and the time into the run"""
+		elapsed = ((time.monotonic() if now is None else now) - self.start) % self.cycle
+		run_time = elapsed - self.start_delay
+
+		if run_time < 0:
+			return -1, 0.0
+
+		for index, split in enumerate(self.splits):
+			if run_time < split["time"]:
+				return index, elapsed - self.start_delay
+			run_time -= split["time"]
+
+		return len(self.splits), self.run_time
+
+	def respond(self, command):
+		"""Returns the response to a command, or None if LiveSplit would not answer"""
+		index, run_time = self.state()
+
+		if command == "getsplitindex":
+			return str(index)
+		if command == "getcurrentsplitname":
+			return self.splits[index]["name"] if 0 <= index < len(self.splits) else ""
+		if command == "getcurrenttime":
+			return format_time(run_time)
+		if command == "getbestpossibletime":
+			return format_time(self.run_time) if index >= 0 else "-"
+		return None
+
+
+class LiveSplitSimulator:
+	"""
+	Threaded LiveSplit Server simulator.
+
+	latency       seconds to wait before every response
+	jitter        random extra latency up to this many seconds
+	fragment      send responses in chunks of this many bytes, 0 sends them whole
+	disconnect    drop all clients every this many seconds, 0 never drops
+	down_time     refuse connections for this long after dropping clients
+	clock         answers commands instead of a RunClock, script is ignored then
+	"""
+
+	def __init__(self, script, port=0, latency=0.0, jitter=0.0, fragment=0,
+				 disconnect=0.0, down_time=0.0, host="localhost", clock=None):
+		# Anything with a respond(command) method can answer instead of a scripted run
+		self.clock = clock or RunClock(script)
+		self.host = host
+		self.port = port
+		self.latency = latency
+		self.jitter = jitter
+		self.fragment = fragment
+		self.disconnect = disconnect
+		self.down_time = down_time
+		self.running = False
+		self.server_socket = None
+		self.clients = []
+		self.clients_lock = threading.Lock()
+		self.commands = {}
+		self.connections = 0
+		self.disconnects = 0
+
+	def start(self):
+		"""Starts listening, returns the port in use"""
+		self._listen()
+		self.running = True
+		threading.Thread(target=self._accept_loop, daemon=True).start()
+		if self.disconnect:
+			threading.Thread(target=self._disconnect_loop, daemon=True).start()
+		return self.port
+
+	def stop(self):
+		"""Stops the server and closes all clients"""
+		self.running = False
+		self._close_listener()
+		self.drop_clients()
+
+	def drop_clients(self):
+		"""Closes all client connections, like LiveSplit being closed"""
+		with self.clients_lock:
+			clients, self.clients = self.clients, []
+
+		for client in clients:
+			try:
+				client.shutdown(socket.SHUT_RDWR)
+			except OSError:
+				pass
+			client.close()
+
+		if clients:
+			self.disconnects += 1
+
+	def _listen(self):
+		"""Opens the listening socket"""
+		self.server_socket = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+		self.server_socket.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+		self.server_socket.bind((self.host, self.port))
+		self.server_socket.listen(8)
+		self.server_socket.settimeout(0.2)
+		self.port = self.server_socket.getsockname()[1]
+
+	def _close_listener(self):
+		"""Closes the listening socket"""
+		if self.server_socket:
+			self.server_socket.close()
+			self.server_socket = None
+
+	def _accept_loop(self):
+		"""Accepts clients and starts a thread for each"""
+		while self.running:
+			server_socket = self.server_socket
+			if server_socket is None:
+				time.sleep(0.05)
+				continue
+
+			try:
+				client, _ = server_socket.accept()
+			except (socket.timeout, OSError):
+				continue
+
+			client.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+			with self.clients_lock:
+				self.clients.append(client)
+			self.connections += 1
+			threading.Thread(target=self._client_loop, args=(client,), daemon=True).start()
+
+	def _disconnect_loop(self):
+		"""Periodically drops all clients and refuses new ones for a while"""
+		while self.running:
+			time.sleep(self.disconnect)
+			if not self.running:
+				return
+
+			self.drop_clients()
+			if self.down_time:
+				self._close_listener()
+				time.sleep(self.down_time)
+				if self.running:
+					self._listen()
+
+	def _client_loop(self, client):
+		"""Answers commands from one client"""
+		buffer = b""
+
+		try:
+			while self.running:
+				data = client.recv(1024)
+				if not data:
+					break
+
+				buffer += data
+				while b"\n" in buffer:
+					line, buffer = buffer.split(b"\n", 1)
+					command = line.strip().decode("utf-8", "replace").split(" ", 1)[0]
+					self.commands[command] = self.commands.get(command, 0) + 1
+
+					response = self.clock.respond(command)
+					if response is not None:
+						self._send(client, (response + "\r\n").encode("utf-8"))
+		except OSError:
+			pass
+		finally:
+			with self.clients_lock:
+				if client in self.clients:
+					self.clients.remove(client)
+			client.close()
+
+	def _send(self, client, data):
+		"""Sends a response with the configured latency and fragmentation"""
+		delay = self.latency + (random.uniform(0, self.jitter) if self.jitter else 0.0)
+		if delay:
+			time.sleep(delay)
+
+		if not self.fragment:
+			client.sendall(data)
+			return
+
+		for offset in range(0, len(data), self.fragment):
+			client.sendall(data[offset:offset + self.fragment])
+			# Give the chunks a chance to arrive as separate segments
+			time.sleep(0.001)
+
+
+def main():
+	parser = argparse.ArgumentParser(description="Simulate a LiveSplit Server")
+	parser.add_argument("--port", type=int, default=config.PORT,
+						help="port to listen on, 0 picks a free port")
+	parser.add_argument("--script", help="JSON run script, see the module docstring")
+	parser.add_argument("--splits", type=int, default=10, help="splits of a generated run (default 10)")
+	parser.add_argument("--split-time", type=float, default=5.0, help="seconds per generated split (default 5)")
+	parser.add_argument("--split-jitter", type=float, default=0.0, help="random variation of generated split times")
+	parser.add_argument("--start-delay", type=float, default=1.0, help="seconds before each run starts")
+	parser.add_argument("--reset-delay", type=float, default=2.0, help="seconds after a run before it resets")
+	parser.add_argument("--latency", type=float, default=0.0, help="seconds to delay every response")
+	parser.add_argument("--jitter", type=float, default=0.0, help="random extra response delay in seconds")
+	parser.add_argument("--fragment", type=int, default=0, help="send responses in chunks of this many bytes")
+	parser.add_argument("--disconnect", type=float, default=0.0, help="drop all clients every this many seconds")
+	parser.add_argument("--down-time", type=float, default=0.0, help="refuse connections this long after dropping clients")
+	args = parser.parse_args()
+
+	if args.script:
+		script = load_script(args.script)
+	else:
+		script = generated_script(args.splits, args.split_time, args.split_jitter, args.start_delay, args.reset_delay)
+
+	simulator = LiveSplitSimulator(script, args.port, args.latency, args.jitter, args.fragment,
+								   args.disconnect, args.down_time)
+	port = simulator.start()
+	print(f"LiveSplit simulator listening on {simulator.host}:{port} "
+		  f"({len(script['splits'])} splits, {simulator.clock.run_time:.1f} s per run)")
+
+	try:
+		last_index = None
+		while True:
+			time.sleep(0.1)
+			index, _ = simulator.clock.state()
+			if index != last_index:
+				last_index = index
+				print(f"split index {index}, {simulator.connections} connections, commands {simulator.commands}")
+	except KeyboardInterrupt:
+		pass
+	finally:
+		simulator.stop()
+
+	return 0
+
+
+if __name__ == "__main__":
+	sys.exit(main())
@@ -0,0 +1,408 @@
+#!/usr/bin/env python3
+"""
+Startup, import time and notes loading benchmarks.
+
+	python benchmarks/run_benchmarks.py                    run everything
+	python benchmarks/run_benchmarks.py --only importtime  run one group
+	python benchmarks/run_benchmarks.py --update-baseline  store results as baselines
+
+Groups:
+	importtime  python -X importtime of each application module, relative to the
+	            interpreter's own startup imports in the same run
+	startup     cold start to the first idle mainloop, under Xvfb if there is no display,
+	            and of headless mode until it serves overlays
+	notes       loading synthetic notes files from 1 KB to 500 MB
+	polling     LiveSplit poll round trips and reconnects against ls_simulator
+
+Results are written as JSON and compared against benchmarks/baselines.json,
+the exit status is 1 if anything regressed.
+"""
+import argparse
+import contextlib
+import json
+import os
+import queue
+import shutil
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+
+import common
+
+IMPORT_MODULES = ["main_window", "config", "note_reader", "setting_handler", "ls_connection", "headless"]
+
+NOTES_SIZES = {
+	"1KB": 1 << 10,
+	"1MB": 1 << 20,
+	"10MB": 10 << 20,
+	"100MB": 100 << 20,
+	"500MB": 500 << 20
+}
+
+# Started in a fresh interpreter, reports once the main loop is idle
+STARTUP_SCRIPT = """
+import json, sys, time, tkinter
+
+def mainloop(self, n=0):
+	def idle():
+		import main_window
+		print("BENCH " + json.dumps({"idle": time.time(), "timings": main_window.runtime_info["startup_timings"]}), flush=True)
+		self.destroy()
+	self.after_idle(idle)
+	tkinter.Misc.mainloop(self, n)
+
+tkinter.Tk.mainloop = mainloop
+sys.argv = ["main_window.py"]
+import main_window
+main_window.main()
+"""
+
+# Started in a fresh interpreter with the settings file, notes file and HTTP port
+# as arguments, reports and stops once headless mode published the notes
+HEADLESS_STARTUP_SCRIPT = """
+import json, os, signal, sys, time
+import setting_handler
+setting_handler.settings_path = sys.argv[1]
+setting_handler.backup_path = sys.argv[1] + ".bak"
+import headless
+
+publish = headless.publish
+
+def ready(runtime_info, notify_browsers=False):
+	publish(runtime_info, notify_browsers)
+	print("BENCH " + json.dumps({"ready": time.time()}), flush=True)
+	os.kill(os.getpid(), signal.SIGTERM)
+
+headless.publish = ready
+sys.exit(headless.run(sys.argv[2], None, int(sys.argv[3])))
+"""
+
+
+def bench_importtime(repeat):
+	"""
+	Measures the cumulative import time of each module in a fresh interpreter.
+	Milliseconds depend on the machine and are only reported, the time relative
+	to the imports of the interpreter startup in the same run is compared.
+	"""
+	results = {}
+
+	for module in IMPORT_MODULES:
+		samples = []
+		relative_samples = []
+		for _ in range(repeat):
+			process = subprocess.run(
+				[sys.executable, "-X", "importtime", "-c", f"import {module}"],
+				cwd=common.REPO_DIR, capture_output=True, text=True
+			)
+			if process.returncode != 0:
+				print(f"Importing {module} failed:\n{process.stderr}", file=sys.stderr)
+				break
+
+			# Lines look like "import time:  self [us] | cumulative | name",
+			# nested imports are indented in the name column
+			total = 0
+			cumulative = None
+			for line in process.stderr.splitlines():
+				parts = line.split("|")
+				if len(parts) != 3:
+					continue
+				try:
+					total += int(parts[0].split(":")[1])
+				except ValueError:
+					continue  # Header line
+				if parts[2] == " " + module:
+					cumulative = int(parts[1])
+
+			if cumulative is not None:
+				samples.append(cumulative / 1000)
+				# Everything else imported in the run is the interpreter startup
+				if total > cumulative:
+					relative_samples.append(cumulative / (total - cumulative))
+
+		if samples:
+			results[f"importtime.{module}"] = {"value": common.median(samples), "unit": "ms", "gate": False}
+		if relative_samples:
+			results[f"importtime.{module}.relative"] = {"value": common.median(relative_samples), "unit": "x"}
+
+	return results
+
+
+@contextlib.contextmanager
+def display_environment():
+	"""
+	Yields the environment to start the GUI with.
+	Starts Xvfb if there is no display, yields None if no display is available.
+	"""
+	env = dict(os.environ)
+
+	if sys.platform in ("win32", "darwin") or env.get("DISPLAY"):
+		yield env
+		return
+
+	xvfb = shutil.which("Xvfb")
+	if not xvfb:
+		yield None
+		return
+
+	display = 99
+	while os.path.exists(f"/tmp/.X11-unix/X{display}"):
+		display += 1
+
+	server = subprocess.Popen([xvfb, f":{display}", "-nolisten", "tcp", "-screen", "0", "1280x1024x24"],
+							  stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+	try:
+		deadline = time.monotonic() + 10
+		while not os.path.exists(f"/tmp/.X11-unix/X{display}") and time.monotonic() < deadline:
+			time.sleep(0.05)
+
+		env["DISPLAY"] = f":{display}"
+		yield env
+	finally:
+		server.terminate()
+		server.wait()
+
+
+def bench_startup(repeat):
+	"""Measures the time from starting the interpreter until the main loop is idle"""
+	with display_environment() as env:
+		if env is None:
+			print("Skipping startup benchmark, no display and Xvfb is not installed", file=sys.stderr)
+			return {}
+
+		idle_samples = []
+		paint_samples = []
+		for _ in range(repeat):
+			start = time.time()
+			process = subprocess.run([sys.executable, "-c", STARTUP_SCRIPT], cwd=common.REPO_DIR,
+									 env=env, capture_output=True, text=True, timeout=60)
+
+			report = None
+			for line in process.stdout.splitlines():
+				if line.startswith("BENCH "):
+					report = json.loads(line[len("BENCH "):])
+
+			if report is None:
+				print(f"Startup benchmark failed:\n{process.stdout}{process.stderr}", file=sys.stderr)
+				return {}
+
+			idle_samples.append((report["idle"] - start) * 1000)
+			if "first_paint" in report["timings"]:
+				paint_samples.append(report["timings"]["first_paint"] * 1000)
+
+	results = {"startup.first_idle": {"value": common.median(idle_samples), "unit": "ms"}}
+	if paint_samples:
+		# Measured inside the process, from importing main_window
+		results["startup.first_paint"] = {"value": common.median(paint_samples), "unit": "ms"}
+	return results
+
+
+def free_port():
+	"""Returns a local TCP port nothing listens on"""
+	with socket.socket() as probe:
+		probe.bind(("localhost", 0))
+		return probe.getsockname()[1]
+
+
+def bench_headless_startup(repeat):
+	"""
+	Measures the time from starting the interpreter until headless mode serves the notes.
+	Needs no display, settings are read from a temporary directory.
+	"""
+	samples = []
+
+	with tempfile.TemporaryDirectory() as directory:
+		settings_path = os.path.join(directory, "config.cfg")
+		notes_path = os.path.join(directory, "notes.txt")
+		write_notes_file(notes_path, NOTES_SIZES["1KB"])
+
+		for _ in range(repeat):
+			start = time.time()
+			process = subprocess.run(
+				[sys.executable, "-c", HEADLESS_STARTUP_SCRIPT, settings_path, notes_path, str(free_port())],
+				cwd=common.REPO_DIR, capture_output=True, text=True, timeout=60
+			)
+
+			report = None
+			for line in process.stdout.splitlines():
+				if line.startswith("BENCH "):
+					report = json.loads(line[len("BENCH "):])
+
+			if report is None:
+				print(f"Headless startup benchmark failed:\n{process.stdout}{process.stderr}", file=sys.stderr)
+				return {}
+			samples.append((report["ready"] - start) * 1000)
+
+	return {"startup.headless_ready": {"value": common.median(samples), "unit": "ms"}}
+
+
+def write_notes_file(file_path, size):
+	"""Writes a synthetic notes file of about given size in bytes"""
+	written = 0
+	split = 0
+
+	with open(file_path, "w", encoding="utf-8") as notes_file:
+		while written < size:
+			block = "".join(
+				f"[Split {split + i}]\nRoute note for split {split + i}, jump the gap and save the cycle\n"
+				f"Keep {split + i} resources for later\n\n"
+				for i in range(1000)
+			)
+			notes_file.write(block)
+			written += len(block.encode("utf-8"))
+			split += 1000
+
+		notes_file.truncate(size)
+
+
+def bench_notes(sizes):
+	"""Measures synchronous and background loading of synthetic notes files"""
+	import note_reader
+
+	results = {}
+
+	with tempfile.TemporaryDirectory() as directory:
+		for label in sizes:
+			size = NOTES_SIZES[label]
+			file_path = os.path.join(directory, f"notes_{label}.txt")
+			write_notes_file(file_path, size)
+			repeat = 5 if size <= 10 << 20 else 1
+
+			samples = []
+			for _ in range(repeat):
+				start = time.perf_counter()
+				note_reader.get_notes(file_path, "new_line")
+				samples.append((time.perf_counter() - start) * 1000)
+			results[f"notes.sync.{label}"] = {"value": common.median(samples), "unit": "ms"}
+
+			first_samples = []
+			total_samples = []
+			for _ in range(repeat):
+				events = queue.Queue()
+				start = time.perf_counter()
+				note_reader.load_notes_async(file_path, "new_line", events)
+				while True:
+					event = events.get()
+					if event[0] == "first_note":
+						first_samples.append((time.perf_counter() - start) * 1000)
+					elif event[0] == "done":
+						total_samples.append((time.perf_counter() - start) * 1000)
+						break
+
+			results[f"notes.async_first_note.{label}"] = {"value": common.median(first_samples), "unit": "ms"}
+			results[f"notes.async_total.{label}"] = {"value": common.median(total_samples), "unit": "ms"}
+
+			os.remove(file_path)
+
+	return results
+
+
+def bench_polling(repeat):
+	"""Measures LiveSplit polling and reconnects against the simulator"""
+	import ls_connection as con
+	import ls_simulator
+
+	results = {}
+	polls = 200 * repeat
+
+	for name, fragment in (("whole", 0), ("fragmented", 2)):
+		simulator = ls_simulator.LiveSplitSimulator(ls_simulator.generated_script(10, 1.0), fragment=fragment)
+		port = simulator.start()
+		ls_socket = con.init_socket()
+		ls_socket.connect(("localhost", port))
+
+		samples = []
+		failures = 0
+		for _ in range(polls):
+			start = time.perf_counter()
+			if isinstance(con.get_split_index(ls_socket), bool):
+				failures += 1
+			samples.append((time.perf_counter() - start) * 1000)
+
+		con.close_socket(ls_socket)
+		simulator.stop()
+
+		results[f"polling.{name}.p50"] = {"value": common.percentile(samples, 50), "unit": "ms"}
+		results[f"polling.{name}.p99"] = {"value": common.percentile(samples, 99), "unit": "ms"}
+		if failures:
+			print(f"{failures} of {polls} {name} polls failed", file=sys.stderr)
+
+	# Time from LiveSplit dropping the connection until polling works again
+	simulator = ls_simulator.LiveSplitSimulator(ls_simulator.generated_script(10, 1.0))
+	port = simulator.start()
+	samples = []
+	for _ in range(repeat):
+		ls_socket = con.init_socket()
+		ls_socket.connect(("localhost", port))
+		con.get_split_index(ls_socket)
+
+		simulator.drop_clients()
+		start = time.perf_counter()
+		while con.check_connection(ls_socket):
+			pass
+		con.close_socket(ls_socket)
+		ls_socket = con.init_socket()
+		ls_socket.connect(("localhost", port))
+		con.get_split_index(ls_socket)
+		samples.append((time.perf_counter() - start) * 1000)
+		con.close_socket(ls_socket)
+
+	simulator.stop()
+	results["polling.reconnect"] = {"value": common.median(samples), "unit": "ms"}
+
+	return results
+
+
+def main():
+	parser = argparse.ArgumentParser(description="Run SplitNotes startup benchmarks")
+	parser.add_argument("--only", action="append", choices=["importtime", "startup", "notes", "polling"],
+						help="benchmark group to run, can be given more than once")
+	parser.add_argument("--repeat", type=int, default=5, help="runs per measurement (default 5)")
+	parser.add_argument("--notes-sizes", default=",".join(NOTES_SIZES),
+						help="comma separated notes file sizes (default %(default)s)")
+	parser.add_argument("--output", default=os.path.join(common.BENCHMARK_DIR, "results.json"),
+						help="JSON results file, - for stdout")
+	parser.add_argument("--baseline", default=common.BASELINE_PATH, help="baseline file to compare against")
+	parser.add_argument("--tolerance", type=float, default=common.DEFAULT_TOLERANCE,
+						help="allowed slowdown for baselines without their own tolerance")
+	parser.add_argument("--update-baseline", action="store_true", help="store the results as new baselines")
+	args = parser.parse_args()
+
+	sizes = [size.strip() for size in args.notes_sizes.split(",") if size.strip()]
+	for size in sizes:
+		if size not in NOTES_SIZES:
+			parser.error(f"unknown notes size {size}, use one of {', '.join(NOTES_SIZES)}")
+
+	groups = args.only or ["importtime", "startup", "notes", "polling"]
+	results = {}
+	if "importtime" in groups:
+		results.update(bench_importtime(args.repeat))
+	if "startup" in groups:
+		results.update(bench_startup(args.repeat))
+		results.update(bench_headless_startup(args.repeat))
+	if "notes" in groups:
+		results.update(bench_notes(sizes))
+	if "polling" in groups:
+		results.update(bench_polling(args.repeat))
+
+	common.write_results(results, args.output)
+	baselines = common.load_baselines(args.baseline)
+	# Keep stdout machine-readable when the results go there
+	report = sys.stderr if args.output == "-" else sys.stdout
+
+	if args.update_baseline:
+		common.save_baselines(results, args.baseline, baselines)
+		print(f"Stored {len(results)} baselines in {args.baseline}", file=report)
+		return 0
+
+	common.print_results(results, baselines, report)
+	regressions = common.compare(results, baselines, args.tolerance)
+	for name, value, baseline, limit in regressions:
+		print(f"REGRESSION {name}: {value:.3f} > {limit:.3f} (baseline {baseline:.3f})", file=report)
+
+	return 1 if regressions else 0
+
+
+if __name__ == "__main__":
+	sys.exit(main())
@@ -0,0 +1,105 @@
+"""
+Compact binary framing for the bridge server.
+JSON stays the default, a client switches to binary frames by sending
+{"type": "hello", "encoding": "binary"} and waiting for the JSON reply.
+
+Every frame starts with a message type and protocol version byte.
+
+State frames have a fixed layout (13 bytes, network byte order):
+	type (u8), version (u8), split index (i16), running (u8), timestamp (f64)
+
+Split name frames carry the variable length side table,
+they are only sent when the split names change:
+	type (u8), version (u8), payload length (u32), payload
+The payload is the UTF-8 encoded split names separated by NUL bytes.
+"""
+import struct
+
+VERSION = 1
+
+# Frame type ids
+TIMER_STATE = 1  # client -> server
+STATE_UPDATE = 2  # server -> client
+SPLIT_NAMES = 3  # both directions
+HEARTBEAT = 4  # client -> server
+ACK = 5  # server -> client, split index field holds the acknowledged message count
+
+STATE_FRAME = struct.Struct("!BBhBd")
+TABLE_HEADER = struct.Struct("!BBI")
+
+# Upper bound for split name tables, larger frames are treated as corrupt
+MAX_TABLE_SIZE = 1 << 20
+
+NAME_SEPARATOR = "\0"
+
+
+class ProtocolError(Exception):
+	"""Raised when a binary frame can not be decoded"""
+
+
+def clamp_index(index):
+	"""Clamps given value to the i16 range of the split index field"""
+	return max(-32768, min(32767, int(index)))
+
+
+def encode_state(frame_type, split_index, running, timestamp):
+	"""Returns a fixed layout state frame"""
+	return STATE_FRAME.pack(frame_type, VERSION, clamp_index(split_index), 1 if running else 0, timestamp)
+
+
+def encode_ack(count, timestamp):
+	"""Returns an acknowledgment frame for count messages"""
+	return encode_state(ACK, count, False, timestamp)
+
+
+def encode_split_names(names):
+	"""Returns a side table frame with given split names"""
+	payload = NAME_SEPARATOR.join(str(name).replace(NAME_SEPARATOR, "") for name in names).encode("utf-8")
+	return TABLE_HEADER.pack(SPLIT_NAMES, VERSION, len(payload)) + payload
+
+
+def decode_frames(buffer):
+	"""
+	Decodes all complete frames in given bytes.
+	Returns a list of decoded frames and the remaining bytes.
+	State frames decode to (type, split index, running, timestamp),
+	split name frames decode to (SPLIT_NAMES, [names]).
+
+	Raises ProtocolError on unknown frame types or versions.
+	"""
+	frames = []
+	offset = 0
+
+	while len(buffer) - offset >= 2:
+		frame_type = buffer[offset]
+		version = buffer[offset + 1]
+
+		if version != VERSION:
+			raise ProtocolError(f"Unsupported protocol version {version}")
+
+		if frame_type == SPLIT_NAMES:
+			if len(buffer) - offset < TABLE_HEADER.size:
+				break
+			_, _, length = TABLE_HEADER.unpack_from(buffer, offset)
+			if length > MAX_TABLE_SIZE:
+				raise ProtocolError(f"Split name table too large ({length} bytes)")
+
+			end = offset + TABLE_HEADER.size + length
+			if len(buffer) < end:
+				break
+
+			payload = bytes(buffer[offset + TABLE_HEADER.size:end]).decode("utf-8", "replace")
+			frames.append((SPLIT_NAMES, payload.split(NAME_SEPARATOR) if payload else []))
+			offset = end
+
+		elif frame_type in (TIMER_STATE, STATE_UPDATE, HEARTBEAT, ACK):
+			if len(buffer) - offset < STATE_FRAME.size:
+				break
+			_, _, split_index, running, timestamp = STATE_FRAME.unpack_from(buffer, offset)
+			frames.append((frame_type, split_index, bool(running), timestamp))
+			offset += STATE_FRAME.size
+
+		else:
+			raise ProtocolError(f"Unknown frame type {frame_type}")
+
+	return frames, buffer[offset:]
@@ -0,0 +1,732 @@
+"""
+Bridge server for browser extensions and overlays.
+Raw TCP and WebSocket clients share one port, messages are JSON unless
+a client negotiated binary frames (see bridge_protocol).
+
+Browser timer state is written into the runtime info dictionary of the
+application, on_change is called whenever it changed.
+"""
+import json
+import logging
+import socket
+import threading
+import time
+
+import bridge_protocol
+import config
+import metrics
+import timer_arbiter
+import websocket_protocol as ws
+
+CLIENTS = metrics.gauge("splitnotes_bridge_clients", "Connected bridge clients")
+CLIENTS_DROPPED = metrics.counter("splitnotes_bridge_clients_dropped_total",
+								  "Bridge clients dropped after a failed send")
+MESSAGES_IN = metrics.counter("splitnotes_bridge_messages_in_total", "Messages received from bridge clients")
+MESSAGES_OUT = metrics.counter("splitnotes_bridge_messages_out_total", "Messages sent to bridge clients")
+MESSAGES_DROPPED = metrics.counter("splitnotes_bridge_messages_dropped_total",
+								   "Messages from bridge clients superseded while over the rate limit")
+
+log = logging.getLogger(__name__)
+
+# Messages answered as they arrive instead of being merged and applied per frame
+REQUEST_TYPES = {config.BRIDGE_MESSAGE_TYPES[name]
+				 for name in ("CONNECTION_TEST", "STATUS_REQUEST", "HELLO", "NOTES_REQUEST")}
+
+
+class TokenBucket:
+	"""Token bucket rate limiter, one per bridge connection"""
+
+	def __init__(self, rate, burst):
+		self.rate = rate
+		self.capacity = burst
+		self.tokens = burst
+		self.last = time.monotonic()
+
+	def consume(self):
+		"""Takes one token. Returns False if the connection is over its rate limit."""
+		now = time.monotonic()
+		self.tokens = min(self.capacity, self.tokens + (now - self.last) * self.rate)
+		self.last = now
+
+		if self.tokens >= 1:
+			self.tokens -= 1
+			return True
+		return False
+
+
+class BridgeClient:
+	"""A connected browser client and its ingest state"""
+
+	def __init__(self, client_socket, address):
+		self.socket = client_socket
+		self.address = address
+		# Name of the client as timer source, see timer_arbiter
+		self.source = "bridge:%s:%s" % tuple(address[:2])
+		self.bucket = TokenBucket(config.BRIDGE_RATE_LIMIT, config.BRIDGE_RATE_BURST)
+		self.ack_mode = config.BRIDGE_ACK_MODE
+		self.pending_acks = 0
+		self.dropped = 0
+		self.buffer = b""
+		self.send_lock = threading.Lock()
+		# "json" or "binary", see bridge_protocol
+		self.encoding = "json"
+		# None until the first bytes arrived, then "tcp", "handshake" or "websocket"
+		self.transport = None
+		self.ws_reader = None
+		self.deflate_bits = None
+		self.closing = False
+		self.last_seen = time.monotonic()
+		self.split_names = []  # Side table received from a binary client
+		self.names_sent = None  # Side table last sent to a binary client
+
+	def send(self, data):
+		"""Sends given message bytes to the client, framed for WebSocket clients"""
+		if self.transport == "websocket":
+			if self.encoding == "binary":
+				data = ws.encode_frame(ws.BINARY, data, self.deflate_bits, config.WEBSOCKET_COMPRESS_THRESHOLD)
+			else:
+				data = ws.encode_frame(ws.TEXT, data.rstrip(b"\n"), self.deflate_bits,
+									   config.WEBSOCKET_COMPRESS_THRESHOLD)
+		self.send_raw(data)
+		MESSAGES_OUT.inc()
+
+	def send_raw(self, data):
+		"""Sends given bytes to the client as they are"""
+		with self.send_lock:
+			self.socket.sendall(data)
+
+	def close(self):
+		"""Closes the client connection"""
+		try:
+			self.socket.close()
+		except:
+			pass
+
+	def next_line(self):
+		"""
+		Returns the next complete message line in the buffer, or None.
+		Messages are newline separated JSON, a single JSON object without
+		trailing newline is accepted for older extensions.
+		"""
+		while True:
+			end = self.buffer.find(b"\n")
+			if end == -1:
+				break
+			line = self.buffer[:end]
+			self.buffer = self.buffer[end + 1:]
+			if line.strip():
+				return line
+
+		if self.buffer:
+			try:
+				json.loads(self.buffer.decode('utf-8'))
+			except (ValueError, UnicodeDecodeError):
+				if len(self.buffer) > config.BRIDGE_MAX_MESSAGE_SIZE:
+					self.buffer = b""
+				return None
+
+			line = self.buffer
+			self.buffer = b""
+			return line
+
+		return None
+
+	def next_frames(self):
+		"""Returns all complete binary frames in the buffer as bridge messages"""
+		messages, self.buffer = self.decode_frames(self.buffer)
+		return messages
+
+	def decode_frames(self, data):
+		"""Decodes binary frames in given bytes, returns bridge messages and the remaining bytes"""
+		frames, rest = bridge_protocol.decode_frames(data)
+		messages = []
+
+		for frame in frames:
+			if frame[0] == bridge_protocol.TIMER_STATE:
+				_, split_index, running, _ = frame
+				split_name = ""
+				if 0 <= split_index < len(self.split_names):
+					split_name = self.split_names[split_index]
+				messages.append({
+					'type': config.BRIDGE_MESSAGE_TYPES["TIMER_STATE"],
+					'running': running,
+					'currentSplit': split_index,
+					'splitName': split_name
+				})
+			elif frame[0] == bridge_protocol.SPLIT_NAMES:
+				self.split_names = frame[1]
+				messages.append({
+					'type': config.BRIDGE_MESSAGE_TYPES["SPLITS_UPDATED"],
+					'splits': frame[1]
+				})
+			elif frame[0] == bridge_protocol.HEARTBEAT:
+				messages.append({'type': config.BRIDGE_MESSAGE_TYPES["HEARTBEAT"]})
+
+		return messages, rest
+
+	def ack(self, count=None):
+		"""Returns an encoded acknowledgment, for count messages if given"""
+		if self.encoding == "binary":
+			return bridge_protocol.encode_ack(1 if count is None else count, time.time())
+		return ack_message(count)
+
+
+def split_display_name(split):
+	"""Returns the name of a split as sent by browser extensions (name string or object)"""
+	if isinstance(split, dict):
+		return str(split.get('name', ''))
+	return str(split)
+
+
+def ack_message(count=None):
+	"""Returns an encoded acknowledgment, for count messages if given"""
+	if count is None:
+		return ('{"status": "ok", "timestamp": %r}\n' % time.time()).encode('utf-8')
+	return ('{"status": "ok", "count": %d, "timestamp": %r}\n' % (count, time.time())).encode('utf-8')
+
+
+class BridgeServer:
+	"""Bridge server for browser extensions, raw TCP and WebSocket clients share one port"""
+	
+	def __init__(self, port=16835, runtime_info=None, on_change=None):
+		self.port = port
+		# Shared with the GUI, standalone servers get their own state
+		self.runtime_info = runtime_info if runtime_info is not None else {
+			"active_split": -1,
+			"timer_running": False,
+			"notes": [],
+			"bridge_state": {},
+			"bridge_heartbeat": 0.0
+		}
+		if self.runtime_info.get("timer_arbiter") is None:
+			self.runtime_info["timer_arbiter"] = timer_arbiter.TimerArbiter(self.runtime_info)
+		self.arbiter = self.runtime_info["timer_arbiter"]
+		self.on_change = on_change
+		self.host = 'localhost'
+		self.running = False
+		self.server_socket = None
+		self.clients = []
+		self.state_lock = threading.Lock()
+		self.server_thread = None
+		# Ingest stage, latest message per client and type waiting to be applied
+		self.pending = {}
+		# Latest messages of clients over their rate limit, applied once the bucket refills
+		self.limited = {}
+		self.pending_lock = threading.Lock()
+		self.pending_event = threading.Event()
+		self.ingest_thread = None
+		self.last_flush = 0.0
+		
+	def start(self):
+		"""Start the TCP bridge server"""
+		if self.running:
+			return True
+			
+		try:
+			self.server_socket = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+			self.server_socket.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+			self.server_socket.settimeout(1.0)  # Add timeout for clean shutdown
+			self.server_socket.bind((self.host, self.port))
+			self.server_socket.listen(config.BRIDGE_LISTEN_BACKLOG)
+			
+			self.running = True
+			
+			# Start server thread
+			self.server_thread = threading.Thread(target=self._server_loop, daemon=True)
+			self.server_thread.start()
+
+			# Start ingest thread
+			self.ingest_thread = threading.Thread(target=self._ingest_loop, daemon=True)
+			self.ingest_thread.start()
+
+			CLIENTS.set_function(lambda: len(self.clients))
+			log.info("Bridge server started on %s:%s", self.host, self.port)
+			return True
+			
+		except Exception as e:
+			log.error("Failed to start bridge server: %s", e)
+			self.running = False
+			if self.server_socket:
+				try:
+					self.server_socket.close()
+				except:
+					pass
+				self.server_socket = None
+			return False
+	
+	def stop(self):
+		"""Stop the bridge server"""
+		self.running = False
+		self.pending_event.set()  # Wake up ingest thread
+		CLIENTS.set_function(None)
+		
+		# Close all client connections
+		for client in self.clients[:]:  # Copy list to avoid modification during iteration
+			client.close()
+		self.clients.clear()
+		
+		# Close server socket
+		if self.server_socket:
+			try:
+				self.server_socket.close()
+			except:
+				pass
+			self.server_socket = None
+		
+		# Wait for server threads to finish
+		for thread in (self.server_thread, self.ingest_thread):
+			if thread and thread.is_alive():
+				thread.join(timeout=2.0)
+		
+		log.info("Bridge server stopped")
+	
+	def is_alive(self):
+		"""Returns whether a browser client sent a heartbeat recently"""
+		heartbeat = self.runtime_info.get("bridge_heartbeat", 0.0)
+		return time.monotonic() - heartbeat < config.BRIDGE_HEARTBEAT_TIMEOUT
+
+	def _server_loop(self):
+		"""Main server loop for accepting connections"""
+		while self.running:
+			try:
+				client_socket, address = self.server_socket.accept()
+				log.info("Browser client connected from %s", address)
+				
+				# Set client timeout
+				client_socket.settimeout(30.0)
+				
+				client = BridgeClient(client_socket, address)
+				self.clients.append(client)
+				client_thread = threading.Thread(
+					target=self._handle_client, 
+					args=(client,), 
+					daemon=True
+				)
+				client_thread.start()
+				
+			except socket.timeout:
+				continue  # Normal timeout, check if still running
+			except Exception as e:
+				if self.running:
+					log.error("Error accepting connection: %s", e)
+				break
+	
+	def _handle_client(self, client):
+		"""Handle individual client connections"""
+		address = client.address
+		try:
+			while self.running:
+				try:
+					data = client.socket.recv(4096)
+					if not data:
+						break
+
+					client.last_seen = time.monotonic()
+					client.buffer += data
+					self._read_buffer(client)
+					if client.closing:
+						break
+						
+				except socket.timeout:
+					if client.transport == "websocket":
+						# WebSocket liveness is checked with ping/pong
+						if time.monotonic() - client.last_seen > config.WEBSOCKET_PING_TIMEOUT:
+							log.info("WebSocket client %s timed out", address)
+							break
+						client.send_raw(ws.encode_frame(ws.PING, b""))
+					continue
+				except ws.WebSocketError as e:
+					log.warning("WebSocket protocol error from %s: %s", address, e)
+					try:
+						client.send_raw(ws.encode_close(e.code))
+					except Exception:
+						pass
+					break
+				except Exception as e:
+					log.info("Error receiving from client %s: %s", address, e)
+					break
+					
+		except Exception as e:
+			log.error("Error handling client %s: %s", address, e)
+		finally:
+			client.close()
+			if client in self.clients:
+				self.clients.remove(client)
+			with self.pending_lock:
+				self.pending.pop(client, None)
+				self.limited.pop(client, None)
+			log.info("Browser client %s disconnected", address)
+
+			# Another source takes over if this client was displayed
+			self.arbiter.remove(client.source)
+			if self.running and self.arbiter.resolve():
+				self._notify_change()
+
+	def _read_buffer(self, client):
+		"""Handles all complete messages in the client buffer"""
+		if client.transport is None:
+			if len(client.buffer) < 4 and b"GET "[:len(client.buffer)] == client.buffer:
+				return  # Could still become an HTTP request
+			client.transport = "handshake" if ws.is_upgrade_request(client.buffer) else "tcp"
+
+		if client.transport == "handshake":
+			if b"\r\n\r\n" not in client.buffer:
+				if len(client.buffer) > config.BRIDGE_MAX_MESSAGE_SIZE:
+					client.closing = True
+				return
+			head, client.buffer = client.buffer.split(b"\r\n\r\n", 1)
+			self._upgrade(client, head)
+			if client.closing:
+				return  # Answered with an HTTP response, the rest is not bridge messages
+
+		if client.transport == "websocket":
+			self._read_websocket(client)
+			return
+
+		while client.encoding == "json":
+			line = client.next_line()
+			if line is None:
+				return
+			self._receive_line(client, line)
+
+		# Switched to binary frames, possibly in the middle of the buffer
+		for message in client.next_frames():
+			MESSAGES_IN.inc()
+			self._receive_message(client, message)
+
+	def _upgrade(self, client, head):
+		"""
+		Completes the WebSocket handshake. Plain HTTP requests for /metrics get
+		the metrics export, other requests that are not upgrades are rejected.
+		"""
+		try:
+			path, headers = ws.parse_request(head)
+			if path == "/metrics" and headers.get("upgrade", "").lower() != "websocket":
+				self._send_metrics(client)
+				return
+			deflate_bits = ws.negotiate_deflate(headers) if config.WEBSOCKET_DEFLATE else None
+			response = ws.handshake_response(headers, deflate_bits)
+		except ws.WebSocketError as e:
+			log.info("Rejected HTTP request from %s: %s", client.address, e)
+			client.send_raw(ws.reject_response())
+			client.closing = True
+			return
+
+		client.send_raw(response)
+		client.transport = "websocket"
+		client.deflate_bits = deflate_bits
+		client.ws_reader = ws.FrameReader(deflate_bits is not None, config.BRIDGE_MAX_MESSAGE_SIZE)
+		client.socket.settimeout(config.WEBSOCKET_PING_INTERVAL)
+		log.debug("Browser client %s upgraded to WebSocket", client.address)
+
+	def _send_metrics(self, client):
+		"""Answers an HTTP request with the metrics export and closes the connection"""
+		body = metrics.registry.export().encode("utf-8")
+		client.send_raw((
+			"HTTP/1.1 200 OK\r\n"
+			f"Content-Type: {metrics.CONTENT_TYPE}\r\n"
+			f"Content-Length: {len(body)}\r\n"
+			"Connection: close\r\n\r\n"
+		).encode("ascii") + body)
+		client.closing = True
+
+	def _read_websocket(self, client):
+		"""Handles all complete WebSocket messages in the client buffer"""
+		data = client.buffer
+		client.buffer = b""
+
+		for opcode, payload in client.ws_reader.feed(data):
+			if opcode == ws.TEXT:
+				for line in payload.split("\n"):
+					if line.strip():
+						self._receive_line(client, line.encode('utf-8'))
+			elif opcode == ws.BINARY:
+				if client.encoding != "binary":
+					raise ws.WebSocketError("Binary message before binary handshake", ws.CLOSE_INVALID_DATA)
+				messages, rest = client.decode_frames(payload)
+				if rest:
+					raise ws.WebSocketError("Incomplete bridge frame", ws.CLOSE_INVALID_DATA)
+				for message in messages:
+					MESSAGES_IN.inc()
+					self._receive_message(client, message)
+			elif opcode == ws.PING:
+				client.send_raw(ws.encode_frame(ws.PONG, payload))
+			elif opcode == ws.CLOSE:
+				code = ws.CLOSE_NORMAL
+				if len(payload) >= 2:
+					code = int.from_bytes(payload[:2], "big")
+				client.send_raw(ws.encode_close(code))
+				client.closing = True
+				return
+
+	def _receive_line(self, client, line):
+		"""Handles one raw message line from a client"""
+		MESSAGES_IN.inc()
+		try:
+			# Parse JSON message from browser extension
+			message = json.loads(line.decode('utf-8'))
+		except (ValueError, UnicodeDecodeError):
+			# Handle plain text commands if needed
+			command = line.decode('utf-8', 'replace').strip()
+			log.debug("Received plain text command: %s", command)
+			return
+
+		if isinstance(message, dict):
+			self._receive_message(client, message)
+
+	def _receive_message(self, client, message):
+		"""Handles one decoded message from a client"""
+		if message.get('ack') in ("each", "batched", "none"):
+			client.ack_mode = message['ack']
+
+		msg_type = message.get('type')
+		if msg_type in REQUEST_TYPES:
+			# Requests are answered right away, there is no state to keep over the rate limit
+			with self.pending_lock:
+				allowed = client.bucket.consume()
+			if not allowed:
+				client.dropped += 1
+				MESSAGES_DROPPED.inc()
+				return
+
+		if msg_type in (config.BRIDGE_MESSAGE_TYPES["CONNECTION_TEST"],
+						config.BRIDGE_MESSAGE_TYPES["STATUS_REQUEST"]):
+			# Answered right away so test tools get a response
+			client.send(client.ack())
+			return
+
+		if msg_type == config.BRIDGE_MESSAGE_TYPES["HELLO"]:
+			self._handshake(client, message)
+			return
+
+		if msg_type == config.BRIDGE_MESSAGE_TYPES["NOTES_REQUEST"]:
+			if client.encoding == "json":
+				notes = {
+					'type': config.BRIDGE_MESSAGE_TYPES["NOTES"],
+					'notes': self.runtime_info["notes"],
+					'currentSplit': self.runtime_info["active_split"]
+				}
+				client.send((json.dumps(notes) + '\n').encode('utf-8'))
+			return
+
+		accepted = self._enqueue(client, message)
+
+		# Messages parked by the rate limit are acknowledged in the batch that applies them
+		if client.ack_mode == "each" and accepted:
+			client.send(client.ack())
+		elif client.ack_mode != "none":
+			client.pending_acks += 1
+
+	def _handshake(self, client, message):
+		"""Negotiates the message encoding for a client, JSON unless binary is requested"""
+		encoding = "binary" if message.get('encoding') == "binary" else "json"
+		reply = {
+			'status': 'ok',
+			'encoding': encoding,
+			'version': bridge_protocol.VERSION
+		}
+		client.send((json.dumps(reply) + '\n').encode('utf-8'))
+		client.encoding = encoding
+
+	def _enqueue(self, client, message):
+		"""
+		Stores message as the latest of its type for the client, older ones are merged away.
+		Over the rate limit it waits in the client's limited slot instead, replacing the
+		previous message of its type, until the bucket has a token again.
+		Returns whether the message was accepted right away.
+		"""
+		msg_type = message.get('type')
+		with self.pending_lock:
+			client_limited = self.limited.pop(client, {})
+			if client_limited.pop(msg_type, None) is not None:
+				# Superseded before the rate limit let it through
+				client.dropped += 1
+				MESSAGES_DROPPED.inc()
+			client_limited[msg_type] = message
+
+			if not client.bucket.consume():
+				self.limited[client] = client_limited
+				return False
+			self._merge_pending(client, client_limited)
+		self.pending_event.set()
+		return True
+
+	def _merge_pending(self, client, messages):
+		"""Merges messages into the pending ones of a client, call with pending_lock held"""
+		client_pending = self.pending.pop(client, {})
+		for msg_type, message in messages.items():
+			client_pending.pop(msg_type, None)
+			client_pending[msg_type] = message
+		# Re-insert so clients are applied in order of their latest message
+		self.pending[client] = client_pending
+
+	def _release_limited(self):
+		"""Moves the messages of rate limited clients whose bucket refilled to pending, returns whether any moved"""
+		released = False
+		with self.pending_lock:
+			for client in list(self.limited):
+				if client.bucket.consume():
+					self._merge_pending(client, self.limited.pop(client))
+					released = True
+		return released
+
+	def _ingest_loop(self):
+		"""Applies pending messages at most once per frame"""
+		while self.running:
+			# Rate limited clients are checked as often as their bucket can refill
+			woken = self.pending_event.wait(1 / config.BRIDGE_RATE_LIMIT if self.limited else 0.5)
+			if self.limited and self._release_limited():
+				woken = True
+			if not woken:
+				continue
+
+			# Leading edge flush, then wait for the rest of the frame to merge bursts
+			wait = self.last_flush + config.BRIDGE_COALESCE_INTERVAL - time.monotonic()
+			if wait > 0:
+				time.sleep(wait)
+
+			self.pending_event.clear()
+			with self.pending_lock:
+				pending = self.pending
+				self.pending = {}
+			self.last_flush = time.monotonic()
+
+			if not self.running:
+				break
+
+			messages = []
+			for client, client_pending in pending.items():
+				messages.extend((client, message) for message in client_pending.values())
+			if messages:
+				self._process_browser_messages(messages)
+
+			for client in list(pending):
+				if client.pending_acks:
+					count = client.pending_acks
+					client.pending_acks = 0
+					try:
+						client.send(client.ack(count))
+					except Exception:
+						pass  # Handled by the client thread
+
+	def _process_browser_message(self, message, client=None):
+		"""Process a single JSON message from a browser extension"""
+		self._process_browser_messages([(client, message)])
+
+	def _process_browser_messages(self, messages):
+		"""
+		Process JSON messages from browser extensions, given as (client, message) pairs.
+		Each client is its own timer source, the arbiter decides which one is displayed.
+		"""
+		changed = False
+
+		with self.state_lock:
+			# Every message counts as a heartbeat from the browser
+			was_alive = self.is_alive()
+			self.runtime_info["bridge_heartbeat"] = time.monotonic()
+			if not was_alive:
+				changed = True
+
+			old_split = self.runtime_info["active_split"]
+			old_running = self.runtime_info["timer_running"]
+			old_name = self.runtime_info["bridge_state"].get('splitName', '')
+
+			for client, message in messages:
+				source = client.source if client else "bridge"
+				try:
+					if message.get('type') == 'timer_state':
+						running = message.get('running', False)
+						split = message.get('currentSplit', -1)
+						self.arbiter.report(source, "bridge", split, running, message.get('splitName', ''))
+
+						# Store bridge state
+						self.runtime_info["bridge_state"] = {
+							'timestamp': time.time(),
+							'currentSplit': split,
+							'timerRunning': running,
+							'splitName': message.get('splitName', ''),
+							'splits': self.runtime_info["bridge_state"].get('splits', []),
+							'source': source
+						}
+
+					else:
+						self.arbiter.touch(source)
+						if message.get('type') == 'splits_updated':
+							splits = message.get('splits', [])
+							log.debug("Browser sync: Received %d split names", len(splits))
+							self.runtime_info["bridge_state"]['splits'] = splits
+
+				except Exception as e:
+					log.warning("Error processing browser message: %s", e)
+
+			if self.arbiter.resolve():
+				changed = True
+
+			# Log changes for debugging, once per flush
+			if old_split != self.runtime_info["active_split"]:
+				log.debug("Browser sync: Split changed %s -> %s", old_split, self.runtime_info['active_split'])
+
+			if old_running != self.runtime_info["timer_running"]:
+				log.debug("Browser sync: Timer %s", 'started' if self.runtime_info['timer_running'] else 'stopped')
+
+			if old_name != self.runtime_info["bridge_state"].get('splitName', ''):
+				changed = True
+
+		if changed:
+			self._notify_change()
+
+	def _notify_change(self):
+		"""Tells the GUI that browser state changed"""
+		if self.on_change:
+			try:
+				self.on_change()
+			except Exception as e:
+				log.exception("Error notifying bridge state change: %s", e)
+	
+	def send_state_to_browsers(self, state):
+		"""Send current state to all connected browser clients"""
+		if not self.clients:
+			return
+			
+		json_message = None
+		binary_message = None
+		split_names = [split_display_name(split) for split in self.runtime_info["bridge_state"].get('splits', [])]
+		disconnected_clients = []
+		
+		for client in self.clients[:]:  # Copy list to avoid modification during iteration
+			try:
+				if client.encoding == "binary":
+					if binary_message is None:
+						binary_message = bridge_protocol.encode_state(
+							bridge_protocol.STATE_UPDATE,
+							state.get('currentSplit', -1),
+							state.get('timerRunning', False),
+							state.get('timestamp', time.time())
+						)
+					# Split names are only sent when they changed
+					if client.names_sent != split_names:
+						client.send(bridge_protocol.encode_split_names(split_names))
+						client.names_sent = split_names
+					client.send(binary_message)
+				else:
+					if json_message is None:
+						json_message = (json.dumps(state) + '\n').encode('utf-8')
+					client.send(json_message)
+			except:
+				disconnected_clients.append(client)
+		
+		# Remove disconnected clients
+		for client in disconnected_clients:
+			CLIENTS_DROPPED.inc()
+			if client in self.clients:
+				self.clients.remove(client)
+	
+	def get_status(self):
+		"""Get bridge server status"""
+		return {
+			'running': self.running,
+			'port': self.port,
+			'clients': len(self.clients),
+			'dropped_messages': sum(client.dropped for client in self.clients[:]),
+			'last_state': self.runtime_info.get("bridge_state", {})
+		}
@@ -1,5 +1,5 @@
 # CONFIG FILE WITH CONSTANTS - Complete Bridge Server Support
-import platform
+import sys
 import os
 
 # Livesplit connection
@@ -11,6 +11,52 @@ BRIDGE_HOST = "localhost"
 BRIDGE_PORT = 16835
 BRIDGE_ENABLED = False
 
+# Pending connections the bridge port queues before new ones have to retry
+BRIDGE_LISTEN_BACKLOG = 128
+
+# Inbound bridge messages are merged per client and applied at most once per frame. (in seconds)
+BRIDGE_COALESCE_INTERVAL = 1 / 60
+
+# Token bucket rate limit for each bridge connection (messages per second and burst size)
+BRIDGE_RATE_LIMIT = 120
+BRIDGE_RATE_BURST = 240
+
+# How bridge messages are acknowledged: "each", "batched" (once per frame) or "none"
+# Clients can change it for their connection by adding "ack": "<mode>" to any message
+BRIDGE_ACK_MODE = "batched"
+
+# Unterminated bridge messages larger than this are discarded (in bytes)
+BRIDGE_MAX_MESSAGE_SIZE = 65536
+
+# WebSocket clients on the bridge port are pinged after this much silence (in seconds)
+WEBSOCKET_PING_INTERVAL = 10.0
+
+# WebSocket clients that did not answer for this long are disconnected (in seconds)
+WEBSOCKET_PING_TIMEOUT = 25.0
+
+# Use permessage-deflate when offered, for messages of at least this size (in bytes)
+WEBSOCKET_DEFLATE = True
+WEBSOCKET_COMPRESS_THRESHOLD = 1024
+
+# Browser clients should send a message (any type, or "heartbeat") at least this often. (in seconds)
+BRIDGE_HEARTBEAT_INTERVAL = 1.0
+
+# Bridge state is considered stale when no heartbeat arrived within this time. (in seconds)
+BRIDGE_HEARTBEAT_TIMEOUT = 3.0
+
+# HTTP overlay server settings (notes and Server-Sent Events for OBS browser sources)
+HTTP_PORT = 16836
+
+# Comment sent on idle event streams so proxies keep them open (in seconds)
+HTTP_KEEPALIVE_INTERVAL = 15.0
+
+# Reconnect delay suggested to event stream clients (in seconds)
+HTTP_RETRY_TIME = 1.0
+
+# Limits for HTTP clients (in bytes)
+HTTP_MAX_HEADER_SIZE = 16384
+HTTP_MAX_STREAM_BACKLOG = 1000000
+
 # In network communication, time out after this time. (in seconds)
 COM_TIMEOUT = 0.5
 
@@ -18,7 +64,8 @@ COM_TIMEOUT = 0.5
 LS_COMMANDS = {
 	"best_possible": "getbestpossibletime\r\n",
 	"cur_split_index": "getsplitindex\r\n",
-	"cur_split_name": "getcurrentsplitname\r\n"
+	"cur_split_name": "getcurrentsplitname\r\n",
+	"cur_time": "getcurrenttime\r\n"
 }
 
 # Default Window Settings
@@ -30,11 +77,46 @@ DEFAULT_MSG = "Right Click to Open Notes."
 # Update time for polling livesplit and other actions (in seconds)
 POLLING_TIME = 0.5
 
+# Timer sources, kind: (priority, seconds without a report until the source is
+# ignored), see timer_arbiter. LiveSplit desktop wins over browser clients.
+TIMER_SOURCES = {
+	"livesplit": (100, 4 * POLLING_TIME),
+	"bridge": (50, BRIDGE_HEARTBEAT_TIMEOUT)
+}
+# Source name of the LiveSplit desktop connection
+LS_SOURCE = "livesplit"
+
 # File names and path for resources
 RESOURCE_FOLDER = "resources"
 ICONS = {"GREEN": "green.png", "RED": "red.png", "SETTINGS": "settings_icon.png"}
 SETTINGS_FILE = "config.cfg"
 
+# Settings changes are written to disk this long after the last change (in seconds)
+SETTINGS_FLUSH_DELAY = 1.0
+
+# Settings that keep changing are still written at least this often (in seconds)
+SETTINGS_FLUSH_MAX_DELAY = 5.0
+
+# Log file in the resources directory, rotated when it grows past LOG_MAX_BYTES
+LOG_FILE = "splitnotes.log"
+LOG_MAX_BYTES = 1 << 20
+LOG_BACKUP_COUNT = 2
+LOG_FORMAT = "%(asctime)s %(levelname)s %(name)s: %(message)s"
+# Valid values for the log_level setting and per module levels in log_levels
+LOG_LEVELS = ("debug", "info", "warning", "error", "critical")
+
+# Sampling profiler: samples per second, seconds to record and file name in the
+# resources directory (strftime format, .folded or .txt for collapsed stacks)
+PROFILER_RATE = 100
+PROFILER_DURATION = 10
+PROFILER_FILE = "profile-%Y%m%d-%H%M%S.speedscope.json"
+
+# Tk event loop stall detection: heartbeat interval and the time without a
+# heartbeat that counts as a stall (seconds), stalls kept for the status dialog
+HEARTBEAT_INTERVAL = 0.016
+STALL_THRESHOLD = 0.2
+STALL_HISTORY = 20
+
 # Default Scrollbar Width
 SCROLLBAR_WIDTH = 16
 
@@ -46,7 +128,10 @@ MENU_OPTIONS = {
 	"BIG": "Big Font",
 	"SMALL": "Small Font",
 	"SETTINGS": "Settings",
-	"BRIDGE": "Bridge Settings"
+	"BRIDGE": "Bridge Settings",
+	"PROFILE": "Record Profile",
+	"NEXT": "Set Next Split Layout",
+	"VIEWER": "Open Viewer Window"
 }
 
 # Error messages - Enhanced with bridge server errors
@@ -57,15 +142,38 @@ ERRORS = {
 	"SEPARATOR": ("Error!", "Invalid split separator!"),
 	"BRIDGE_PORT": ("Error!", "Invalid bridge server port!"),
 	"BRIDGE_START": ("Error!", "Failed to start bridge server!"),
-	"BRIDGE_CONNECTION": ("Error!", "Bridge server connection failed!")
+	"HTTP_PORT": ("Error!", "Invalid overlay HTTP server port!"),
+	"BRIDGE_CONNECTION": ("Error!", "Bridge server connection failed!"),
+	"PROFILE": ("Error!", "Profile could not be written!")
 }
 
 # Max file size for notes
 MAX_FILE_SIZE = 1000000000  # 1 Giga-Byte
 
+# Characters read at a time when loading notes in the background
+NOTES_READ_BATCH_SIZE = 1 << 16
+# How often the GUI checks on notes loaded in the background (seconds)
+NOTES_LOAD_POLL_TIME = 0.05
+# Placeholder shown while notes are loading
+NOTES_LOADING_TEXT = "Loading notes {percent}%"
+
 # To be added to title to alert user that timer is running
 RUNNING_ALERT = "RUNNING"
 
+# Most splits after the current one shown by the double layout (lookahead setting)
+MAX_LOOKAHEAD = 9
+
+# Images in notes, see note_images
+IMAGE_CACHE_BYTES = 64 * 1024 * 1024  # Decoded size of the cached images
+IMAGE_WIDTH_STEP = 16  # Images are scaled for widths rounded down to this many pixels
+IMAGE_MAX_SUBSAMPLE = 8  # Largest subsample of fractional image scaling, larger factors scale by 1 / n
+IMAGE_MARGIN = 8  # Pixels of the text box width images leave free
+IMAGE_PREFETCH = 2  # Splits after the shown ones whose images are prepared
+IMAGE_RESIZE_DELAY = 0.15  # Seconds after the last resize images are scaled again
+
+# Layouts of viewer windows: shows the current split, current and next, or only the next one
+VIEWER_LAYOUTS = ("single", "double", "next")
+
 # Font for gui widgets
 GUI_FONT = ("arial", 12)
 
@@ -82,12 +190,19 @@ font=arial
 text_color=#000000
 background_color=#FFFFFF
 double_layout=false
+lookahead=1
 server_port=16834
 width=400
 height=300
 separator=new_line
 bridge_enabled=false
-bridge_port=16835"""
+bridge_port=16835
+http_enabled=false
+http_port=16836
+log_level=info
+log_levels=
+ls_connections=
+viewers="""
 
 NEWLINE_CONSTANT = "new_line"
 
@@ -100,13 +215,43 @@ REQUIRED_SETTINGS = (
 	"background_color",
 	"server_port",
 	"double_layout", 
+	"lookahead",
 	"width",
 	"height",
 	"separator",
 	"bridge_enabled",
-	"bridge_port"
+	"bridge_port",
+	"http_enabled",
+	"http_port",
+	"log_level",
+	"log_levels",
+	"ls_connections",
+	"viewers"
 )
 
+# Type of every required setting, see setting_handler.SettingsSchema
+SETTING_TYPES = {
+	"notes": "text",
+	"font": "font",
+	"font_size": "font_size",
+	"text_color": "color",
+	"background_color": "color",
+	"server_port": "port",
+	"double_layout": "bool",
+	"lookahead": "lookahead",
+	"width": "pixels",
+	"height": "pixels",
+	"separator": "separator",
+	"bridge_enabled": "bool",
+	"bridge_port": "port",
+	"http_enabled": "bool",
+	"http_port": "port",
+	"log_level": "log_level",
+	"log_levels": "log_levels",
+	"ls_connections": "connections",
+	"viewers": "viewers"
+}
+
 # Settings window options
 SETTINGS_WINDOW = {"TITLE": "Settings",
 				   "WIDTH": 360,
@@ -163,6 +308,15 @@ Browser extensions should connect to localhost:16835 and send JSON messages like
   "splitName": "Split Name"
 }
 
+WEBSOCKET:
+Browser overlays can connect to ws://localhost:16835/ on the same port and send the same JSON messages as text messages. Send {"type": "notes_request"} to receive all loaded notes.
+
+BINARY MODE:
+Overlays that need frequent updates can send {"type": "hello", "encoding": "binary"} and switch to the compact binary frames described in bridge_protocol.py after the reply.
+
+HEARTBEAT:
+While connected, send any message (or {"type": "heartbeat"}) at least once per second. Browser timer state is ignored when no message arrived for 3 seconds.
+
 TROUBLESHOOTING:
 • Make sure port is not blocked by firewall
 • Check that no other application is using the port
@@ -170,10 +324,15 @@ TROUBLESHOOTING:
 • Restart SplitNotes if server fails to start"""
 }
 
+# Platform name as returned by platform.system(), derived from
+# sys.platform because platform.system() can spawn a process on some systems
+PLATFORM = {"darwin": "Darwin", "win32": "Windows", "cygwin": "Windows"}.get(
+	sys.platform, "Linux" if sys.platform.startswith("linux") else sys.platform)
+
 # Platform-specific fonts
 def get_available_fonts():
 	"""Returns available fonts based on the platform."""
-	system = platform.system()
+	system = PLATFORM
 	
 	if system == "Darwin":  # macOS
 		return ("Arial",
@@ -206,7 +365,6 @@ def get_available_fonts():
 AVAILABLE_FONTS = get_available_fonts()
 
 # Platform-specific configurations
-PLATFORM = platform.system()
 IS_WINDOWS = PLATFORM == "Windows"
 IS_MACOS = PLATFORM == "Darwin"
 IS_LINUX = PLATFORM == "Linux"
@@ -229,7 +387,11 @@ BRIDGE_MESSAGE_TYPES = {
 	"SPLITS_UPDATED": "splits_updated",
 	"CONNECTION_TEST": "connection_test",
 	"STATUS_REQUEST": "status_request",
-	"SETTINGS_UPDATE": "settings_update"
+	"SETTINGS_UPDATE": "settings_update",
+	"HEARTBEAT": "heartbeat",
+	"HELLO": "hello",
+	"NOTES_REQUEST": "notes_request",
+	"NOTES": "notes"
 }
 
 # Bridge server status messages
@@ -0,0 +1,179 @@
+"""
+Headless mode, runs SplitNotes without a window to feed overlays.
+Polls LiveSplit and serves the notes through the bridge server and/or
+the overlay HTTP server. Never imports tkinter.
+
+Started with "run_splitnoes.py --headless", stops cleanly on SIGTERM or Ctrl+C.
+"""
+import time
+
+# Process start as seen by this module, used to report startup time.
+# Taken before the other imports so their time is counted, hence the noqa: E402 below
+STARTUP_TIME = time.perf_counter()
+
+import logging  # noqa: E402
+import signal  # noqa: E402
+import sys  # noqa: E402
+import threading  # noqa: E402
+
+import config  # noqa: E402
+import log_handler  # noqa: E402
+import ls_connection as con  # noqa: E402
+import ls_poller  # noqa: E402
+import note_reader as noter  # noqa: E402
+import setting_handler  # noqa: E402
+import timer_arbiter  # noqa: E402
+
+log = logging.getLogger(__name__)
+
+
+def load_notes(runtime_info, notes_path, separator):
+	"""Loads notes into runtime_info, returns whether any were loaded"""
+	if not notes_path:
+		log.warning("No notes file configured")
+		return False
+
+	notes = noter.get_notes(notes_path, separator)
+	if not notes:
+		log.error("Could not load notes from %s", notes_path)
+		return False
+
+	runtime_info["notes"] = notes
+	log.info("Loaded %d notes from %s", len(notes), notes_path)
+	return True
+
+
+def start_servers(runtime_info, typed, bridge_port=None, http_port=None):
+	"""
+	Starts the bridge and overlay HTTP servers enabled in settings,
+	a port given here enables that server regardless of settings.
+	Returns whether at least one server is running.
+	"""
+	if bridge_port or typed.bridge_enabled:
+		import bridge_server
+		server = bridge_server.BridgeServer(
+			bridge_port or typed.bridge_port,
+			runtime_info,
+			on_change=lambda: browser_state_changed(runtime_info)
+		)
+		if server.start():
+			runtime_info["bridge_server"] = server
+
+	if http_port or typed.http_enabled:
+		import overlay_server
+		server = overlay_server.OverlayServer(http_port or typed.http_port)
+		if server.start():
+			runtime_info["overlay_server"] = server
+
+	return bool(runtime_info["bridge_server"] or runtime_info["overlay_server"])
+
+
+def stop_servers(runtime_info):
+	"""Stops all running servers"""
+	for name in ("bridge_server", "overlay_server"):
+		if runtime_info[name]:
+			runtime_info[name].stop()
+			runtime_info[name] = None
+
+
+def publish(runtime_info, notify_browsers=False):
+	"""Pushes the current state to the overlay and optionally to bridge clients"""
+	if runtime_info["overlay_server"]:
+		runtime_info["overlay_server"].publish(ls_poller.overlay_snapshot(runtime_info, runtime_info["typed_settings"]))
+
+	if notify_browsers and runtime_info["bridge_server"]:
+		try:
+			runtime_info["bridge_server"].send_state_to_browsers(ls_poller.state_message(runtime_info))
+		except Exception as e:
+			log.exception("Error notifying browsers: %s", e)
+
+
+def browser_state_changed(runtime_info):
+	"""Called by the bridge server when the displayed timer state changed"""
+	publish(runtime_info)
+
+
+def run(notes_path=None, bridge_port=None, http_port=None):
+	"""Runs until SIGTERM or SIGINT, returns the exit status"""
+	log_handler.start_logging()
+	settings = setting_handler.load_settings()
+	typed = setting_handler.typed_settings(settings)
+	log_handler.apply_levels(typed)
+
+	runtime_info = {
+		"ls_connected": False,
+		"timer_running": False,
+		"active_split": -1,
+		"notes": [],
+		"typed_settings": typed,
+		"bridge_state": {},
+		"bridge_heartbeat": 0.0,
+		"bridge_server": None,
+		"overlay_server": None
+	}
+	runtime_info["timer_arbiter"] = timer_arbiter.TimerArbiter(runtime_info)
+
+	load_notes(runtime_info, notes_path or settings["notes"], settings["separator"])
+
+	if not start_servers(runtime_info, typed, bridge_port, http_port):
+		# Also on stderr, the log file is not where users look when the process exits right away
+		message = ("Nothing to serve, enable the bridge or overlay HTTP server in settings "
+				   "or pass --bridge-port or --http-port")
+		log.error(message)
+		print(message, file=sys.stderr)
+		stop_servers(runtime_info)
+		return 1
+
+	stop_event = threading.Event()
+
+	def request_stop(signum, frame):
+		log.info("Received signal %s, shutting down", signum)
+		stop_event.set()
+
+	signal.signal(signal.SIGINT, request_stop)
+	signal.signal(signal.SIGTERM, request_stop)
+	if hasattr(signal, "SIGBREAK"):
+		signal.signal(signal.SIGBREAK, request_stop)  # Ctrl+Break on Windows
+
+	publish(runtime_info)
+	log.info("Headless mode ready in %.0f ms, polling LiveSplit on port %s",
+			 (time.perf_counter() - STARTUP_TIME) * 1000, typed.server_port)
+
+	ls_socket = con.init_socket()
+	try:
+		while not stop_event.is_set():
+			if not runtime_info["ls_connected"]:
+				if ls_poller.connect(ls_socket, typed.server_port):
+					runtime_info["ls_connected"] = True
+					log.info("Connected to LiveSplit")
+				else:
+					# A failed connect leaves the socket unusable
+					con.close_socket(ls_socket)
+					ls_socket = con.init_socket()
+			else:
+				changed = ls_poller.poll_timer_source(runtime_info["timer_arbiter"], config.LS_SOURCE, ls_socket)
+
+				if changed is None and not con.check_connection(ls_socket):
+					log.info("Lost connection to LiveSplit")
+					con.DISCONNECTS.inc()
+					runtime_info["ls_connected"] = False
+					arbiter = runtime_info["timer_arbiter"]
+					arbiter.disconnect(config.LS_SOURCE)
+					arbiter.resolve()
+					if arbiter.current() is None:
+						runtime_info["timer_running"] = False
+						runtime_info["active_split"] = -1
+					con.close_socket(ls_socket)
+					ls_socket = con.init_socket()
+					publish(runtime_info, notify_browsers=True)
+				elif changed:
+					publish(runtime_info, notify_browsers=True)
+
+			stop_event.wait(config.POLLING_TIME)
+	finally:
+		con.close_socket(ls_socket)
+		stop_servers(runtime_info)
+		setting_handler.flush_settings()
+
+	log.info("Headless mode stopped")
+	return 0
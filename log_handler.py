@@ -0,0 +1,108 @@
+"""
+Logging for SplitNotes.
+
+Modules log with logging.getLogger(__name__). Records are put on a queue
+and written by a background thread, so logging never blocks the Tk loop or
+the server threads on slow consoles. By default records only go to the log
+file in the resources directory, nothing is written to stdout.
+
+Levels come from the log_level setting, log_levels overrides it per module:
+	log_level=info
+	log_levels=bridge_server:debug,setting_handler:warning
+"""
+import atexit
+import logging
+import os
+import sys
+
+import config
+
+# Cross-platform path handling
+if getattr(sys, 'frozen', False):
+	application_path = os.path.dirname(sys.executable)
+else:
+	application_path = os.path.dirname(os.path.realpath(__file__))
+
+log_path = os.path.join(application_path, config.RESOURCE_FOLDER, config.LOG_FILE)
+
+# Background writer, None until start_logging is called
+listener = None
+
+# Modules that got their own level from log_levels
+module_levels = set()
+
+
+def start_logging(console=False):
+	"""
+	Starts the background writer, records of INFO and above are logged
+	until apply_levels is called. With console also writes to stdout.
+	Only the first call has an effect.
+	"""
+	global listener
+	if listener:
+		return
+
+	# Only needed once logging starts, keeps importing this module cheap
+	import logging.handlers
+	import queue
+
+	handlers = []
+	try:
+		os.makedirs(os.path.dirname(log_path), exist_ok=True)
+		handlers.append(logging.handlers.RotatingFileHandler(
+			log_path,
+			maxBytes=config.LOG_MAX_BYTES,
+			backupCount=config.LOG_BACKUP_COUNT,
+			encoding="utf-8",
+			delay=True
+		))
+	except OSError:
+		console = True  # Better than losing every record
+
+	if console:
+		handlers.append(logging.StreamHandler(sys.stdout))
+
+	formatter = logging.Formatter(config.LOG_FORMAT)
+	for handler in handlers:
+		handler.setFormatter(formatter)
+
+	records = queue.SimpleQueue()
+	root = logging.getLogger()
+	root.addHandler(logging.handlers.QueueHandler(records))
+	root.setLevel(logging.INFO)
+
+	listener = logging.handlers.QueueListener(records, *handlers)
+	listener.start()
+	atexit.register(stop_logging)
+
+
+def apply_levels(typed):
+	"""Sets the levels from typed settings, see setting_handler.SettingsSchema"""
+	logging.getLogger().setLevel(typed.log_level.upper())
+
+	for name in module_levels - set(typed.log_levels):
+		logging.getLogger(name).setLevel(logging.NOTSET)
+
+	for name, level in typed.log_levels.items():
+		logging.getLogger(name).setLevel(level.upper())
+	module_levels.clear()
+	module_levels.update(typed.log_levels)
+
+
+def stop_logging():
+	"""
+	Writes all queued records and stops the background writer,
+	records logged afterwards (ex. by other exit handlers) are written directly.
+	"""
+	global listener
+	if not listener:
+		return
+
+	listener.stop()
+	root = logging.getLogger()
+	for handler in root.handlers[:]:
+		if isinstance(handler, logging.handlers.QueueHandler):
+			root.removeHandler(handler)
+	for handler in listener.handlers:
+		root.addHandler(handler)
+	listener = None
@@ -3,10 +3,22 @@ ls refers to LiveSplit in the entire document.
 Conversation with livesplit is done through the server component.
 """
 import socket
+import time
 from threading import Thread
 import config
+import metrics
 import select  # used for checking if socket has data pending
 
+REQUEST_SECONDS = metrics.histogram("splitnotes_ls_request_seconds", "LiveSplit command round trip time")
+REQUEST_FAILURES = metrics.counter("splitnotes_ls_request_failures_total", "LiveSplit commands without an answer")
+CONNECTS = metrics.counter("splitnotes_ls_connects_total", "Connections established to LiveSplit")
+DISCONNECTS = metrics.counter("splitnotes_ls_disconnects_total", "Connections to LiveSplit that were lost")
+
+# Optional ls_recorder.SessionRecorder logging every exchange,
+# and ls_recorder.SessionPlayer answering commands instead of LiveSplit
+recorder = None
+player = None
+
 
 def ls_connect(ls_socket, call_func, window, server_port):
 	"""Connects given socket to the livesplit server."""
@@ -32,6 +44,7 @@ def try_connection(ls_socket, call_func, window, server_port):
 	except:
 		return False
 
+	CONNECTS.inc()
 	call_func(window)
 
 
@@ -62,22 +75,63 @@ def send_to_ls(ls_socket, command):
 	Returns the response, or False if an error occurs.
 	Check config.LS_COMMANDS for available commands.
 	"""
+	if player:
+		return player.respond(command)
+
+	sent = time.monotonic()
+	response = exchange(ls_socket, command)
+	received = time.monotonic()
+
+	REQUEST_SECONDS.observe(received - sent)
+	if response is False:
+		REQUEST_FAILURES.inc()
+	if recorder:
+		recorder.record(command, response, sent, received)
+	return response
 
+
+def exchange(ls_socket, command):
+	"""Sends a command and receives the response line, returns False on errors"""
 	try:
+		discard_pending(ls_socket)
 		ls_socket.send(str.encode(config.LS_COMMANDS[command]))
 	except:
 		return False
 
-	# Use select to check if data is available, with timeout
+	return receive_line(ls_socket, config.COM_TIMEOUT)
+
+
+def discard_pending(ls_socket):
+	"""
+	Drops data that is already waiting on the socket,
+	like a late response to a command that timed out.
+	"""
+	while select.select([ls_socket], [], [], 0)[0]:
+		if not ls_socket.recv(1000):
+			raise ConnectionError("Connection closed by LiveSplit")
+
+
+def receive_line(ls_socket, timeout):
+	"""
+	Receives a response line, responses may arrive in several pieces.
+	Returns the decoded line including the line ending, or False on timeout or error.
+	"""
+	deadline = time.monotonic() + timeout
+	data = b""
+
 	try:
-		socket_ready = select.select([ls_socket], [], [], config.COM_TIMEOUT)
-		if socket_ready[0]:
-			try:
-				return (ls_socket.recv(1000)).decode("utf-8")
-			except:
+		while not data.endswith(b"\n"):
+			# Use select to check if data is available, with timeout
+			remaining = deadline - time.monotonic()
+			if remaining <= 0 or not select.select([ls_socket], [], [], remaining)[0]:
 				return False
-		else:
-			return False
+
+			chunk = ls_socket.recv(1000)
+			if not chunk:
+				return False
+			data += chunk
+
+		return data.decode("utf-8")
 	except:
 		return False
 
@@ -108,6 +162,19 @@ def get_split_name(ls_socket):
 	"""
 	ls_data = send_to_ls(ls_socket, "cur_split_name")
 
+	if ls_data:
+		return ls_data.strip()
+	else:
+		return False
+
+
+def get_current_time(ls_socket):
+	"""
+	Returns the current timer value in livesplit, formatted like livesplit does.
+	Returns False if Error occurs.
+	"""
+	ls_data = send_to_ls(ls_socket, "cur_time")
+
 	if ls_data:
 		return ls_data.strip()
 	else:
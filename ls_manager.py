@@ -0,0 +1,313 @@
+"""
+Polls several LiveSplit servers at once, for relay and co-op races with
+more than one runner on the machine.
+
+All connections share one thread, one selector and one polling timer:
+every tick the split index request goes out to every connected server in
+one pass, then the responses are collected as they arrive. Cost per tick
+is one wakeup and one select, not one blocking exchange per server.
+
+The thread waits on a condition without ticking while there are no
+connections, adding one wakes it up.
+
+Each connection has its own timer state and notes, on_change is called
+on the manager thread whenever either changed. Notes files are read on
+worker threads (note_reader.load_notes_async), so a large file doesn't
+hold up polling.
+"""
+import errno
+import logging
+import queue
+import selectors
+import socket
+import threading
+import time
+
+import config
+import ls_connection as con
+import ls_poller
+import note_reader as noter
+
+log = logging.getLogger(__name__)
+
+# Error codes of a non-blocking connect that is still in progress
+CONNECT_PENDING = {0, errno.EINPROGRESS, errno.EWOULDBLOCK, getattr(errno, "WSAEWOULDBLOCK", errno.EWOULDBLOCK)}
+
+
+class LSConnection:
+	"""One LiveSplit server with its own timer state and notes"""
+
+	def __init__(self, name, port, notes_path=None, separator=config.NEWLINE_CONSTANT, on_change=None):
+		self.name = name
+		self.port = port
+		self.notes_path = notes_path
+		self.separator = separator
+		self.on_change = on_change
+		self.notes = []
+		self.notes_loaded = False
+		self.notes_events = None  # Events of the notes loader while the file is read, see note_reader
+		# Same keys as the runtime info, see ls_poller.apply_split_index
+		self.state = {"active_split": -1, "timer_running": False}
+		self.connected = False
+		self.socket = None
+		self.connecting_since = None
+		self.next_connect = 0.0
+		self.buffer = b""
+		self.sent_at = None  # Set while waiting for a response
+
+	def _changed(self):
+		if self.on_change:
+			try:
+				self.on_change(self)
+			except Exception as e:
+				log.exception("Error handling change of connection %s: %s", self.name, e)
+
+
+class ConnectionManager:
+	"""Polls all added connections on one background thread"""
+
+	def __init__(self, interval=config.POLLING_TIME, timeout=config.COM_TIMEOUT):
+		self.interval = interval
+		self.timeout = timeout
+		self.connections = {}
+		self.removed = []  # Closed on the manager thread, which owns the sockets
+		self.lock = threading.Lock()
+		# Notified when connections are added or polling stops
+		self.wakeup = threading.Condition(self.lock)
+		self.selector = selectors.DefaultSelector()
+		self.running = False
+		self.thread = None
+		self.request = config.LS_COMMANDS["cur_split_index"].encode()
+
+	def add(self, connection):
+		"""Adds a connection, it is connected and its notes loaded on the manager thread"""
+		with self.lock:
+			self.connections[connection.name] = connection
+			self.wakeup.notify()
+
+	def remove(self, name):
+		"""Removes and closes a connection"""
+		with self.lock:
+			connection = self.connections.pop(name, None)
+			if connection:
+				self.removed.append(connection)
+
+	def start(self):
+		"""Starts polling"""
+		if self.running:
+			return
+		self.running = True
+		self.thread = threading.Thread(target=self._loop, name="ls_manager", daemon=True)
+		self.thread.start()
+
+	def stop(self):
+		"""Stops polling and closes all connections"""
+		with self.lock:
+			self.running = False
+			self.wakeup.notify()
+		if self.thread:
+			self.thread.join(self.interval + 1.0)
+			self.thread = None
+
+	def get_status(self):
+		"""Returns the state of every connection"""
+		with self.lock:
+			connections = list(self.connections.values())
+		return [{
+			'name': connection.name,
+			'port': connection.port,
+			'connected': connection.connected,
+			'currentSplit': connection.state["active_split"],
+			'timerRunning': connection.state["timer_running"],
+			'notes': len(connection.notes)
+		} for connection in connections]
+
+	def _loop(self):
+		next_tick = time.monotonic()
+		try:
+			while self.running:
+				if self._park():
+					next_tick = time.monotonic()
+					continue
+
+				now = time.monotonic()
+				if now >= next_tick:
+					self._tick(now)
+					next_tick += self.interval
+					if next_tick < now:
+						next_tick = now + self.interval
+
+				wait = max(0.0, next_tick - time.monotonic())
+				if self.selector.get_map():
+					for key, events in self.selector.select(wait):
+						self._handle(key.data, events)
+				else:
+					time.sleep(wait)  # select() fails without sockets on Windows
+		finally:
+			with self.lock:
+				connections = list(self.connections.values()) + self.removed
+				self.removed = []
+			for connection in connections:
+				self._close(connection)
+			self.selector.close()
+
+	def _park(self):
+		"""Waits while there are no connections to poll or close, returns whether it waited"""
+		with self.lock:
+			if self.connections or self.removed:
+				return False
+			while self.running and not self.connections:
+				self.wakeup.wait()
+			return True
+
+	def _tick(self, now):
+		"""Sends the request to every connected server in one pass and (re)connects the others"""
+		with self.lock:
+			connections = list(self.connections.values())
+			removed, self.removed = self.removed, []
+
+		for connection in removed:
+			self._close(connection)
+
+		for connection in connections:
+			if not connection.notes_loaded:
+				self._load_notes(connection)
+			elif connection.notes_events is not None:
+				self._receive_notes(connection)
+
+			if connection.connected:
+				if connection.sent_at is not None:
+					if now - connection.sent_at < self.timeout:
+						continue  # Slow answer, poll again next tick
+					log.info("LiveSplit %s did not answer", connection.name)
+					self._lost(connection, now)
+					continue
+
+				try:
+					connection.buffer = b""
+					connection.socket.send(self.request)
+					connection.sent_at = now
+				except OSError:
+					self._lost(connection, now)
+
+			elif connection.socket is not None:
+				if now - connection.connecting_since > self.timeout:
+					self._close(connection)
+					connection.next_connect = now + self.interval
+
+			elif now >= connection.next_connect:
+				self._connect(connection, now)
+
+	def _load_notes(self, connection):
+		"""Starts loading the notes of a connection on a worker thread, polling goes on meanwhile"""
+		connection.notes_loaded = True
+		if connection.notes_path:
+			connection.notes_events = queue.Queue()
+			noter.load_notes_async(connection.notes_path, connection.separator, connection.notes_events)
+
+	def _receive_notes(self, connection):
+		"""Takes the notes of a connection once its loader is done"""
+		while True:
+			try:
+				event = connection.notes_events.get_nowait()
+			except queue.Empty:
+				return
+
+			if event[0] == "done":
+				connection.notes_events = None
+				connection.notes = event[1] or []
+				log.info("Loaded %d notes for %s from %s", len(connection.notes), connection.name,
+						 connection.notes_path)
+				connection._changed()
+				return
+
+	def _connect(self, connection, now):
+		"""Starts a non-blocking connect"""
+		connection.socket = socket.socket()
+		connection.socket.setblocking(False)
+		connection.connecting_since = now
+		try:
+			error = connection.socket.connect_ex((config.HOST, connection.port))
+		except OSError:
+			error = -1
+
+		if error not in CONNECT_PENDING:
+			self._close(connection)
+			connection.next_connect = now + self.interval
+			return
+
+		self.selector.register(connection.socket, selectors.EVENT_WRITE, connection)
+
+	def _handle(self, connection, events):
+		"""Handles a finished connect or a response"""
+		now = time.monotonic()
+
+		if not connection.connected:
+			error = connection.socket.getsockopt(socket.SOL_SOCKET, socket.SO_ERROR)
+			if error:
+				self._close(connection)
+				connection.next_connect = now + self.interval
+				return
+
+			connection.connected = True
+			self.selector.modify(connection.socket, selectors.EVENT_READ, connection)
+			con.CONNECTS.inc()
+			log.info("Connected to LiveSplit %s on port %s", connection.name, connection.port)
+			return
+
+		try:
+			data = connection.socket.recv(1000)
+		except (BlockingIOError, InterruptedError):
+			return
+		except OSError:
+			data = b""
+
+		if not data:
+			self._lost(connection, now)
+			return
+
+		connection.buffer += data
+		if connection.sent_at is None or b"\n" not in connection.buffer:
+			return  # Late answer to a request that timed out, or not complete yet
+
+		line = connection.buffer.split(b"\n", 1)[0]
+		connection.buffer = b""
+		con.REQUEST_SECONDS.observe(now - connection.sent_at)
+		connection.sent_at = None
+
+		try:
+			new_index = int(line.strip())
+		except ValueError:
+			con.REQUEST_FAILURES.inc()
+			return
+
+		if ls_poller.apply_split_index(connection.state, new_index):
+			connection._changed()
+
+	def _lost(self, connection, now):
+		"""Closes a connection that stopped working, it reconnects on a later tick"""
+		was_connected = connection.connected
+		self._close(connection)
+		connection.next_connect = now + self.interval
+
+		if was_connected:
+			con.DISCONNECTS.inc()
+			log.info("Lost connection to LiveSplit %s", connection.name)
+			if connection.state["timer_running"]:
+				connection.state["timer_running"] = False
+				connection.state["active_split"] = -1
+				connection._changed()
+
+	def _close(self, connection):
+		"""Closes the socket of a connection"""
+		if connection.socket is not None:
+			try:
+				self.selector.unregister(connection.socket)
+			except (KeyError, ValueError):
+				pass
+			con.close_socket(connection.socket)
+		connection.socket = None
+		connection.connected = False
+		connection.connecting_since = None
+		connection.sent_at = None
+		connection.buffer = b""
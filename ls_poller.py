@@ -0,0 +1,119 @@
+"""
+LiveSplit polling shared by the GUI and headless mode.
+Keeps the timer state in a runtime info dictionary up to date,
+callers decide how to display changes.
+"""
+import time
+
+import config
+import ls_connection as con
+
+
+def connect(ls_socket, server_port):
+	"""
+	Connects given socket to LiveSplit, blocking for at most COM_TIMEOUT.
+	Returns whether the connection was established.
+	"""
+	ls_socket.settimeout(config.COM_TIMEOUT)
+	try:
+		ls_socket.connect((config.HOST, server_port))
+	except OSError:
+		return False
+	finally:
+		ls_socket.settimeout(None)
+
+	con.CONNECTS.inc()
+	return True
+
+
+def poll_split_index(runtime_info, ls_socket):
+	"""
+	Asks LiveSplit for the active split and updates "active_split" and
+	"timer_running" in runtime_info.
+
+	Returns None if LiveSplit did not answer, otherwise whether
+	the displayed split or the timer state changed.
+	"""
+	new_index = con.get_split_index(ls_socket)
+
+	if isinstance(new_index, bool):
+		return None
+
+	return apply_split_index(runtime_info, new_index)
+
+
+def apply_split_index(runtime_info, new_index):
+	"""
+	Updates "active_split" and "timer_running" in runtime_info with
+	a split index received from LiveSplit.
+	Returns whether the displayed split or the timer state changed.
+	"""
+	if new_index == -1:
+		if runtime_info["timer_running"]:
+			runtime_info["timer_running"] = False
+			runtime_info["active_split"] = new_index
+			return True
+		return False
+
+	if not runtime_info["timer_running"]:
+		runtime_info["timer_running"] = True
+		if runtime_info["active_split"] == 0:
+			runtime_info["active_split"] = -1
+
+	if runtime_info["active_split"] != new_index:
+		runtime_info["active_split"] = new_index
+		return True
+
+	return False
+
+
+def poll_timer_source(arbiter, name, ls_socket):
+	"""
+	Polls LiveSplit as timer source name of given timer_arbiter.TimerArbiter.
+	Returns None if LiveSplit did not answer, otherwise whether the
+	displayed split or timer state changed.
+	"""
+	state = dict(arbiter.source(name, "livesplit").state)
+	if poll_split_index(state, ls_socket) is None:
+		return None
+
+	arbiter.report(name, "livesplit", state["active_split"], state["timer_running"])
+	return arbiter.resolve()
+
+
+def state_message(runtime_info):
+	"""Returns the state update sent to bridge clients"""
+	return {
+		'type': 'state_update',
+		'currentSplit': runtime_info["active_split"],
+		'timerRunning': runtime_info["timer_running"],
+		'totalSplits': len(runtime_info["notes"]),
+		'timestamp': time.time()
+	}
+
+
+def overlay_snapshot(runtime_info, typed):
+	"""Returns the state published to the overlay HTTP server"""
+	notes = runtime_info["notes"]
+	index = max(runtime_info["active_split"], 0)
+
+	if not notes:
+		note = config.DEFAULT_MSG
+	else:
+		note = notes[index] if index < len(notes) else ""
+
+	next_note = ""
+	if typed.double_layout and index + 1 < len(notes):
+		next_note = notes[index + 1]
+
+	return {
+		'currentSplit': runtime_info["active_split"],
+		'timerRunning': runtime_info["timer_running"],
+		'totalSplits': len(notes),
+		'note': note,
+		'nextNote': next_note,
+		'font': typed.font,
+		'fontSize': typed.font_size,
+		'textColor': typed.text_color,
+		'backgroundColor': typed.background_color
+	}
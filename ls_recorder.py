@@ -0,0 +1,167 @@
+"""
+Recording and replay of LiveSplit sessions.
+
+The recorder is hooked into ls_connection and appends every command and
+response with monotonic timestamps to a compact binary file, so sessions
+can be replayed without LiveSplit (see benchmarks/ls_replay.py).
+
+A file holds one or more sessions, each starts with a header:
+	magic (5 bytes), wall clock start time (f64)
+followed by records (network byte order):
+	time since session start (f64), response latency (f32),
+	command id (u8), response length (u16), response (UTF-8)
+A response length of 0xFFFF means LiveSplit did not answer.
+"""
+import bisect
+import struct
+import threading
+import time
+
+import config
+
+MAGIC = b"SNLS\x01"
+SESSION_HEADER = struct.Struct("!d")
+RECORD = struct.Struct("!dfBH")
+NO_RESPONSE = 0xFFFF
+
+# Command ids are the positions in config.LS_COMMANDS
+COMMAND_NAMES = list(config.LS_COMMANDS)
+COMMAND_IDS = {name: index for index, name in enumerate(COMMAND_NAMES)}
+
+
+class RecordingError(Exception):
+	"""Raised when a recording can not be read"""
+
+
+class SessionRecorder:
+	"""Appends command/response pairs to a recording file, safe to use from any thread"""
+
+	def __init__(self, path):
+		self.path = path
+		self.lock = threading.Lock()
+		self.start = time.monotonic()
+		self.records = 0
+		self.file = open(path, "ab")
+		self.file.write(MAGIC + SESSION_HEADER.pack(time.time()))
+		self.file.flush()
+
+	def record(self, command, response, sent, received):
+		"""
+		Appends one exchange. sent and received are time.monotonic() values,
+		response is False if LiveSplit did not answer.
+		"""
+		if response is False:
+			payload = b""
+			length = NO_RESPONSE
+		else:
+			payload = response.encode("utf-8")[:NO_RESPONSE - 1]
+			length = len(payload)
+
+		data = RECORD.pack(sent - self.start, received - sent, COMMAND_IDS[command], length) + payload
+
+		with self.lock:
+			if self.file:
+				# Flushed right away so a crash keeps everything up to the last poll
+				self.file.write(data)
+				self.file.flush()
+				self.records += 1
+
+	def close(self):
+		"""Closes the recording file"""
+		with self.lock:
+			if self.file:
+				self.file.close()
+				self.file = None
+
+
+def read_sessions(path):
+	"""
+	Reads a recording file.
+	Returns a list of (start wall clock time, records) for every session,
+	records are (time, latency, command name, response or False) tuples.
+	Raises RecordingError if the file is not a recording.
+	"""
+	with open(path, "rb") as recording:
+		data = recording.read()
+
+	sessions = []
+	offset = 0
+	header_size = len(MAGIC) + SESSION_HEADER.size
+
+	while offset < len(data):
+		if data[offset:offset + len(MAGIC)] == MAGIC:
+			if len(data) - offset < header_size:
+				break  # Truncated header
+			start, = SESSION_HEADER.unpack_from(data, offset + len(MAGIC))
+			sessions.append((start, []))
+			offset += header_size
+			continue
+
+		if not sessions:
+			raise RecordingError(f"{path} is not a LiveSplit recording")
+		if len(data) - offset < RECORD.size:
+			break  # Truncated record from an interrupted session
+
+		sent, latency, command_id, length = RECORD.unpack_from(data, offset)
+		offset += RECORD.size
+		size = 0 if length == NO_RESPONSE else length
+		if len(data) - offset < size or command_id >= len(COMMAND_NAMES):
+			break
+
+		response = False if length == NO_RESPONSE else data[offset:offset + size].decode("utf-8", "replace")
+		offset += size
+		sessions[-1][1].append((sent, latency, COMMAND_NAMES[command_id], response))
+
+	return sessions
+
+
+class SessionPlayer:
+	"""
+	Answers LiveSplit commands from recorded records.
+
+	In real time mode the response is the latest one recorded for the command
+	at the time since playback started (scaled by speed), including its latency.
+	Otherwise every call returns the next recorded response for the
+	command without waiting, finished is set once all are used.
+	"""
+
+	def __init__(self, records, realtime=True, speed=1.0):
+		self.realtime = realtime
+		self.speed = speed
+		self.start = time.monotonic()
+		self.finished = False
+		self.duration = records[-1][0] if records else 0.0
+		# Per command record times and records, for bisecting and for cursors
+		self.times = {}
+		self.records = {}
+		self.cursors = {}
+
+		for record in records:
+			self.times.setdefault(record[2], []).append(record[0])
+			self.records.setdefault(record[2], []).append(record)
+
+	def respond(self, command):
+		"""Returns the recorded response to command, False if there is none"""
+		records = self.records.get(command)
+		if not records:
+			return False
+
+		if self.realtime:
+			elapsed = (time.monotonic() - self.start) * self.speed
+			if elapsed > self.duration:
+				self.finished = True
+			index = max(0, bisect.bisect_right(self.times[command], elapsed) - 1)
+			_, latency, _, response = records[index]
+			if latency > 0:
+				time.sleep(min(latency, config.COM_TIMEOUT) / self.speed)
+			return response
+
+		index = self.cursors.get(command, 0)
+		if index >= len(records):
+			self.finished = True
+			return records[-1][3]
+
+		self.cursors[command] = index + 1
+		if all(self.cursors.get(name, 0) >= len(items) for name, items in self.records.items()):
+			self.finished = True
+		return records[index][3]
@@ -1,17 +1,31 @@
-import tkinter
-from tkinter import messagebox, ttk
-import json
-import socket
-import threading
 import time
-import os
-import sys
-import platform
 
-import config
-import ls_connection as con
-import note_reader as noter
-import setting_handler
+# Process start as seen by this module, used to measure time to first paint.
+# Taken before the other imports so their time is counted, hence the noqa: E402 below
+STARTUP_TIME = time.perf_counter()
+
+import tkinter  # noqa: E402
+import socket  # noqa: E402
+import logging  # noqa: E402
+import os  # noqa: E402
+import sys  # noqa: E402
+
+import config  # noqa: E402
+import ls_connection as con  # noqa: E402
+import log_handler  # noqa: E402
+import ls_poller  # noqa: E402
+import metrics  # noqa: E402
+import note_markup  # noqa: E402
+import note_reader as noter  # noqa: E402
+import note_slots  # noqa: E402
+import setting_handler  # noqa: E402
+import timer_arbiter  # noqa: E402
+
+RENDER_SECONDS = metrics.histogram("splitnotes_render_seconds", "Time to draw the notes and publish them to overlays")
+
+log = logging.getLogger(__name__)
+
+# json, messagebox, the bridge server and the overlay server are imported when first needed
 
 # Enhanced runtime info with bridge server capabilities
 runtime_info = {
@@ -22,15 +36,41 @@ runtime_info = {
 	"server_port": 0,
 	"force_reset": False,
 	"double_layout": False,
+	# Render slots of the main window, see note_slots
+	"note_slots": None,
+	# Images in notes shared by all windows, see note_images
+	"note_images": None,
 	"settings": {},
-	# Bridge server specific (TCP-based, no websockets)
+	"typed_settings": None,
+	# Bridge server specific (raw TCP and WebSocket clients)
 	"bridge_enabled": False,
 	"bridge_port": 16835,
 	"bridge_server": None,
-	"bridge_state": {}
+	"bridge_state": {},
+	"bridge_heartbeat": 0.0,
+	"bridge_alive": False,
+	"bridge_listener": None,
+	# Overlay HTTP server (notes and Server-Sent Events)
+	"http_enabled": False,
+	"http_port": config.HTTP_PORT,
+	"overlay_server": None,
+	# Startup timings in seconds since STARTUP_TIME
+	"startup_timings": {},
+	# Event queue of the notes file being loaded in the background
+	"notes_loader": None,
+	# Sampling profiler started from the popup menu
+	"profiler": None,
+	# Tk event loop stall detection, see stall_watchdog
+	"watchdog": None,
+	# Viewer windows sharing the notes and the timer state, see open_viewer
+	"viewers": [],
+	# Extra LiveSplit connections from the ls_connections setting, see ls_manager
+	"ls_manager": None,
+	"connection_panels": {}
 }
 
-root = tkinter.Tk()
+# Decides between LiveSplit desktop and bridge clients, sets "active_split" and "timer_running"
+runtime_info["timer_arbiter"] = timer_arbiter.TimerArbiter(runtime_info)
 
 # Cross-platform path handling
 if getattr(sys, 'frozen', False):
@@ -41,226 +81,29 @@ else:
 red_path = os.path.join(application_path, config.RESOURCE_FOLDER, config.ICONS["RED"])
 green_path = os.path.join(application_path, config.RESOURCE_FOLDER, config.ICONS["GREEN"])
 
-# Initialize icons
+# Icons, loaded by load_icons once the Tk root exists
 red_icon = None
 green_icon = None
 
-try:
-	if os.path.exists(red_path):
-		red_icon = tkinter.PhotoImage(file=red_path)
-	if os.path.exists(green_path):
-		green_icon = tkinter.PhotoImage(file=green_path)
-except Exception as e:
-	print(f"Warning: Could not load icons: {e}")
 
+def load_icons():
+	"""Loads the connection status icons"""
+	global red_icon, green_icon
 
-class BridgeServer:
-	"""TCP-based bridge server for browser extensions (replaces websockets)"""
-	
-	def __init__(self, port=16835):
-		self.port = port
-		self.host = 'localhost'
-		self.running = False
-		self.server_socket = None
-		self.clients = []
-		self.state_lock = threading.Lock()
-		self.server_thread = None
-		
-	def start(self):
-		"""Start the TCP bridge server"""
-		if self.running:
-			return True
-			
-		try:
-			self.server_socket = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
-			self.server_socket.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
-			self.server_socket.settimeout(1.0)  # Add timeout for clean shutdown
-			self.server_socket.bind((self.host, self.port))
-			self.server_socket.listen(5)
-			
-			self.running = True
-			
-			# Start server thread
-			self.server_thread = threading.Thread(target=self._server_loop, daemon=True)
-			self.server_thread.start()
-			
-			print(f"Bridge server started on {self.host}:{self.port}")
-			return True
-			
-		except Exception as e:
-			print(f"Failed to start bridge server: {e}")
-			self.running = False
-			if self.server_socket:
-				try:
-					self.server_socket.close()
-				except:
-					pass
-				self.server_socket = None
-			return False
-	
-	def stop(self):
-		"""Stop the bridge server"""
-		self.running = False
-		
-		# Close all client connections
-		for client in self.clients[:]:  # Copy list to avoid modification during iteration
-			try:
-				client.close()
-			except:
-				pass
-		self.clients.clear()
-		
-		# Close server socket
-		if self.server_socket:
-			try:
-				self.server_socket.close()
-			except:
-				pass
-			self.server_socket = None
-		
-		# Wait for server thread to finish
-		if self.server_thread and self.server_thread.is_alive():
-			self.server_thread.join(timeout=2.0)
-		
-		print("Bridge server stopped")
-	
-	def _server_loop(self):
-		"""Main server loop for accepting connections"""
-		while self.running:
-			try:
-				client, address = self.server_socket.accept()
-				print(f"Browser client connected from {address}")
-				
-				# Set client timeout
-				client.settimeout(30.0)
-				
-				self.clients.append(client)
-				client_thread = threading.Thread(
-					target=self._handle_client, 
-					args=(client, address), 
-					daemon=True
-				)
-				client_thread.start()
-				
-			except socket.timeout:
-				continue  # Normal timeout, check if still running
-			except Exception as e:
-				if self.running:
-					print(f"Error accepting connection: {e}")
-				break
-	
-	def _handle_client(self, client, address):
-		"""Handle individual client connections"""
-		try:
-			while self.running:
-				try:
-					data = client.recv(1024)
-					if not data:
-						break
-					
-					try:
-						# Parse JSON message from browser extension
-						message = json.loads(data.decode('utf-8'))
-						self._process_browser_message(message)
-						
-						# Send acknowledgment
-						response = {"status": "ok", "timestamp": time.time()}
-						client.send((json.dumps(response) + '\n').encode('utf-8'))
-						
-					except json.JSONDecodeError:
-						# Handle plain text commands if needed
-						command = data.decode('utf-8').strip()
-						print(f"Received plain text command: {command}")
-						
-				except socket.timeout:
-					continue
-				except Exception as e:
-					print(f"Error receiving from client {address}: {e}")
-					break
-					
-		except Exception as e:
-			print(f"Error handling client {address}: {e}")
-		finally:
-			try:
-				client.close()
-			except:
-				pass
-			if client in self.clients:
-				self.clients.remove(client)
-			print(f"Browser client {address} disconnected")
-	
-	def _process_browser_message(self, message):
-		"""Process JSON messages from browser extensions"""
-		with self.state_lock:
-			try:
-				if message.get('type') == 'timer_state':
-					# Update runtime info with browser state
-					old_split = runtime_info["active_split"]
-					old_running = runtime_info["timer_running"]
-					
-					runtime_info["timer_running"] = message.get('running', False)
-					runtime_info["active_split"] = message.get('currentSplit', -1)
-					
-					# Log changes for debugging
-					if old_split != runtime_info["active_split"]:
-						print(f"Browser sync: Split changed {old_split} -> {runtime_info['active_split']}")
-					
-					if old_running != runtime_info["timer_running"]:
-						print(f"Browser sync: Timer {'started' if runtime_info['timer_running'] else 'stopped'}")
-					
-					# Store bridge state
-					runtime_info["bridge_state"] = {
-						'timestamp': time.time(),
-						'currentSplit': runtime_info["active_split"],
-						'timerRunning': runtime_info["timer_running"],
-						'splitName': message.get('splitName', ''),
-						'source': 'browser'
-					}
-					
-				elif message.get('type') == 'splits_updated':
-					splits = message.get('splits', [])
-					print(f"Browser sync: Received {len(splits)} split names")
-					if 'bridge_state' not in runtime_info:
-						runtime_info["bridge_state"] = {}
-					runtime_info["bridge_state"]['splits'] = splits
-					
-			except Exception as e:
-				print(f"Error processing browser message: {e}")
-	
-	def send_state_to_browsers(self, state):
-		"""Send current state to all connected browser clients"""
-		if not self.clients:
-			return
-			
-		message = json.dumps(state) + '\n'
-		disconnected_clients = []
-		
-		for client in self.clients[:]:  # Copy list to avoid modification during iteration
-			try:
-				client.send(message.encode('utf-8'))
-			except:
-				disconnected_clients.append(client)
-		
-		# Remove disconnected clients
-		for client in disconnected_clients:
-			if client in self.clients:
-				self.clients.remove(client)
-	
-	def get_status(self):
-		"""Get bridge server status"""
-		return {
-			'running': self.running,
-			'port': self.port,
-			'clients': len(self.clients),
-			'last_state': runtime_info.get("bridge_state", {})
-		}
+	try:
+		if os.path.exists(red_path):
+			red_icon = tkinter.PhotoImage(file=red_path)
+		if os.path.exists(green_path):
+			green_icon = tkinter.PhotoImage(file=green_path)
+	except Exception as e:
+		log.warning("Could not load icons: %s", e)
 
 
 def menu_open_bridge_settings(root_wnd):
 	"""Open bridge server settings dialog with proper save button functionality"""
 	settings_wnd = tkinter.Toplevel(master=root_wnd)
 	settings_wnd.title("TCP Bridge Server Settings")
-	settings_wnd.geometry("520x500")
+	settings_wnd.geometry("520x580")
 	settings_wnd.resizable(False, False)
 	settings_wnd.transient(root_wnd)
 	settings_wnd.grab_set()
@@ -268,7 +111,7 @@ def menu_open_bridge_settings(root_wnd):
 	# Center window
 	settings_wnd.update_idletasks()
 	x = (settings_wnd.winfo_screenwidth() // 2) - (520 // 2)
-	y = (settings_wnd.winfo_screenheight() // 2) - (500 // 2)
+	y = (settings_wnd.winfo_screenheight() // 2) - (580 // 2)
 	settings_wnd.geometry(f"+{x}+{y}")
 	
 	# Main container
@@ -280,9 +123,11 @@ def menu_open_bridge_settings(root_wnd):
 	settings_section.pack(fill='x', pady=(0, 10))
 	
 	# Load current settings from config file
-	current_settings = setting_handler.load_settings()
-	current_enabled = current_settings.get("bridge_enabled", "false").lower() == "true"
-	current_port = int(current_settings.get("bridge_port", "16835"))
+	current_settings = setting_handler.load_typed_settings()
+	current_enabled = current_settings.bridge_enabled
+	current_port = current_settings.bridge_port
+	current_http_enabled = current_settings.http_enabled
+	current_http_port = current_settings.http_port
 	
 	# Enable bridge checkbox
 	bridge_enabled_var = tkinter.BooleanVar(value=current_enabled)
@@ -320,6 +165,30 @@ def menu_open_bridge_settings(root_wnd):
 		wraplength=450
 	)
 	help_label.pack(anchor='w', padx=15, pady=(0, 10))
+
+	# Overlay HTTP server
+	http_enabled_var = tkinter.BooleanVar(value=current_http_enabled)
+	tkinter.Checkbutton(
+		settings_section,
+		text="Serve notes over HTTP for OBS browser sources",
+		variable=http_enabled_var,
+		font=config.GUI_FONT
+	).pack(anchor='w', padx=15, pady=(0, 5))
+
+	http_port_frame = tkinter.Frame(settings_section)
+	http_port_frame.pack(fill='x', padx=15, pady=5)
+
+	tkinter.Label(http_port_frame, text="HTTP Server Port:", font=config.GUI_FONT).pack(side='left')
+
+	http_port_var = tkinter.StringVar(value=str(current_http_port))
+	tkinter.Entry(http_port_frame, textvariable=http_port_var, font=config.GUI_FONT, width=8).pack(side='left', padx=(10, 5))
+
+	tkinter.Label(
+		http_port_frame,
+		text=f"(default: {config.HTTP_PORT})",
+		font=('Arial', 9),
+		fg='gray'
+	).pack(side='left')
 	
 	# Save button and feedback area
 	save_frame = tkinter.Frame(settings_section)
@@ -354,15 +223,22 @@ def menu_open_bridge_settings(root_wnd):
 				feedback_var.set(f"Error: {e}")
 				feedback_label.config(fg='red')
 				return
+
+			if not setting_handler.validate_bridge_port(http_port_var.get()):
+				feedback_var.set(f"Error: {config.ERRORS['HTTP_PORT'][1]}")
+				feedback_label.config(fg='red')
+				return
+			http_port = int(http_port_var.get())
+			http_enabled = http_enabled_var.get()
 			
 			# Get checkbox state
 			is_enabled = bridge_enabled_var.get()
 			
-			print(f"Saving bridge settings: enabled={is_enabled}, port={port}")
+			log.info("Saving bridge settings: enabled=%s, port=%s", is_enabled, port)
 			
 			# Stop existing server if running
 			if runtime_info.get("bridge_server"):
-				print("Stopping existing bridge server...")
+				log.info("Stopping existing bridge server")
 				runtime_info["bridge_server"].stop()
 				runtime_info["bridge_server"] = None
 			
@@ -372,21 +248,23 @@ def menu_open_bridge_settings(root_wnd):
 			
 			# Save to configuration file
 			settings = setting_handler.load_settings()
-			settings["bridge_enabled"] = "true" if is_enabled else "false"
+			settings["bridge_enabled"] = setting_handler.encode_boolean_setting(is_enabled)
 			settings["bridge_port"] = str(port)
+			settings["http_enabled"] = setting_handler.encode_boolean_setting(http_enabled)
+			settings["http_port"] = str(http_port)
 			setting_handler.save_settings(settings)
 			
-			print(f"Settings saved to config file: bridge_enabled={settings['bridge_enabled']}")
+			log.debug("Settings saved to config file: bridge_enabled=%s", settings['bridge_enabled'])
 			
 			# Start or stop server based on checkbox state
 			if is_enabled:
-				print(f"Starting TCP bridge server on port {port}...")
-				bridge_server = BridgeServer(port)
+				log.info("Starting TCP bridge server on port %s", port)
+				bridge_server = create_bridge_server(port)
 				if bridge_server.start():
 					runtime_info["bridge_server"] = bridge_server
 					feedback_var.set(f"✓ Settings saved! TCP Bridge server started on port {port}")
 					feedback_label.config(fg='green')
-					print("✓ Bridge server started successfully")
+					log.info("Bridge server started successfully")
 				else:
 					# Failed to start server, disable the setting
 					runtime_info["bridge_enabled"] = False
@@ -396,11 +274,19 @@ def menu_open_bridge_settings(root_wnd):
 					
 					feedback_var.set(f"✗ Failed to start server on port {port}. Settings disabled.")
 					feedback_label.config(fg='red')
-					print("✗ Failed to start bridge server")
+					log.error("Failed to start bridge server")
 			else:
 				feedback_var.set("✓ Settings saved! TCP Bridge server disabled")
 				feedback_label.config(fg='orange')
-				print("✓ Bridge server disabled")
+				log.info("Bridge server disabled")
+
+			# Restart overlay HTTP server with the new settings
+			stop_overlay_server()
+			runtime_info["http_enabled"] = http_enabled
+			runtime_info["http_port"] = http_port
+			if http_enabled and not start_overlay_server():
+				feedback_var.set(feedback_var.get() + f"\n✗ Failed to start HTTP server on port {http_port}")
+				feedback_label.config(fg='red')
 			
 			# Update main window title to reflect bridge status
 			try:
@@ -411,7 +297,7 @@ def menu_open_bridge_settings(root_wnd):
 		except Exception as e:
 			feedback_var.set(f"✗ Error saving settings: {e}")
 			feedback_label.config(fg='red')
-			print(f"Error in save_bridge_settings: {e}")
+			log.exception("Error in save_bridge_settings: %s", e)
 	
 	# Save button
 	save_button = tkinter.Button(
@@ -465,6 +351,7 @@ def menu_open_bridge_settings(root_wnd):
 Port: {status['port']}
 Connected Browsers: {status['clients']}
 Server Running: {status['running']}
+Rate Limited Messages: {status['dropped_messages']}
 
 Runtime Information:
 Bridge Enabled: {bridge_enabled}
@@ -479,7 +366,8 @@ bridge_port: {bridge_port}
 
 Connection Info:
 Browser extensions can connect to localhost:{bridge_port}
-Send JSON messages with timer state data"""
+Send JSON messages with timer state data
+{timer_status()}{connections_status()}{overlay_status()}{stall_status()}"""
 		else:
 			status_info = f"""TCP Bridge Server Status: STOPPED ✗
 Port: {bridge_port}
@@ -500,7 +388,8 @@ bridge_port: {bridge_port}
 To enable:
 1. Check 'Enable TCP Bridge Server' checkbox above
 2. Click 'Save Settings' button
-3. Verify status changes to 'RUNNING ✓'"""
+3. Verify status changes to 'RUNNING ✓'
+{timer_status()}{connections_status()}{overlay_status()}{stall_status()}"""
 		
 		status_text.insert(1.0, status_info)
 		status_text.config(state='disabled')
@@ -553,6 +442,7 @@ To enable:
 				"timestamp": time.time(),
 				"source": "settings_dialog"
 			}
+			import json
 			test_socket.send((json.dumps(test_message) + '\n').encode('utf-8'))
 			
 			# Wait for response
@@ -605,32 +495,8 @@ To enable:
 	# Info button for help
 	def show_help():
 		"""Show help information"""
-		help_text = """TCP Bridge Server Help:
-
-The TCP Bridge Server allows browser extensions to connect to SplitNotes and send timer state information from LiveSplit One.
-
-SETUP:
-1. Check 'Enable TCP Bridge Server' checkbox
-2. Set the port (default: 16835)
-3. Click 'Save Settings'
-4. Verify status shows 'RUNNING ✓'
-
-BROWSER EXTENSION:
-Browser extensions should connect to localhost:16835 and send JSON messages like:
-{
-  "type": "timer_state",
-  "running": true,
-  "currentSplit": 2,
-  "splitName": "Split Name"
-}
-
-TROUBLESHOOTING:
-• Make sure port is not blocked by firewall
-• Check that no other application is using the port
-• Use 'Test Connection' to verify server is working
-• Restart SplitNotes if server fails to start"""
-		
-		messagebox.showinfo("TCP Bridge Help", help_text)
+		from tkinter import messagebox
+		messagebox.showinfo("TCP Bridge Help", config.BRIDGE_OPTIONS["HELP_TEXT"])
 	
 	tkinter.Button(
 		button_frame,
@@ -667,60 +533,148 @@ def update(window, com_socket, text1, text2):
 		runtime_info["force_reset"] = False
 
 	elif not runtime_info["ls_connected"]:
-		# Check if we have browser state as fallback
-		if runtime_info["bridge_enabled"] and runtime_info.get("bridge_state"):
-			bridge_state = runtime_info["bridge_state"]
-			if time.time() - bridge_state.get('timestamp', 0) < 5:
-				if runtime_info["notes"]:
-					update_GUI(window, com_socket, text1, text2)
-		
+		# Browser state is pushed through bridge_state_changed,
+		# here we only notice when the heartbeat stops
+		alive = bridge_alive()
+		if alive != runtime_info["bridge_alive"]:
+			runtime_info["bridge_alive"] = alive
+			update_icon(False, window)
+
 		# Still try to connect to LiveSplit desktop
 		con.ls_connect(com_socket, server_found, window, runtime_info["server_port"])
 	else:
 		# LiveSplit desktop is connected, use normal logic
 		if runtime_info["notes"]:
-			new_index = con.get_split_index(com_socket)
+			changed = ls_poller.poll_timer_source(runtime_info["timer_arbiter"], config.LS_SOURCE, com_socket)
 
-			if isinstance(new_index, bool):
+			if changed is None:
 				com_socket = test_connection(com_socket, window, text1, text2)
-			else:
-				if new_index == -1:
-					if runtime_info["timer_running"]:
-						runtime_info["timer_running"] = False
-						runtime_info["active_split"] = new_index
-						update_GUI(window, com_socket, text1, text2)
-						notify_browsers_state_change()
-				else:
-					if not runtime_info["timer_running"]:
-						runtime_info["timer_running"] = True
-						if runtime_info["active_split"] == 0:
-							runtime_info["active_split"] = -1
-
-					if runtime_info["active_split"] != new_index:
-						runtime_info["active_split"] = new_index
-						update_GUI(window, com_socket, text1, text2)
-						notify_browsers_state_change()
+			elif changed:
+				update_GUI(window, com_socket, text1, text2)
+				notify_browsers_state_change()
 		else:
 			com_socket = test_connection(com_socket, window, text1, text2)
 
 	window.after(int(config.POLLING_TIME * 1000), update, window, com_socket, text1, text2)
 
 
+def bridge_alive():
+	"""Returns whether a browser client sent a heartbeat recently"""
+	if not runtime_info["bridge_enabled"]:
+		return False
+	return time.monotonic() - runtime_info["bridge_heartbeat"] < config.BRIDGE_HEARTBEAT_TIMEOUT
+
+
+def create_bridge_server(port):
+	"""Returns a bridge server that pushes browser state changes to the GUI"""
+	import bridge_server
+	return bridge_server.BridgeServer(port, runtime_info, on_change=runtime_info["bridge_listener"])
+
+
+def bridge_state_changed(window, text1, text2):
+	"""
+	Applies browser timer state to the GUI.
+	Runs on the Tk thread, scheduled with after_idle by the bridge server
+	when a browser heartbeat started or the timer arbiter changed the displayed state.
+	"""
+	alive = bridge_alive()
+	if alive != runtime_info["bridge_alive"]:
+		runtime_info["bridge_alive"] = alive
+		update_icon(False, window)
+
+	if runtime_info["notes"]:
+		update_GUI(window, None, text1, text2)
+
+
+def start_overlay_server():
+	"""Starts the overlay HTTP server on the configured port, returns success"""
+	import overlay_server
+	server = overlay_server.OverlayServer(runtime_info["http_port"])
+	if not server.start():
+		return False
+
+	runtime_info["overlay_server"] = server
+	publish_overlay_state()
+	return True
+
+
+def stop_overlay_server():
+	"""Stops the overlay HTTP server if it is running"""
+	if runtime_info.get("overlay_server"):
+		runtime_info["overlay_server"].stop()
+		runtime_info["overlay_server"] = None
+
+
+def stall_status():
+	"""Returns a status text for event loop stalls"""
+	watchdog = runtime_info.get("watchdog")
+	if not watchdog:
+		return ""
+
+	status = watchdog.get_status()
+	text = f"\nUI Stalls: {status['stalls']} (longest {status['longest'] * 1000:.0f} ms)"
+	last = status['last']
+	if last:
+		text += f"\nLast Stall: {last.duration * 1000:.0f} ms at {time.strftime('%H:%M:%S', time.localtime(last.started))}"
+		if status['last_location']:
+			text += f" in {status['last_location']}"
+	return text
+
+
+def timer_status():
+	"""Returns a status text for the timer sources"""
+	sources = runtime_info["timer_arbiter"].get_status()
+	text = f"\nTimer Source: {runtime_info['timer_source'] or 'none'}"
+	for source in sources:
+		health = "ok" if source['healthy'] else f"stale {source['age']:.0f} s"
+		running = "running" if source['timerRunning'] else "stopped"
+		text += (f"\n  {'*' if source['selected'] else ' '} {source['name']} (priority {source['priority']}, "
+				 f"{health}): split {source['currentSplit']}, {running}")
+	return text
+
+
+def connections_status():
+	"""Returns a status text for the extra LiveSplit connections"""
+	manager = runtime_info.get("ls_manager")
+	if not manager:
+		return ""
+
+	text = ""
+	for connection in manager.get_status():
+		state = "connected" if connection['connected'] else "not connected"
+		running = "running" if connection['timerRunning'] else "stopped"
+		text += (f"\nLiveSplit {connection['name']}: {state}, split {connection['currentSplit']}, {running}, "
+				 f"{connection['notes']} notes")
+	return text
+
+
+def overlay_status():
+	"""Returns a status text for the overlay HTTP server"""
+	server = runtime_info.get("overlay_server")
+	if not server:
+		return "\nOverlay HTTP Server: STOPPED"
+
+	status = server.get_status()
+	return (f"\nOverlay HTTP Server: RUNNING on http://localhost:{status['port']}/\n"
+			f"Overlay Clients: {status['clients']} ({status['streams']} streaming)")
+
+
+def publish_overlay_state():
+	"""Hands the displayed notes to the overlay HTTP server, it only pushes changes"""
+	server = runtime_info.get("overlay_server")
+	if not server:
+		return
+
+	server.publish(ls_poller.overlay_snapshot(runtime_info, runtime_info["typed_settings"]))
+
+
 def notify_browsers_state_change():
 	"""Notify browser extensions of state changes via TCP"""
 	if runtime_info["bridge_enabled"] and runtime_info.get("bridge_server"):
-		state = {
-			'type': 'state_update',
-			'currentSplit': runtime_info["active_split"],
-			'timerRunning': runtime_info["timer_running"],
-			'totalSplits': len(runtime_info["notes"]),
-			'timestamp': time.time()
-		}
-		
 		try:
-			runtime_info["bridge_server"].send_state_to_browsers(state)
+			runtime_info["bridge_server"].send_state_to_browsers(ls_poller.state_message(runtime_info))
 		except Exception as e:
-			print(f"Error notifying browsers: {e}")
+			log.exception("Error notifying browsers: %s", e)
 
 
 def update_GUI(window, com_socket, text1, text2):
@@ -731,16 +685,33 @@ def update_GUI(window, com_socket, text1, text2):
 		index = 0
 
 	if runtime_info["timer_running"]:
-		split_name = con.get_split_name(com_socket) if runtime_info["ls_connected"] else ""
+		source = runtime_info["timer_arbiter"].current()
+		if source is None:
+			split_name = ""
+		elif source.kind == "livesplit":
+			split_name = con.get_split_name(com_socket)
+		else:
+			split_name = source.split_name
 	else:
 		split_name = False
 
+	# Placeholder values, the timer is only requested if a shown note uses it
+	values = {
+		"split_name": split_name or "",
+		"timer": lambda: (con.get_current_time(com_socket) if com_socket and runtime_info["ls_connected"] else "") or ""
+	}
+
+	start = time.perf_counter()
 	if runtime_info["notes"]:
 		set_title_notes(window, index, split_name)
-		update_notes(text1, text2, index)
+		runtime_info["note_slots"].show(runtime_info["notes"], index, values)
 	else:
 		update_title(config.DEFAULT_WINDOW["TITLE"], window)
 
+	update_viewers(values)
+	publish_overlay_state()
+	RENDER_SECONDS.observe(time.perf_counter() - start)
+
 
 def test_connection(com_socket, window, text1, text2):
 	"""Runs a connection test to LiveSplit desktop"""
@@ -752,10 +723,16 @@ def test_connection(com_socket, window, text1, text2):
 
 def reset_connection(com_socket, window, text1, text2):
 	"""Resets LiveSplit desktop connection"""
-	if runtime_info["timer_running"]:
+	# A bridge client takes over if there is one, otherwise the timer is shown stopped
+	arbiter = runtime_info["timer_arbiter"]
+	arbiter.disconnect(config.LS_SOURCE)
+	arbiter.resolve()
+	if arbiter.current() is None and runtime_info["timer_running"]:
 		runtime_info["timer_running"] = False
 		runtime_info["active_split"] = -1
 
+	if runtime_info["ls_connected"]:
+		con.DISCONNECTS.inc()
 	runtime_info["ls_connected"] = False
 
 	update_icon(False, window)
@@ -774,11 +751,7 @@ def server_found(window):
 def update_icon(active, window):
 	"""Updates icon with TCP bridge server status consideration"""
 	try:
-		bridge_active = (runtime_info["bridge_enabled"] and 
-						runtime_info.get("bridge_state") and
-						time.time() - runtime_info["bridge_state"].get('timestamp', 0) < 10)
-		
-		if (active or bridge_active) and green_icon:
+		if (active or bridge_alive()) and green_icon:
 			window.iconphoto(False, green_icon)
 		elif red_icon:
 			window.iconphoto(False, red_icon)
@@ -797,31 +770,28 @@ def update_title(name, window):
 	window.wm_title(title)
 
 
-def adjust_content(window, box1, box2):
-	"""Adjusts content layout"""
-	if runtime_info["double_layout"]:
-		set_double_layout(window, box1, box2)
-	else:
-		set_single_layout(window, box1, box2)
+def adjust_content():
+	"""Adjusts content layout to the window size"""
+	runtime_info["note_slots"].place()
 
 
-def set_double_layout(window, box1, box2):
-	"""Configures boxes for double layout"""
+def set_double_layout():
+	"""Configures slots for double layout, the current split and the next lookahead splits"""
 	runtime_info["double_layout"] = True
+	runtime_info["note_slots"].place(layout_slots("double"))
 
-	w_width = window.winfo_width()
-	w_height = window.winfo_height()
 
-	box1.place(height=(w_height // 2), width=w_width)
-	box2.place(height=(w_height // 2), width=w_width, y=(w_height // 2))
-
-
-def set_single_layout(window, box1, box2):
-	"""Configures boxes for single layout"""
+def set_single_layout():
+	"""Configures slots for single layout"""
 	runtime_info["double_layout"] = False
+	runtime_info["note_slots"].place(layout_slots("single"))
 
-	box2.place_forget()
-	box1.place(height=window.winfo_height(), width=window.winfo_width())
+
+def layout_slots(layout):
+	"""Returns the number of slots shown by a layout of config.VIEWER_LAYOUTS"""
+	if layout == "double":
+		return 1 + runtime_info["typed_settings"].lookahead
+	return 1
 
 
 def show_popup(event, menu):
@@ -844,7 +814,9 @@ def load_notes(window, text1, text2, com_socket):
 	if file:
 		notes = noter.get_notes(file, runtime_info["settings"]["separator"])
 		if notes:
+			runtime_info["notes_loader"] = None
 			runtime_info["notes"] = notes
+			runtime_info["note_images"].clear()
 
 			settings = setting_handler.load_settings()
 			settings["notes"] = file
@@ -864,35 +836,13 @@ def load_notes(window, text1, text2, com_socket):
 def show_info(info, warning=False):
 	"""Displays info popup"""
 	try:
+		from tkinter import messagebox
 		if warning:
 			messagebox.showwarning(info[0], info[1])
 		else:
 			messagebox.showinfo(info[0], info[1])
 	except Exception:
-		print(f"Info: {info[1]}")
-
-
-def update_notes(text1, text2, index):
-	"""Displays notes with given index"""
-	max_index = len(runtime_info["notes"]) - 1
-
-	if index < 0:
-		index = 0
-
-	text1.config(state=tkinter.NORMAL)
-	text2.config(state=tkinter.NORMAL)
-
-	text1.delete("1.0", tkinter.END)
-	text2.delete("1.0", tkinter.END)
-
-	if index <= max_index:
-		text1.insert(tkinter.END, runtime_info["notes"][index])
-
-		if index < max_index:
-			text2.insert(tkinter.END, runtime_info["notes"][index + 1])
-
-	text1.config(state=tkinter.DISABLED)
-	text2.config(state=tkinter.DISABLED)
+		log.info("Info: %s", info[1])
 
 
 def right_arrow(window, com_socket, text1, text2):
@@ -941,35 +891,39 @@ def set_title_notes(window, index, split_name=False):
 	update_title(title, window)
 
 
-def menu_open_settings(root_wnd, box1, box2, text1, text2, com_socket):
+def menu_open_settings(root_wnd, text1, text2, com_socket):
 	"""Opens the settings menu"""
 	setting_handler.edit_settings(root_wnd,
 								  lambda settings: apply_settings(settings,
 																   root_wnd,
-																   box1, box2,
 																   text1, text2, com_socket))
 
 
-def apply_settings(settings, window, box1, box2, text1, text2, com_socket):
+def apply_settings(settings, window, text1, text2, com_socket):
 	"""Applies settings to the application"""
+	typed = setting_handler.typed_settings(settings)
 	runtime_info["settings"] = settings
+	runtime_info["typed_settings"] = typed
+	log_handler.apply_levels(typed)
 
 	# Server port change
-	if runtime_info["server_port"] != int(settings["server_port"]):
-		runtime_info["server_port"] = int(settings["server_port"])
+	if runtime_info["server_port"] != typed.server_port:
+		runtime_info["server_port"] = typed.server_port
 		runtime_info["force_reset"] = True
 
-	text_font = (settings["font"], int(settings["font_size"]))
+	text_font = (typed.font, typed.font_size)
 
-	if setting_handler.decode_boolean_setting(settings["double_layout"]):
-		set_double_layout(window, box1, box2)
+	if typed.double_layout:
+		set_double_layout()
 	else:
-		set_single_layout(window, box1, box2)
+		set_single_layout()
 
-	text1.config(font=text_font)
-	text2.config(font=text_font)
-	text1.config(fg=settings["text_color"], bg=settings["background_color"])
-	text2.config(fg=settings["text_color"], bg=settings["background_color"])
+	for text in runtime_info["note_slots"].texts():
+		text.config(font=text_font, fg=typed.text_color, bg=typed.background_color)
+		note_markup.configure_tags(text, text_font)
+	publish_overlay_state()
+	apply_viewers(window)
+	apply_extra_connections(window)
 
 	old_note_length = len(runtime_info["notes"])
 
@@ -978,6 +932,7 @@ def apply_settings(settings, window, box1, box2, text1, text2, com_socket):
 
 		if new_notes:
 			runtime_info["notes"] = new_notes
+			runtime_info["note_images"].clear()
 
 			new_note_length = len(new_notes)
 
@@ -1001,6 +956,252 @@ def save_geometry_settings(width, height):
 	setting_handler.save_settings(settings)
 
 
+def menu_profile(root_wnd):
+	"""Records a profile of all threads, a popup shows the file once written"""
+	import profiler
+
+	if runtime_info["profiler"] and runtime_info["profiler"].is_running():
+		show_info(("Profiler", "A profile is already being recorded."))
+		return
+
+	def on_done(path):
+		if path:
+			info = ("Profile Recorded", f"Profile written to:\n{path}")
+		else:
+			info = config.ERRORS["PROFILE"]
+		try:
+			root_wnd.after_idle(show_info, info, not path)
+		except (RuntimeError, tkinter.TclError):
+			pass  # Main loop not running (anymore)
+
+	runtime_info["profiler"] = profiler.SamplingProfiler(on_done=on_done)
+	runtime_info["profiler"].start()
+	show_info(("Profiler", f"Recording a profile for {config.PROFILER_DURATION} seconds."))
+
+
+def apply_viewers(root_wnd):
+	"""
+	Opens the viewer windows of the settings, reopening them if the setting changed,
+	and applies lookahead, font and colors to all viewers.
+	"""
+	typed = runtime_info["typed_settings"]
+	from_settings = [viewer for viewer in runtime_info["viewers"] if viewer["spec"]]
+
+	if [viewer["spec"] for viewer in from_settings] != typed.viewers:
+		for viewer in from_settings:
+			close_viewer(viewer)
+		for spec in typed.viewers:
+			open_viewer(root_wnd, spec)
+
+	text_font = (typed.font, typed.font_size)
+	for viewer in runtime_info["viewers"]:
+		viewer["slots"].place(layout_slots(viewer["layout"]))
+		for text in viewer["slots"].texts():
+			text.config(font=text_font, fg=typed.text_color, bg=typed.background_color)
+			note_markup.configure_tags(text, text_font)
+
+
+def open_viewer(root_wnd, spec=None, layout="single"):
+	"""
+	Opens a viewer window showing the loaded notes with its own layout, see config.VIEWER_LAYOUTS.
+	spec is the (layout, width, height) entry of the viewers setting, None when opened from the menu.
+	"""
+	typed = runtime_info["typed_settings"]
+	if spec:
+		layout, width, height = spec
+	else:
+		width = height = None
+
+	window = tkinter.Toplevel(master=root_wnd)
+	window.geometry(f"{width or typed.width}x{height or typed.height}")
+	window.minsize(100, 50)
+
+	slots = note_slots.NoteSlots(window, [], lambda: create_notes_box(window, runtime_info["typed_settings"]),
+								 runtime_info["note_images"])
+	viewer = {"spec": spec, "layout": layout, "window": window, "slots": slots, "title": None}
+	runtime_info["viewers"].append(viewer)
+
+	popup = tkinter.Menu(window, tearoff=0)
+	for layout_name, option in zip(config.VIEWER_LAYOUTS, ("SINGLE", "DOUBLE", "NEXT")):
+		popup.add_command(label=config.MENU_OPTIONS[option],
+						  command=lambda layout_name=layout_name: set_viewer_layout(viewer, layout_name))
+
+	window.bind("<Configure>", lambda e: adjust_viewer(viewer) if e.widget == window else None)
+	if config.IS_MACOS:
+		window.bind("<Button-2>", lambda e: show_popup(e, popup))
+		window.bind("<Control-Button-1>", lambda e: show_popup(e, popup))
+	else:
+		window.bind("<Button-3>", lambda e: show_popup(e, popup))
+	window.protocol("WM_DELETE_WINDOW", lambda: close_viewer(viewer))
+
+	set_viewer_layout(viewer, layout)
+	return viewer
+
+
+def set_viewer_layout(viewer, layout):
+	"""Changes the layout of a viewer window"""
+	viewer["layout"] = layout
+	viewer["slots"].place(layout_slots(layout))
+	render_viewer(viewer)
+
+
+def adjust_viewer(viewer):
+	"""Places the slots of a viewer window for its size"""
+	viewer["slots"].place()
+
+
+def render_viewer(viewer, values=None):
+	"""
+	Shows the notes of the active split in a viewer window, only redraws what changed.
+	values are the placeholder values, see note_markup.render.
+	"""
+	notes = runtime_info["notes"]
+	index = max(runtime_info["active_split"], 0)
+	if viewer["layout"] == "next":
+		index += 1
+	# Without notes (unloaded or failed to load) the slots are cleared
+	viewer["slots"].show(notes, index, values)
+
+	title = config.DEFAULT_WINDOW["TITLE"]
+	if notes:
+		title += f" - {min(index, len(notes) - 1) + 1}"
+	if runtime_info["timer_running"]:
+		title += " - " + config.RUNNING_ALERT
+	if viewer["title"] != title:
+		viewer["title"] = title
+		update_title(title, viewer["window"])
+
+
+def images_ready():
+	"""Shows images of the notes that finished loading in all windows"""
+	runtime_info["note_slots"].refresh()
+	for viewer in runtime_info["viewers"]:
+		viewer["slots"].refresh()
+
+
+def update_viewers(values=None):
+	"""Redraws viewer windows after a change of the notes or the timer state"""
+	for viewer in runtime_info["viewers"]:
+		render_viewer(viewer, values)
+
+
+def close_viewer(viewer):
+	"""Closes a viewer window"""
+	if viewer in runtime_info["viewers"]:
+		runtime_info["viewers"].remove(viewer)
+	try:
+		viewer["window"].destroy()
+	except tkinter.TclError:
+		pass
+
+
+def apply_extra_connections(root_wnd):
+	"""
+	Opens a panel for every extra LiveSplit connection in the settings and closes
+	the panels of connections that were removed. All connections are polled by one
+	ls_manager.ConnectionManager, started with the first one.
+	"""
+	typed = runtime_info["typed_settings"]
+	panels = runtime_info["connection_panels"]
+	wanted = {str(port): (port, notes_path) for port, notes_path in typed.ls_connections}
+
+	for name in list(panels):
+		if wanted.get(name) != panels[name]["config"]:
+			close_connection_panel(name)
+
+	if not wanted:
+		return
+
+	import ls_manager
+	if not runtime_info["ls_manager"]:
+		runtime_info["ls_manager"] = ls_manager.ConnectionManager()
+		runtime_info["ls_manager"].start()
+
+	for name, (port, notes_path) in wanted.items():
+		if name not in panels:
+			open_connection_panel(root_wnd, name, port, notes_path)
+
+	# Settings shared with the main window
+	text_font = (typed.font, typed.font_size)
+	for panel in panels.values():
+		panel["text"].config(font=text_font, fg=typed.text_color, bg=typed.background_color)
+
+
+def open_connection_panel(root_wnd, name, port, notes_path):
+	"""Opens the window showing the notes of one extra LiveSplit connection"""
+	import ls_manager
+	typed = runtime_info["typed_settings"]
+
+	window = tkinter.Toplevel(master=root_wnd)
+	window.geometry(f"{typed.width}x{typed.height}")
+	window.minsize(300, 200)
+
+	scroll = tkinter.Scrollbar(window, width=config.SCROLLBAR_WIDTH)
+	scroll.pack(side=tkinter.RIGHT, fill=tkinter.Y)
+	text = tkinter.Text(window, yscrollcommand=scroll.set, wrap=tkinter.WORD, cursor="arrow")
+	text.insert(tkinter.END, config.DEFAULT_MSG)
+	text.config(state=tkinter.DISABLED)
+	text.pack(fill=tkinter.BOTH, expand=True)
+	scroll.config(command=text.yview)
+
+	panel = {"config": (port, notes_path), "window": window, "text": text, "index": None}
+
+	# Called on the manager thread, the panel is redrawn on the Tk thread
+	def on_change(connection):
+		try:
+			root_wnd.after_idle(update_connection_panel, name, connection)
+		except (RuntimeError, tkinter.TclError):
+			pass  # Main loop not running (anymore)
+
+	panel["connection"] = ls_manager.LSConnection(name, port, notes_path, typed.separator, on_change)
+	runtime_info["connection_panels"][name] = panel
+	runtime_info["ls_manager"].add(panel["connection"])
+
+	window.protocol("WM_DELETE_WINDOW", lambda: close_connection_panel(name))
+	update_title(f"{config.DEFAULT_WINDOW['TITLE']} - {name}", window)
+
+
+def update_connection_panel(name, connection):
+	"""Shows the active note of an extra LiveSplit connection"""
+	panel = runtime_info["connection_panels"].get(name)
+	if not panel or panel["connection"] is not connection:
+		return  # Closed in the meantime
+
+	notes = connection.notes
+	index = max(connection.state["active_split"], 0)
+	if notes:
+		index = min(index, len(notes) - 1)
+		if panel["index"] != (index, len(notes)):
+			panel["index"] = (index, len(notes))
+			show_placeholder(panel["text"], notes[index])
+
+	title = f"{config.DEFAULT_WINDOW['TITLE']} - {name} - {index + 1}"
+	if connection.state["timer_running"]:
+		title += " - " + config.RUNNING_ALERT
+	update_title(title, panel["window"])
+
+
+def close_connection_panel(name):
+	"""Closes the panel of an extra LiveSplit connection and stops polling it"""
+	panel = runtime_info["connection_panels"].pop(name, None)
+	if not panel:
+		return
+
+	if runtime_info["ls_manager"]:
+		runtime_info["ls_manager"].remove(name)
+	try:
+		panel["window"].destroy()
+	except tkinter.TclError:
+		pass
+
+
+def stop_extra_connections():
+	"""Stops polling the extra LiveSplit connections"""
+	if runtime_info.get("ls_manager"):
+		runtime_info["ls_manager"].stop()
+		runtime_info["ls_manager"] = None
+
+
 def do_on_close(root_wnd):
 	"""Function called when main window is closed"""
 	try:
@@ -1011,6 +1212,10 @@ def do_on_close(root_wnd):
 	# Stop TCP bridge server
 	if runtime_info.get("bridge_server"):
 		runtime_info["bridge_server"].stop()
+
+	stop_overlay_server()
+	stop_extra_connections()
+	setting_handler.flush_settings()
 	
 	root_wnd.destroy()
 
@@ -1020,88 +1225,64 @@ def init_UI(root):
 	com_socket = con.init_socket()
 
 	# Load Settings (including bridge settings)
-	print("Loading SplitNotes settings...")
+	log.debug("Loading SplitNotes settings")
 	settings = setting_handler.load_settings()
-	runtime_info["server_port"] = int(settings["server_port"])
+	typed = setting_handler.load_typed_settings()
+	runtime_info["server_port"] = typed.server_port
 	runtime_info["settings"] = settings
+	runtime_info["typed_settings"] = typed
+	log_handler.apply_levels(typed)
 	
-	# Load TCP bridge settings with proper validation
-	print("Loading TCP bridge settings...")
-	bridge_enabled_str = settings.get("bridge_enabled", "false").lower().strip()
-	runtime_info["bridge_enabled"] = bridge_enabled_str == "true"
-	
-	try:
-		runtime_info["bridge_port"] = int(settings.get("bridge_port", "16835"))
-	except (ValueError, TypeError):
-		print("Invalid bridge port in settings, using default 16835")
-		runtime_info["bridge_port"] = 16835
-		# Update settings with correct port
-		settings["bridge_port"] = "16835"
-		setting_handler.save_settings(settings)
+	# Load TCP bridge settings, validated by the settings schema
+	runtime_info["bridge_enabled"] = typed.bridge_enabled
+	runtime_info["bridge_port"] = typed.bridge_port
 	
-	print(f"Bridge settings loaded: enabled={runtime_info['bridge_enabled']}, port={runtime_info['bridge_port']}")
+	log.debug("Bridge settings loaded: enabled=%s, port=%s", runtime_info['bridge_enabled'], runtime_info['bridge_port'])
 	
-	# Start TCP bridge server if enabled in settings
-	if runtime_info["bridge_enabled"]:
-		print(f"Bridge is enabled in config, starting TCP bridge server on port {runtime_info['bridge_port']}...")
-		bridge_server = BridgeServer(runtime_info["bridge_port"])
-		if bridge_server.start():
-			runtime_info["bridge_server"] = bridge_server
-			print("✓ TCP bridge server started successfully for browser extensions")
-		else:
-			print("✗ Failed to start TCP bridge server")
-			print("  This might be due to port already in use or firewall settings")
-			# Don't disable the setting here - let user handle it in settings dialog
-	else:
-		print("TCP bridge server is disabled in configuration")
-
 	# Graphical components
-	root.geometry(settings["width"] + "x" + settings["height"])
+	root.geometry(f"{typed.width}x{typed.height}")
 	root.minsize(300, 200)
 
-	box1 = tkinter.Frame(root)
-	box2 = tkinter.Frame(root)
-
-	scroll1 = tkinter.Scrollbar(box1, width=config.SCROLLBAR_WIDTH)
-	scroll2 = tkinter.Scrollbar(box2, width=config.SCROLLBAR_WIDTH)
-	scroll1.pack(side=tkinter.RIGHT, fill=tkinter.Y)
-	scroll2.pack(side=tkinter.RIGHT, fill=tkinter.Y)
-
-	text1 = tkinter.Text(
-		box1,
-		yscrollcommand=scroll1.set,
-		wrap=tkinter.WORD,
-		cursor="arrow"
-	)
-	text1.insert(tkinter.END, config.DEFAULT_MSG)
-	text1.config(state=tkinter.DISABLED)
-	text1.pack(fill=tkinter.BOTH, expand=True)
-
-	text2 = tkinter.Text(
-		box2,
-		yscrollcommand=scroll2.set,
-		wrap=tkinter.WORD,
-		cursor="arrow"
+	import note_images
+	runtime_info["note_images"] = note_images.ImageCache(
+		root,
+		lambda: os.path.dirname(setting_handler.load_settings()["notes"]),
+		on_ready=images_ready
 	)
-	text2.insert(tkinter.END, config.DEFAULT_MSG)
-	text2.config(state=tkinter.DISABLED)
-	text2.pack(fill=tkinter.BOTH, expand=True)
 
-	scroll1.config(command=text1.yview)
-	scroll2.config(command=text2.yview)
+	text1, text2 = create_note_slots(root, typed)
 
-	# Set font and color
-	text_font = (settings["font"], int(settings["font_size"]))
+	# Browser state changes are posted straight into the Tk event queue
+	def on_bridge_change():
+		try:
+			root.after_idle(bridge_state_changed, root, text1, text2)
+		except (RuntimeError, tkinter.TclError):
+			pass  # Main loop not running (anymore)
 
-	text1.config(font=text_font)
-	text2.config(font=text_font)
-	text1.config(fg=settings["text_color"], bg=settings["background_color"])
-	text2.config(fg=settings["text_color"], bg=settings["background_color"])
+	runtime_info["bridge_listener"] = on_bridge_change
 
-	if setting_handler.decode_boolean_setting(settings["double_layout"]):
-		set_double_layout(root, box1, box2)
+	# Start TCP bridge server if enabled in settings
+	if runtime_info["bridge_enabled"]:
+		log.info("Bridge is enabled in config, starting TCP bridge server on port %s", runtime_info['bridge_port'])
+		bridge_server = create_bridge_server(runtime_info["bridge_port"])
+		if bridge_server.start():
+			runtime_info["bridge_server"] = bridge_server
+			log.info("TCP bridge server started successfully for browser extensions")
+		else:
+			log.error("Failed to start TCP bridge server, the port might be in use or blocked by a firewall")
+			# Don't disable the setting here - let user handle it in settings dialog
 	else:
-		set_single_layout(root, box1, box2)
+		log.debug("TCP bridge server is disabled in configuration")
+
+	# Start overlay HTTP server if enabled in settings
+	runtime_info["http_enabled"] = typed.http_enabled
+	runtime_info["http_port"] = typed.http_port
+	if runtime_info["http_enabled"] and not start_overlay_server():
+		log.error("Failed to start overlay HTTP server on port %s", runtime_info['http_port'])
+
+	# Viewer windows and extra LiveSplit connections for relay and co-op races
+	apply_viewers(root)
+	apply_extra_connections(root)
 
 	# Create popup menu with TCP bridge settings
 	popup = tkinter.Menu(root, tearoff=0)
@@ -1111,28 +1292,28 @@ def init_UI(root):
 	)
 	popup.add_command(
 		label=config.MENU_OPTIONS["SETTINGS"],
-		command=lambda: menu_open_settings(root, box1, box2, text1, text2, com_socket)
+		command=lambda: menu_open_settings(root, text1, text2, com_socket)
 	)
 	popup.add_separator()
 	popup.add_command(
 		label="TCP Bridge Settings",
 		command=lambda: menu_open_bridge_settings(root)
 	)
+	popup.add_command(
+		label=config.MENU_OPTIONS["VIEWER"],
+		command=lambda: open_viewer(root)
+	)
+	popup.add_command(
+		label=config.MENU_OPTIONS["PROFILE"],
+		command=lambda: menu_profile(root)
+	)
 
 	# Set default window icon and title
 	update_icon(False, root)
 	update_title(config.DEFAULT_WINDOW["TITLE"], root)
 
-	# Check if notes can be loaded from settings
-	if settings["notes"] and noter.file_exists(settings["notes"]):
-		notes = noter.get_notes(settings["notes"], settings["separator"])
-
-		if notes:
-			runtime_info["notes"] = notes
-			update_GUI(root, com_socket, text1, text2)
-
 	# Event binds
-	root.bind("<Configure>", lambda e: adjust_content(root, box1, box2) if e.widget == root else None)
+	root.bind("<Configure>", lambda e: adjust_content() if e.widget == root else None)
 	
 	# Platform-specific right-click handling
 	if config.IS_MACOS:
@@ -1149,18 +1330,133 @@ def init_UI(root):
 
 	# Call update loop
 	update(root, com_socket, text1, text2)
+
+	# Notes are loaded by main once the window is on screen
+	runtime_info["startup_notes"] = lambda: load_startup_notes(root, com_socket, text1, text2)
 	
-	# Debug: Print final bridge status
 	bridge_running = runtime_info.get('bridge_server') is not None
-	print(f"Final bridge status: enabled={runtime_info['bridge_enabled']}, server_running={bridge_running}")
+	log.debug("Final bridge status: enabled=%s, server_running=%s", runtime_info['bridge_enabled'], bridge_running)
 	
 	if runtime_info['bridge_enabled'] and not bridge_running:
-		print("Warning: Bridge is enabled but server failed to start. Check TCP Bridge Settings.")
+		log.warning("Bridge is enabled but server failed to start. Check TCP Bridge Settings.")
+
+
+def load_startup_notes(root, com_socket, text1, text2):
+	"""
+	Starts loading the notes file from settings in the background, if there is one.
+	A placeholder is shown until the first note has been parsed.
+	"""
+	settings = setting_handler.load_settings()
+
+	if settings["notes"] and noter.file_exists(settings["notes"]):
+		import queue
+
+		events = queue.Queue()
+		runtime_info["notes_loader"] = events
+		show_placeholder(text1, config.NOTES_LOADING_TEXT.format(percent=0))
+		noter.load_notes_async(settings["notes"], settings["separator"], events)
+		root.after(int(config.NOTES_LOAD_POLL_TIME * 1000), poll_notes_loader, root, com_socket, text1, text2, events)
+
+
+def poll_notes_loader(window, com_socket, text1, text2, events):
+	"""Handles events from the background notes loader on the Tk thread"""
+	if runtime_info["notes_loader"] is not events:
+		return  # Replaced by notes loaded from the menu
+
+	progress = None
+	while not events.empty():
+		event = events.get_nowait()
+
+		if event[0] == "progress":
+			progress = event[1]
+
+		elif event[0] == "first_note":
+			runtime_info["notes"] = [event[1]]
+			update_GUI(window, com_socket, text1, text2)
+
+		elif event[0] == "done":
+			runtime_info["notes_loader"] = None
+			notes, timings = event[1], event[2]
+			runtime_info["notes"] = notes if notes else []
+			if not notes:
+				for text in runtime_info["note_slots"].texts():
+					show_placeholder(text, "")
+			mark_startup("notes_loaded")
+			log.info("Notes loaded: %d splits, read %.0f ms, parse %.0f ms",
+					 len(runtime_info['notes']), timings['read'] * 1000, timings['parse'] * 1000)
+			update_GUI(window, com_socket, text1, text2)
+			return
+
+	if progress is not None:
+		# The placeholder moves to the second slot once the first note is shown
+		text = config.NOTES_LOADING_TEXT.format(percent=progress)
+		show_placeholder(runtime_info["note_slots"].texts()[1 if runtime_info["notes"] else 0], text)
+
+	window.after(int(config.NOTES_LOAD_POLL_TIME * 1000), poll_notes_loader, window, com_socket, text1, text2, events)
+
+
+def create_note_slots(root, typed):
+	"""Creates the render slots of the main window in the layout of typed settings, returns the first two text boxes"""
+	box1, text1 = create_notes_box(root, typed)
+	box2, text2 = create_notes_box(root, typed)
+	runtime_info["note_slots"] = note_slots.NoteSlots(
+		root,
+		[(box1, text1), (box2, text2)],
+		lambda: create_notes_box(root, runtime_info["typed_settings"]),
+		runtime_info["note_images"]
+	)
+
+	if typed.double_layout:
+		set_double_layout()
+	else:
+		set_single_layout()
+	return text1, text2
+
+
+def create_notes_box(window, typed):
+	"""Returns a frame with a scrollable read-only text box for notes, in the font and colors of typed settings"""
+	box = tkinter.Frame(window)
+
+	scroll = tkinter.Scrollbar(box, width=config.SCROLLBAR_WIDTH)
+	scroll.pack(side=tkinter.RIGHT, fill=tkinter.Y)
+
+	text = tkinter.Text(
+		box,
+		yscrollcommand=scroll.set,
+		wrap=tkinter.WORD,
+		cursor="arrow"
+	)
+	text.insert(tkinter.END, config.DEFAULT_MSG)
+	text.config(state=tkinter.DISABLED)
+	text.pack(fill=tkinter.BOTH, expand=True)
+	scroll.config(command=text.yview)
+
+	text.config(font=(typed.font, typed.font_size), fg=typed.text_color, bg=typed.background_color)
+	note_markup.configure_tags(text, (typed.font, typed.font_size))
+	return box, text
+
+
+def show_placeholder(text_box, text):
+	"""Replaces the content of a notes box with given text"""
+	text_box.config(state=tkinter.NORMAL)
+	text_box.delete("1.0", tkinter.END)
+	text_box.insert(tkinter.END, text)
+	text_box.config(state=tkinter.DISABLED)
+
+
+def mark_startup(stage):
+	"""Records the time from module start to given startup stage"""
+	runtime_info["startup_timings"][stage] = time.perf_counter() - STARTUP_TIME
 
 
 def main():
 	"""Main entry point with TCP bridge server support"""
+	root = None
+	log_handler.start_logging()
 	try:
+		root = tkinter.Tk()
+		mark_startup("tk_ready")
+		load_icons()
 		root.title(config.DEFAULT_WINDOW["TITLE"])
 		
 		# Platform-specific optimizations
@@ -1172,23 +1468,51 @@ def main():
 		
 		# Initialize UI with TCP bridge server
 		init_UI(root)
-		
+		mark_startup("ui_ready")
+
+		# Show the window before reading the notes file
+		root.update()
+		mark_startup("first_paint")
+		log.info("Startup: %s", ", ".join(
+			f"{stage} {seconds * 1000:.0f} ms" for stage, seconds in runtime_info["startup_timings"].items()
+		))
+
+		runtime_info.pop("startup_notes")()
+
+		import stall_watchdog
+		runtime_info["watchdog"] = stall_watchdog.StallWatchdog(root)
+		runtime_info["watchdog"].start()
+
 		# Start the main loop
 		root.mainloop()
 		
 	except KeyboardInterrupt:
-		print("\nApplication interrupted by user")
+		log.info("Application interrupted by user")
 	except Exception as e:
-		print(f"An error occurred: {e}")
-		messagebox.showerror("Error", f"An unexpected error occurred:\n{e}")
+		log.exception("An error occurred: %s", e)
+		try:
+			from tkinter import messagebox
+			messagebox.showerror("Error", f"An unexpected error occurred:\n{e}")
+		except Exception:
+			pass
 	finally:
+		if runtime_info["watchdog"]:
+			runtime_info["watchdog"].stop()
+		# Write what the profiler has recorded so far
+		if runtime_info["profiler"]:
+			runtime_info["profiler"].stop()
 		# Clean up TCP bridge server
 		if runtime_info.get("bridge_server"):
 			runtime_info["bridge_server"].stop()
-		try:
-			root.destroy()
-		except:
-			pass
+		stop_overlay_server()
+		stop_extra_connections()
+		if runtime_info["note_images"]:
+			runtime_info["note_images"].stop()
+		if root:
+			try:
+				root.destroy()
+			except:
+				pass
 
 
 if __name__ == "__main__":
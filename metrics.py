@@ -0,0 +1,264 @@
+"""
+Metrics registry with counters, gauges and histograms,
+exported in the Prometheus text format.
+
+Updates never take a lock. Every thread gets its own cell the first time
+it touches a metric and only that thread writes to it, readers add up all
+cells when exporting. Only creating a cell takes a lock, once per thread.
+When a thread exits its cell is folded into a shared retired cell, so
+short-lived threads (one per bridge client) don't pile up cells.
+
+	POLLS = metrics.histogram("splitnotes_ls_poll_seconds", "LiveSplit poll latency")
+	POLLS.observe(0.002)
+	print(metrics.registry.export())
+"""
+import bisect
+import threading
+import weakref
+
+# Default histogram buckets in seconds, suited for latencies from 100 µs to 10 s
+DEFAULT_BUCKETS = (0.0001, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 10.0)
+
+
+class CellOwner:
+	"""Thread-local object whose finalizer retires the cell of its thread"""
+
+	__slots__ = ("__weakref__",)
+
+
+class Metric:
+	"""Base class handling the per-thread cells"""
+
+	kind = "untyped"
+
+	def __init__(self, name, help_text):
+		self.name = name
+		self.help = help_text
+		self._local = threading.local()
+		self._cells = {}  # id of the cell to the cell, of every live thread
+		self._retired = None  # Sum of the cells of exited threads
+		# Reentrant, a finalizer could run while its thread holds the lock
+		self._cells_lock = threading.RLock()
+
+	def _cell(self):
+		"""Returns the cell of the calling thread, creating it the first time"""
+		try:
+			return self._local.cell
+		except AttributeError:
+			cell = self._new_cell()
+			# Thread-local data is dropped when the thread exits, which runs the finalizer
+			owner = self._local.owner = CellOwner()
+			weakref.finalize(owner, self._retire, cell)
+			self._local.cell = cell
+			with self._cells_lock:
+				self._cells[id(cell)] = cell
+			return cell
+
+	def _new_cell(self):
+		return [0]
+
+	def _retire(self, cell):
+		"""Folds the cell of an exited thread into the retired cell"""
+		with self._cells_lock:
+			if self._retired is None:
+				self._retired = self._new_cell()
+			for index, value in enumerate(cell):
+				self._retired[index] += value
+			del self._cells[id(cell)]
+
+	def _all_cells(self):
+		with self._cells_lock:
+			cells = list(self._cells.values())
+			if self._retired is not None:
+				cells.append(list(self._retired))
+			return cells
+
+	def samples(self):
+		"""Returns (name suffix, labels, value) tuples for the export"""
+		return []
+
+
+class Counter(Metric):
+	"""Monotonically increasing count"""
+
+	kind = "counter"
+
+	def inc(self, amount=1):
+		"""Adds amount to the counter"""
+		try:
+			self._local.cell[0] += amount
+		except AttributeError:
+			self._cell()[0] += amount
+
+	def value(self):
+		"""Returns the current count"""
+		return sum(cell[0] for cell in self._all_cells())
+
+	def samples(self):
+		return [("", "", self.value())]
+
+
+class Gauge(Metric):
+	"""
+	Value that can go up and down.
+	Either set directly, or read from a function at export time.
+	"""
+
+	kind = "gauge"
+
+	def __init__(self, name, help_text, function=None):
+		super().__init__(name, help_text)
+		self.function = function
+		self.current = 0
+
+	def set(self, value):
+		"""Sets the gauge, the last write wins"""
+		self.current = value
+
+	def set_function(self, function):
+		"""Reads the gauge from given function from now on, None to go back to set values"""
+		self.function = function
+
+	def value(self):
+		"""Returns the current value"""
+		if self.function:
+			try:
+				return self.function()
+			except Exception:
+				return 0
+		return self.current
+
+	def samples(self):
+		return [("", "", self.value())]
+
+
+class Histogram(Metric):
+	"""Distribution of observed values in fixed buckets"""
+
+	kind = "histogram"
+
+	def __init__(self, name, help_text, buckets=DEFAULT_BUCKETS):
+		super().__init__(name, help_text)
+		self.buckets = tuple(sorted(buckets))
+
+	def _new_cell(self):
+		# One count per bucket plus +Inf, then the sum and the count
+		return [0] * (len(self.buckets) + 3)
+
+	def observe(self, value):
+		"""Records one observation"""
+		try:
+			cell = self._local.cell
+		except AttributeError:
+			cell = self._cell()
+		cell[bisect.bisect_left(self.buckets, value)] += 1
+		cell[-2] += value
+		cell[-1] += 1
+
+	def snapshot(self):
+		"""Returns the bucket counts (not cumulative), the sum and the count"""
+		totals = [0] * (len(self.buckets) + 3)
+		for cell in self._all_cells():
+			for index, value in enumerate(cell):
+				totals[index] += value
+		return totals[:-2], totals[-2], totals[-1]
+
+	def percentile(self, percent):
+		"""Returns the upper bound of the bucket holding given percentile, 0.0 without observations"""
+		counts, _, count = self.snapshot()
+		if not count:
+			return 0.0
+
+		target = count * percent / 100
+		seen = 0
+		for index, bucket_count in enumerate(counts):
+			seen += bucket_count
+			if seen >= target:
+				return self.buckets[index] if index < len(self.buckets) else float("inf")
+		return float("inf")
+
+	def samples(self):
+		counts, total, count = self.snapshot()
+		samples = []
+		cumulative = 0
+		for bound, bucket_count in zip(self.buckets + (float("inf"),), counts):
+			cumulative += bucket_count
+			samples.append(("_bucket", f'le="{format_value(bound)}"', cumulative))
+		samples.append(("_sum", "", total))
+		samples.append(("_count", "", count))
+		return samples
+
+
+def format_value(value):
+	"""Formats a sample value for the text format"""
+	if value == float("inf"):
+		return "+Inf"
+	if isinstance(value, float):
+		return repr(value)
+	return str(value)
+
+
+class Registry:
+	"""Collection of named metrics"""
+
+	def __init__(self):
+		self.metrics = {}
+		self.lock = threading.Lock()
+
+	def _get_or_create(self, cls, name, *args):
+		with self.lock:
+			metric = self.metrics.get(name)
+			if metric is None:
+				metric = cls(name, *args)
+				self.metrics[name] = metric
+			elif not isinstance(metric, cls):
+				raise ValueError(f"Metric {name} is already registered as a {metric.kind}")
+			return metric
+
+	def counter(self, name, help_text):
+		"""Returns the counter with given name, creating it if needed"""
+		return self._get_or_create(Counter, name, help_text)
+
+	def gauge(self, name, help_text, function=None):
+		"""Returns the gauge with given name, creating it if needed"""
+		return self._get_or_create(Gauge, name, help_text, function)
+
+	def histogram(self, name, help_text, buckets=DEFAULT_BUCKETS):
+		"""Returns the histogram with given name, creating it if needed"""
+		return self._get_or_create(Histogram, name, help_text, buckets)
+
+	def export(self):
+		"""Returns all metrics in the Prometheus text exposition format"""
+		with self.lock:
+			metrics = sorted(self.metrics.values(), key=lambda metric: metric.name)
+
+		lines = []
+		for metric in metrics:
+			lines.append(f"# HELP {metric.name} {metric.help}")
+			lines.append(f"# TYPE {metric.name} {metric.kind}")
+			for suffix, labels, value in metric.samples():
+				labels = "{" + labels + "}" if labels else ""
+				lines.append(f"{metric.name}{suffix}{labels} {format_value(value)}")
+
+		return "\n".join(lines) + "\n"
+
+	def dump(self, path):
+		"""Writes the export to given file"""
+		try:
+			with open(path, "w", encoding="utf-8") as dump_file:
+				dump_file.write(self.export())
+		except OSError as e:
+			# Imported here, the hot path modules using metrics don't need logging
+			import logging
+			logging.getLogger(__name__).error("Could not write metrics to %s: %s", path, e)
+
+
+# Registry of the application
+registry = Registry()
+
+counter = registry.counter
+gauge = registry.gauge
+histogram = registry.histogram
+
+# Content type of the export for HTTP responses
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
@@ -0,0 +1,200 @@
+"""
+Images in notes, written as {image=maps/castle.png} with a path relative
+to the notes file.
+
+Images are prepared before they are shown: a worker thread reads the file
+and works out how much it has to be scaled down to fit the text box width,
+then the Tk thread decodes and scales it in an idle callback. Tk can only create
+images on its own thread, and decodes PNG, GIF and PPM without extra
+packages. Images of the next splits are prefetched (see note_slots), so
+the decoding is done before the split that shows them.
+
+Scaled images are kept in an LRU cache bounded by their size in bytes,
+keyed by path and width. Widths are rounded down to config.IMAGE_WIDTH_STEP
+so small resizes still hit the cache.
+"""
+import base64
+import collections
+import logging
+import os
+import queue
+import struct
+import threading
+import tkinter
+
+import config
+
+log = logging.getLogger(__name__)
+
+
+def image_size(data):
+	"""Returns the (width, height) of PNG or GIF data from its header, None for other formats"""
+	if data[:8] == b"\x89PNG\r\n\x1a\n" and len(data) >= 24:
+		return struct.unpack(">II", data[16:24])
+	if data[:6] in (b"GIF87a", b"GIF89a") and len(data) >= 10:
+		return struct.unpack("<HH", data[6:10])
+	return None
+
+
+def scale_factors(image_width, width, max_subsample=config.IMAGE_MAX_SUBSAMPLE):
+	"""
+	Returns the (zoom, subsample) scaling an image at most width wide.
+	Tk only scales by whole factors, zooming a subsampled image scales by
+	a fraction so an image just too wide isn't cut to half its size.
+	"""
+	if image_width <= width:
+		return 1, 1
+
+	best = (1, -(-image_width // width))
+	best_width = -(-image_width // best[1])
+	for subsample in range(2, max_subsample + 1):
+		subsampled = -(-image_width // subsample)
+		zoom = width // subsampled
+		if 0 < zoom < subsample and subsampled * zoom > best_width:
+			best = (zoom, subsample)
+			best_width = subsampled * zoom
+	return best
+
+
+def read_image(path, width):
+	"""
+	Reads an image file, runs on the worker thread.
+	Returns the base64 data and the (zoom, subsample) to scale it by to fit width.
+	"""
+	with open(path, "rb") as image_file:
+		data = image_file.read()
+
+	size = image_size(data)
+	return base64.b64encode(data), scale_factors(size[0], width) if size else (1, 1)
+
+
+def scale(image, zoom, subsample):
+	"""Returns a copy of a PhotoImage scaled by zoom / subsample"""
+	# One copy does both, so the image is never zoomed to more than its final size
+	scaled = tkinter.PhotoImage(master=image.tk)
+	image.tk.call(scaled, "copy", image, "-subsample", subsample, subsample, "-zoom", zoom, zoom)
+	return scaled
+
+
+class ImageCache:
+	"""Scaled images of the notes, get and prefetch are called on the Tk thread"""
+
+	def __init__(self, root, base_dir, on_ready=None, max_bytes=config.IMAGE_CACHE_BYTES):
+		"""base_dir returns the directory relative image paths start from, on_ready is called when images were added"""
+		self.root = root
+		self.base_dir = base_dir
+		self.on_ready = on_ready
+		self.max_bytes = max_bytes
+		self.images = collections.OrderedDict()  # (path, width) to (image, bytes), least recently used first
+		self.size = 0
+		self.failed = set()
+		self.pending = set()
+		# Bumped by clear, images requested before are not added when they arrive
+		self.generation = 0
+		self.requests = queue.Queue()
+		self.ready_scheduled = False
+		self.thread = None
+
+	def get(self, path, width):
+		"""
+		Returns the image scaled to width, None while it is being prepared
+		or False if it can't be loaded. Missing images are requested.
+		"""
+		key = (self.resolve(path), width)
+		entry = self.images.get(key)
+		if entry:
+			self.images.move_to_end(key)
+			return entry[0]
+
+		if key[0] in self.failed:
+			return False
+		self.prefetch(path, width)
+		return None
+
+	def prefetch(self, path, width):
+		"""Prepares an image in the background if it isn't cached"""
+		key = (self.resolve(path), width)
+		if key in self.images or key in self.pending or key[0] in self.failed:
+			return
+
+		self.pending.add(key)
+		if self.thread is None:
+			self.thread = threading.Thread(target=self._worker, name="note_images", daemon=True)
+			self.thread.start()
+		self.requests.put((key, self.generation))
+
+	def resolve(self, path):
+		"""Returns the absolute path of an image"""
+		return os.path.normpath(os.path.join(self.base_dir(), path))
+
+	def clear(self):
+		"""Forgets all images, ex. when other notes are loaded"""
+		self.images.clear()
+		self.size = 0
+		self.failed.clear()
+		self.pending.clear()
+		self.generation += 1
+
+	def stop(self):
+		"""Stops the worker thread"""
+		if self.thread:
+			self.requests.put(None)
+			self.thread = None
+
+	def _worker(self):
+		while True:
+			request = self.requests.get()
+			if request is None:
+				return
+
+			key, generation = request
+			try:
+				result = read_image(*key)
+			except OSError as e:
+				log.warning("Could not read image %s: %s", key[0], e)
+				result = None
+
+			try:
+				self.root.after_idle(self._create, key, generation, result)
+			except (RuntimeError, tkinter.TclError):
+				return  # Main loop not running (anymore)
+
+	def _create(self, key, generation, result):
+		"""Decodes and scales an image on the Tk thread and adds it to the cache"""
+		if generation != self.generation:
+			return  # Requested for notes that were replaced since
+
+		self.pending.discard(key)
+		if result is None:
+			self.failed.add(key[0])
+		else:
+			data, (zoom, subsample) = result
+			try:
+				image = tkinter.PhotoImage(data=data)
+				if subsample > 1:
+					image = scale(image, zoom, subsample)
+			except tkinter.TclError as e:
+				log.warning("Could not decode image %s: %s", key[0], e)
+				self.failed.add(key[0])
+			else:
+				self._add(key, image)
+
+		# Images decoded in one go are shown with one redraw
+		if self.on_ready and not self.ready_scheduled:
+			self.ready_scheduled = True
+			self.root.after_idle(self._ready)
+
+	def _add(self, key, image):
+		"""Adds an image, evicting the least recently used ones above the byte limit"""
+		image_bytes = image.width() * image.height() * 4
+		self.images[key] = (image, image_bytes)
+		self.size += image_bytes
+
+		# Images still shown keep their own reference, evicting only drops the cache's
+		while self.size > self.max_bytes and len(self.images) > 1:
+			_, (_, evicted_bytes) = self.images.popitem(last=False)
+			self.size -= evicted_bytes
+
+	def _ready(self):
+		self.ready_scheduled = False
+		self.on_ready()
@@ -0,0 +1,180 @@
+"""
+Markup in notes, parsed once when the notes are loaded.
+
+	# Heading                    large bold line
+	## Subheading                 smaller bold line
+	**bold**                      bold text
+	{color=red}text{/color}       colored text, a color name or #RRGGBB
+	{{timer}}                     replaced when the note is shown, see PLACEHOLDERS
+	{image=maps/castle.png}       image relative to the notes file, see note_images
+
+A note with markup is a Note: the text without the markup, so every other
+consumer (overlay, bridge, headless) sees plain text, plus the spans of every
+tag grouped per tag as Tk text indexes. Rendering inserts the text and adds
+each tag with one tag_add call for all of its ranges. Notes without markup
+stay plain strings and render as before.
+"""
+# Placeholders replaced when a note is shown
+PLACEHOLDERS = ("timer", "split", "splits", "split_name")
+
+# Font size of headings relative to the notes font
+HEADING_SCALE = {"h1": 1.5, "h2": 1.25}
+
+# Markup tokens within a line, compiled with the first note that has markup
+TOKEN_PATTERN = r"\*\*|\{color=(#[0-9a-fA-F]{3,6}|[a-zA-Z ]+)\}|\{/color\}|\{\{(\w+)\}\}|\{image=([^}]+)\}"
+token_regex = None
+
+
+class Note(str):
+	"""
+	Note text without markup.
+	spans are (start, end, tag) tuples with character offsets into the text,
+	tag_ranges has the same spans as (tag, (start index, end index, ...)) for tag_add,
+	placeholders are (offset, name, tags) tuples in text order, images are
+	placeholders named "image:" followed by the path, images has just their paths.
+	"""
+
+	__slots__ = ("spans", "tag_ranges", "placeholders", "images")
+
+
+def compile_note(note):
+	"""Returns the note as a Note if it has markup, otherwise unchanged"""
+	if "*" not in note and "{" not in note and "#" not in note:
+		return note
+
+	global token_regex
+	if token_regex is None:
+		# Imported here, loading plain notes doesn't need re
+		import re
+		token_regex = re.compile(TOKEN_PATTERN)
+
+	text = []
+	length = 0
+	spans = []
+	placeholders = []
+
+	for line_index, line in enumerate(note.split("\n")):
+		if line_index:
+			text.append("\n")
+			length += 1
+
+		heading = None
+		if line.startswith("# "):
+			heading, line = "h1", line[2:]
+		elif line.startswith("## "):
+			heading, line = "h2", line[3:]
+
+		line_start = length
+		bold_start = None
+		colors = []  # Open (start, tag) colors, innermost last
+		position = 0
+
+		for match in token_regex.finditer(line):
+			text.append(line[position:match.start()])
+			length += match.start() - position
+			position = match.end()
+			token = match.group(0)
+
+			if token == "**":
+				if bold_start is None:
+					bold_start = length
+				else:
+					spans.append((bold_start, length, "bold"))
+					bold_start = None
+			elif match.group(1):
+				colors.append((length, "color:" + match.group(1).strip()))
+			elif token == "{/color}":
+				if colors:
+					start, tag = colors.pop()
+					spans.append((start, length, tag))
+			elif match.group(2) in PLACEHOLDERS:
+				tags = tuple(tag for _, tag in colors)
+				if bold_start is not None:
+					tags += ("bold",)
+				if heading:
+					tags += (heading,)
+				placeholders.append((length, match.group(2), tags))
+			elif match.group(3):
+				placeholders.append((length, "image:" + match.group(3).strip(), ()))
+			else:
+				# Unknown placeholder, kept as written
+				text.append(token)
+				length += len(token)
+
+		text.append(line[position:])
+		length += len(line) - position
+
+		# Markup left open ends with the line
+		if bold_start is not None:
+			spans.append((bold_start, length, "bold"))
+		for start, tag in colors:
+			spans.append((start, length, tag))
+		if heading:
+			spans.append((line_start, length, heading))
+
+	text = "".join(text)
+	if not spans and not placeholders and text == note:
+		return note
+
+	compiled = Note(text)
+	compiled.spans = tuple((start, end, tag) for start, end, tag in spans if start < end)
+	ranges = {}
+	for start, end, tag in compiled.spans:
+		ranges.setdefault(tag, []).extend((f"1.0 + {start} chars", f"1.0 + {end} chars"))
+	compiled.tag_ranges = tuple((tag, tuple(indexes)) for tag, indexes in ranges.items())
+	compiled.placeholders = tuple(placeholders)
+	compiled.images = tuple(name[6:] for _, name, _ in placeholders if name.startswith("image:"))
+	return compiled
+
+
+def configure_tags(text_box, font):
+	"""Configures the markup fonts of a text box for given (family, size) notes font"""
+	family, size = font
+	text_box.tag_configure("bold", font=(family, size, "bold"))
+	for tag, scale in HEADING_SCALE.items():
+		text_box.tag_configure(tag, font=(family, round(size * scale), "bold"))
+
+
+def render(text_box, note, values):
+	"""
+	Adds the markup of a note that was just inserted at the start of a text box.
+	values maps placeholder names to strings, or to functions returning one,
+	functions are only called if the note uses the placeholder.
+	Images are looked up with values["image"](path), which returns an image,
+	a text to show instead or None to leave the place empty.
+	"""
+	tag_ranges = getattr(note, "tag_ranges", None)
+	if tag_ranges is None:
+		return
+
+	for tag, indexes in tag_ranges:
+		if tag.startswith("color:"):
+			_configure_color(text_box, tag)
+		text_box.tag_add(tag, *indexes)
+
+	# Backwards, so inserting a value does not move the offsets still to come
+	for offset, name, tags in reversed(note.placeholders):
+		if name.startswith("image:"):
+			image = values["image"](name[6:]) if "image" in values else None
+			if isinstance(image, str):
+				text_box.insert(f"1.0 + {offset} chars", image, tags)
+			elif image:
+				text_box.image_create(f"1.0 + {offset} chars", image=image)
+			continue
+
+		value = values.get(name, "")
+		if callable(value):
+			value = value()
+		for tag in tags:
+			# The span of a tag holding only a placeholder is empty, configure it here
+			if tag.startswith("color:"):
+				_configure_color(text_box, tag)
+		text_box.insert(f"1.0 + {offset} chars", str(value or ""), tags)
+
+
+def _configure_color(text_box, tag):
+	"""Configures the color of a color tag, one call per tag and render"""
+	try:
+		text_box.tag_configure(tag, foreground=tag[6:])
+	except Exception:
+		pass  # Unknown color name, the text keeps the default color
@@ -1,7 +1,12 @@
-import tkinter.filedialog as file_dia
 import os.path as path
+import threading
+import time
 
 import config
+import metrics
+import note_markup
+
+LOAD_SECONDS = metrics.gauge("splitnotes_notes_load_seconds", "Time the last notes file took to load")
 
 """
 NOTE STANDARD FORMATTING
@@ -13,7 +18,8 @@ lines that start and end with [ ] are ignored for notes.
 these can be used for titles. 
 (ex. [Split1] is not included in notes)
 
-all other lines of text are added as notes
+all other lines of text are added as notes,
+with markup for headings, bold, colors and placeholders (see note_markup)
 """
 
 
@@ -24,41 +30,49 @@ def get_note_lines(file_path):
 	Returns false if file can not be read.
 	"""
 
+	notes_file = open_notes_file(file_path)
+	if notes_file is None:
+		return False
+
+	# read file line per line
+	f_lines = []
+	try:
+		with notes_file:
+			for line in notes_file:
+				f_lines.append(line)
+	except Exception:
+		return False
+
+	return f_lines
+
+
+def open_notes_file(file_path):
+	"""
+	Opens the notes file at given path for reading.
+	Returns None if the file is too big or can not be opened.
+	"""
+
 	# check so file isn't too big
 	try:
 		if path.getsize(file_path) > config.MAX_FILE_SIZE:
-			return False
+			return None
 	except:
-		return False
+		return None
 
 	try:
 		# Try different encodings for cross-platform compatibility
 		encodings = ['utf-8', 'utf-8-sig', 'latin-1', 'cp1252']
-		notes_file = None
-		
+
 		for encoding in encodings:
 			try:
-				notes_file = open(file_path, "r", encoding=encoding)
-				break
+				return open(file_path, "r", encoding=encoding)
 			except UnicodeDecodeError:
 				continue
-		
-		if notes_file is None:
-			return False
-			
-	except Exception:
-		return False
 
-	# read file line per line
-	f_lines = []
-	try:
-		with notes_file:
-			for line in notes_file:
-				f_lines.append(line)
 	except Exception:
-		return False
+		pass
 
-	return f_lines
+	return None
 
 
 def decode_notes(note_lines, separator):
@@ -67,6 +81,15 @@ def decode_notes(note_lines, separator):
 	Encodes given strings according to the note formatting.
 	Returns the list containing the notes for every split. 
 	"""
+	return list(iter_notes(note_lines, separator))
+
+
+def iter_notes(note_lines, separator):
+	"""
+	Generator version of decode_notes.
+	Yields the notes for every split as soon as they are complete,
+	note_lines can be any iterable of strings.
+	"""
 
 	# Check if newline is being used as separator
 	if separator == config.NEWLINE_CONSTANT:
@@ -88,7 +111,6 @@ def decode_notes(note_lines, separator):
 		# Remove trailing newline characters
 		return line.rstrip('\n\r')
 
-	note_list = []
 	cur_notes = ""
 
 	for line in note_lines:
@@ -97,12 +119,12 @@ def decode_notes(note_lines, separator):
 		if separator == "" and is_newline(line):
 			# Using newline as separator
 			if cur_notes.strip():
-				note_list.append(cur_notes.strip())
+				yield note_markup.compile_note(cur_notes.strip())
 				cur_notes = ""
 		elif separator != "" and is_separator(line):
 			# Using custom separator
 			if cur_notes.strip():
-				note_list.append(cur_notes.strip())
+				yield note_markup.compile_note(cur_notes.strip())
 				cur_notes = ""
 		else:
 			if not is_title(line):
@@ -112,9 +134,7 @@ def decode_notes(note_lines, separator):
 
 	# Add the last notes if any
 	if cur_notes.strip():
-		note_list.append(cur_notes.strip())
-
-	return note_list
+		yield note_markup.compile_note(cur_notes.strip())
 
 
 def get_notes(file_path, separator):
@@ -126,23 +146,96 @@ def get_notes(file_path, separator):
 	"""
 	if not file_exists(file_path):
 		return False
-		
+
+	start = time.perf_counter()
 	note_lines = get_note_lines(file_path)
 
 	if not note_lines:
 		return False
 
 	note_list = decode_notes(note_lines, separator)
+	LOAD_SECONDS.set(time.perf_counter() - start)
 
 	return note_list if note_list else False
 
 
+def load_notes_async(file_path, separator, events):
+	"""
+	Loads notes on a worker thread and returns the thread.
+	Progress is reported by putting tuples on the events queue:
+		("progress", percent) while the file is read
+		("first_note", note) as soon as the first note is parsed
+		("done", notes, timings) when finished, notes is False if the
+			file is empty or can't be loaded, timings has the
+			"read" and "parse" time in seconds
+	"""
+	thread = threading.Thread(
+		target=_load_notes_worker,
+		args=(file_path, separator, events),
+		daemon=True
+	)
+	thread.start()
+	return thread
+
+
+def _load_notes_worker(file_path, separator, events):
+	"""Reads and parses the notes file, reporting to the events queue"""
+	timings = {"read": 0.0, "parse": 0.0}
+	start = time.perf_counter()
+
+	notes_file = open_notes_file(file_path) if file_exists(file_path) else None
+	if notes_file is None:
+		events.put(("done", False, timings))
+		return
+
+	try:
+		size = max(1, path.getsize(file_path))
+	except OSError:
+		size = 1
+
+	def read_lines():
+		# Lines are read in batches to keep timing and progress cheap,
+		# characters are counted instead of bytes which is close enough for progress
+		read = 0
+		percent = 0
+		with notes_file:
+			while True:
+				read_start = time.perf_counter()
+				lines = notes_file.readlines(config.NOTES_READ_BATCH_SIZE)
+				timings["read"] += time.perf_counter() - read_start
+				if not lines:
+					return
+
+				read += sum(map(len, lines))
+				new_percent = min(99, read * 100 // size)
+				if new_percent != percent:
+					percent = new_percent
+					events.put(("progress", percent))
+
+				yield from lines
+
+	note_list = []
+	try:
+		for note in iter_notes(read_lines(), separator):
+			if not note_list:
+				events.put(("first_note", note))
+			note_list.append(note)
+	except Exception:
+		note_list = []
+
+	timings["parse"] = time.perf_counter() - start - timings["read"]
+	LOAD_SECONDS.set(timings["read"] + timings["parse"])
+	events.put(("done", note_list if note_list else False, timings))
+
+
 def select_file():
 	"""
 	Opens a file select window.
 	Returns False upon no file selection.
 	Otherwise returns absolute path to selected file.
 	"""
+	import tkinter.filedialog as file_dia
+
 	try:
 		file = file_dia.askopenfilename(
 			title="Select Notes File",
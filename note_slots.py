@@ -0,0 +1,192 @@
+"""
+Lookahead layout: the notes of the current split and the next splits in
+boxes stacked from top to bottom.
+
+The boxes form a ring of render slots. When the split advances by one, the
+top slot (showing the split just finished) is moved to the bottom and only
+the new last split is rendered into it, the other slots keep their text and
+are just placed one position higher. Rendering a split costs one note
+whatever the number of slots. Any other change renders all visible slots.
+Slots with placeholders such as {{timer}} are rendered on every show, their
+values can change without the split changing.
+
+Images of the shown splits and the next config.IMAGE_PREFETCH ones are
+prepared in the background. Slots showing images are rendered again once
+the images are ready, or once resizing the window stopped.
+"""
+import tkinter
+
+import config
+import note_markup
+
+
+def has_values(note):
+	"""Returns whether a note has placeholders replaced by values, images don't count"""
+	return any(not name.startswith("image:") for _, name, _ in getattr(note, "placeholders", ()))
+
+
+class NoteSlots:
+	"""Ring of (frame, text box) slots in one window"""
+
+	def __init__(self, window, slots, create_slot, images=None):
+		"""
+		slots are the initial (frame, text box) pairs,
+		create_slot returns a new pair when more slots are needed,
+		images is the note_images.ImageCache to show images from.
+		"""
+		self.window = window
+		self.slots = list(slots)  # Display order, only the first count are placed
+		self.create_slot = create_slot
+		self.count = 1
+		# What the visible slots show, notes None until the first show
+		self.notes = None
+		self.first = 0
+		self.values = {}  # Placeholder values, see note_markup.render
+		self.images = images
+		self.image_width = 0
+		self.shown_images = {}  # Text box to the images it shows, keeps them alive
+		self.resize_job = None
+
+	def texts(self):
+		"""Returns the text boxes of all slots, visible or not"""
+		return [text for _, text in self.slots]
+
+	def place(self, count=None):
+		"""Places count slots above each other (the current count if None) and hides the others"""
+		count = self.count if count is None else count
+		while len(self.slots) < count:
+			self.slots.append(self.create_slot())
+
+		if count != self.count:
+			old_count, self.count = self.count, count
+			# Slots that just became visible show stale text
+			if self.notes is not None:
+				for position in range(old_count, count):
+					self._render(position)
+
+		w_width = self.window.winfo_width()
+		w_height = self.window.winfo_height()
+		height = w_height // self.count
+
+		image_width = max(config.IMAGE_WIDTH_STEP, (w_width - config.SCROLLBAR_WIDTH - config.IMAGE_MARGIN)
+						  // config.IMAGE_WIDTH_STEP * config.IMAGE_WIDTH_STEP)
+		if image_width != self.image_width:
+			self.image_width = image_width
+			self._schedule_resize()
+
+		for position, (box, _) in enumerate(self.slots):
+			if position < self.count:
+				box.place(height=height, width=w_width, y=position * height)
+			else:
+				box.place_forget()
+
+	def show(self, notes, index, values=None):
+		"""
+		Shows the notes from index on, returns whether anything was rendered.
+		values are the placeholder values for the slots rendered now.
+		"""
+		self.values = values or {}
+		if notes is self.notes:
+			if index == self.first:
+				return self._render_values()
+
+			if self.count > 1 and abs(index - self.first) == 1:
+				if index > self.first:
+					# Recycle the top slot for the new last split
+					self.slots.insert(self.count - 1, self.slots.pop(0))
+					self.first = index
+					self._render(self.count - 1)
+					self._render_values(self.count - 1)
+				else:
+					# Recycle the bottom slot for the new first split
+					self.slots.insert(0, self.slots.pop(self.count - 1))
+					self.first = index
+					self._render(0)
+					self._render_values(0)
+				self.place()
+				self._prefetch()
+				return True
+
+		self.notes = notes
+		self.first = index
+		for position in range(self.count):
+			self._render(position)
+		self._prefetch()
+		return True
+
+	def refresh(self):
+		"""Renders the visible slots with images again, ex. when images became ready"""
+		if self.notes is None:
+			return
+
+		for position in range(self.count):
+			index = self.first + position
+			if index < len(self.notes) and getattr(self.notes[index], "images", None):
+				self._render(position)
+		self._prefetch()
+
+	def invalidate(self):
+		"""Renders all visible slots on the next show, ex. after text was written to a slot directly"""
+		self.notes = None
+
+	def _render_values(self, rendered=None):
+		"""
+		Renders the visible slots again whose notes have placeholder values,
+		except the one at position rendered. Returns whether any was rendered.
+		"""
+		found = False
+		for position in range(self.count):
+			index = self.first + position
+			if position != rendered and 0 <= index < len(self.notes) and has_values(self.notes[index]):
+				self._render(position)
+				found = True
+		return found
+
+	def _render(self, position):
+		"""Renders the note shown at given position into its slot"""
+		index = self.first + position
+		text = self.slots[position][1]
+
+		text.config(state=tkinter.NORMAL)
+		text.delete("1.0", tkinter.END)
+		shown = self.shown_images[text] = []
+		if 0 <= index < len(self.notes):
+			note = self.notes[index]
+			text.insert(tkinter.END, note)
+			if getattr(note, "placeholders", None):
+				note_markup.render(text, note, dict(self.values, split=index + 1, splits=len(self.notes),
+													image=lambda path: self._image(path, shown)))
+			else:
+				note_markup.render(text, note, self.values)
+		text.config(state=tkinter.DISABLED)
+
+	def _image(self, path, shown):
+		"""Returns the image for a note at the current width, or the path as text if it can't be shown"""
+		image = self.images.get(path, self.image_width) if self.images else False
+		if image is False:
+			return f"[{path}]"
+		if image:
+			shown.append(image)
+		return image
+
+	def _prefetch(self):
+		"""Prepares the images of the shown splits and the next ones"""
+		if not self.images or self.notes is None:
+			return
+
+		end = min(len(self.notes), self.first + self.count + config.IMAGE_PREFETCH)
+		for index in range(max(self.first, 0), end):
+			for path in getattr(self.notes[index], "images", ()):
+				self.images.prefetch(path, self.image_width)
+
+	def _schedule_resize(self):
+		"""Scales the shown images again once the window size stopped changing"""
+		if self.notes is None or not self.images:
+			return
+		if self.resize_job:
+			self.window.after_cancel(self.resize_job)
+		self.resize_job = self.window.after(int(config.IMAGE_RESIZE_DELAY * 1000), self._resized)
+
+	def _resized(self):
+		self.resize_job = None
+		self.refresh()
@@ -0,0 +1,418 @@
+"""
+HTTP server for overlays, OBS browser sources can't open raw TCP sockets.
+Serves the current notes as HTML and streams state changes with Server-Sent Events.
+
+Everything runs non-blocking on a single thread using selectors,
+state is only pushed to the event streams when it changed.
+
+Routes:
+	/         overlay page, updates itself from /events
+	/notes    current note as HTML fragment
+	/state    current state as JSON
+	/events   Server-Sent Events stream of state changes
+	/metrics  application metrics in the Prometheus text format
+"""
+import html
+import json
+import logging
+import selectors
+import socket
+import threading
+import time
+
+import config
+import metrics
+
+log = logging.getLogger(__name__)
+
+# Reason phrases for the status codes used here
+STATUS_TEXT = {
+	200: "OK",
+	400: "Bad Request",
+	404: "Not Found",
+	405: "Method Not Allowed",
+	431: "Request Header Fields Too Large"
+}
+
+OVERLAY_PAGE = """<!DOCTYPE html>
+<html>
+<head>
+<meta charset="utf-8">
+<title>{title}</title>
+<style>
+body {{ margin: 0; padding: 8px; font-family: "{font}", sans-serif; font-size: {font_size}pt;
+	color: {text_color}; background: {background_color}; }}
+.note {{ white-space: pre-wrap; }}
+.next {{ opacity: 0.6; margin-top: 1em; }}
+</style>
+</head>
+<body>
+<div id="notes">{notes}</div>
+<script>
+var source = new EventSource("/events");
+source.addEventListener("state", function (event) {{
+	document.getElementById("notes").innerHTML = JSON.parse(event.data).html;
+}});
+</script>
+</body>
+</html>
+"""
+
+
+def render_notes(snapshot):
+	"""Returns the HTML fragment for given state snapshot"""
+	note = html.escape(snapshot.get("note", ""))
+	fragment = f'<div class="note">{note}</div>'
+
+	if snapshot.get("nextNote"):
+		fragment += f'<div class="note next">{html.escape(snapshot["nextNote"])}</div>'
+
+	return fragment
+
+
+class OverlayConnection:
+	"""An HTTP client connection and its buffers"""
+
+	def __init__(self, client_socket, address):
+		self.socket = client_socket
+		self.address = address
+		self.inbuf = b""
+		self.outbuf = bytearray()
+		self.streaming = False  # Connection is an event stream
+		self.close_when_sent = False
+		self.writing = False  # Registered for write readiness
+
+
+class OverlayServer:
+	"""Non-blocking HTTP + Server-Sent Events server for browser overlays"""
+
+	def __init__(self, port=16836):
+		self.port = port
+		self.host = 'localhost'
+		self.running = False
+		self.server_socket = None
+		self.server_thread = None
+		self.selector = None
+		self.connections = {}
+		self.streams = set()
+		# Snapshot and event handed over from publishing threads
+		self.snapshot = {}
+		self.event_payload = b""
+		self.snapshot_lock = threading.Lock()
+		self.changed = False
+		self.wakeup_recv = None
+		self.wakeup_send = None
+		self.last_keepalive = 0.0
+
+	def start(self):
+		"""Start the HTTP server"""
+		if self.running:
+			return True
+
+		try:
+			self.server_socket = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+			self.server_socket.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+			self.server_socket.bind((self.host, self.port))
+			self.server_socket.listen(32)
+			self.server_socket.setblocking(False)
+
+			self.wakeup_recv, self.wakeup_send = socket.socketpair()
+			self.wakeup_recv.setblocking(False)
+			self.wakeup_send.setblocking(False)
+
+			self.selector = selectors.DefaultSelector()
+			self.selector.register(self.server_socket, selectors.EVENT_READ, "accept")
+			self.selector.register(self.wakeup_recv, selectors.EVENT_READ, "wakeup")
+
+			self.running = True
+			self.server_thread = threading.Thread(target=self._server_loop, daemon=True)
+			self.server_thread.start()
+
+			log.info("Overlay HTTP server started on http://%s:%s/", self.host, self.port)
+			return True
+
+		except Exception as e:
+			log.error("Failed to start overlay HTTP server: %s", e)
+			self.running = False
+			self._close_sockets()
+			return False
+
+	def stop(self):
+		"""Stop the HTTP server"""
+		if not self.running:
+			return
+
+		self.running = False
+		self._wakeup()
+
+		if self.server_thread and self.server_thread.is_alive():
+			self.server_thread.join(timeout=2.0)
+
+		self._close_sockets()
+		log.info("Overlay HTTP server stopped")
+
+	def publish(self, snapshot):
+		"""
+		Sets the current state, can be called from any thread.
+		Event streams are only notified if the state changed.
+		"""
+		payload = dict(snapshot)
+		payload["html"] = render_notes(snapshot)
+		event = ("event: state\ndata: " + json.dumps(payload) + "\n\n").encode("utf-8")
+
+		with self.snapshot_lock:
+			if event == self.event_payload:
+				return
+			self.snapshot = payload
+			self.event_payload = event
+			self.changed = True
+
+		self._wakeup()
+
+	def get_status(self):
+		"""Get overlay server status"""
+		return {
+			'running': self.running,
+			'port': self.port,
+			'clients': len(self.connections),
+			'streams': len(self.streams)
+		}
+
+	def _wakeup(self):
+		"""Wakes up the server loop"""
+		try:
+			self.wakeup_send.send(b"\0")
+		except Exception:
+			pass  # Already pending or closed
+
+	def _close_sockets(self):
+		"""Closes all sockets of the server"""
+		for connection in list(self.connections.values()):
+			self._close(connection)
+
+		for sock in (self.server_socket, self.wakeup_recv, self.wakeup_send):
+			if sock:
+				try:
+					sock.close()
+				except Exception:
+					pass
+
+		if self.selector:
+			try:
+				self.selector.close()
+			except Exception:
+				pass
+
+		self.server_socket = None
+		self.wakeup_recv = None
+		self.wakeup_send = None
+		self.selector = None
+
+	def _server_loop(self):
+		"""Main loop handling all connections"""
+		while self.running:
+			try:
+				events = self.selector.select(timeout=1.0)
+			except Exception as e:
+				if self.running:
+					log.exception("Overlay server error: %s", e)
+				break
+
+			for key, mask in events:
+				if key.data == "accept":
+					self._accept()
+				elif key.data == "wakeup":
+					try:
+						self.wakeup_recv.recv(4096)
+					except Exception:
+						pass
+				else:
+					connection = key.data
+					if mask & selectors.EVENT_READ:
+						self._read(connection)
+					if mask & selectors.EVENT_WRITE and connection.socket.fileno() != -1:
+						self._write(connection)
+
+			if self.changed:
+				self._push_event()
+
+			now = time.monotonic()
+			if now - self.last_keepalive > config.HTTP_KEEPALIVE_INTERVAL:
+				self.last_keepalive = now
+				for connection in list(self.streams):
+					self._queue(connection, b": keepalive\n\n")
+
+	def _accept(self):
+		"""Accepts all pending connections"""
+		while True:
+			try:
+				client_socket, address = self.server_socket.accept()
+			except (BlockingIOError, InterruptedError):
+				return
+			except Exception as e:
+				log.error("Error accepting overlay connection: %s", e)
+				return
+
+			client_socket.setblocking(False)
+			connection = OverlayConnection(client_socket, address)
+			self.connections[client_socket] = connection
+			self.selector.register(client_socket, selectors.EVENT_READ, connection)
+
+	def _read(self, connection):
+		"""Reads and handles requests from a connection"""
+		try:
+			data = connection.socket.recv(4096)
+		except (BlockingIOError, InterruptedError):
+			return
+		except Exception:
+			data = b""
+
+		if not data:
+			self._close(connection)
+			return
+
+		if connection.streaming:
+			return  # Nothing expected from event streams
+
+		connection.inbuf += data
+
+		while b"\r\n\r\n" in connection.inbuf and not connection.close_when_sent:
+			head, connection.inbuf = connection.inbuf.split(b"\r\n\r\n", 1)
+			self._handle_request(connection, head)
+			if connection.streaming:
+				return
+
+		if len(connection.inbuf) > config.HTTP_MAX_HEADER_SIZE:
+			self._respond(connection, 431, "text/plain", b"Request header too large", keep_alive=False)
+
+	def _handle_request(self, connection, head):
+		"""Handles a single HTTP request"""
+		try:
+			lines = head.decode("iso-8859-1").split("\r\n")
+			method, target, version = lines[0].split(" ", 2)
+		except ValueError:
+			self._respond(connection, 400, "text/plain", b"Bad request", keep_alive=False)
+			return
+
+		headers = {}
+		for line in lines[1:]:
+			if ":" in line:
+				name, value = line.split(":", 1)
+				headers[name.strip().lower()] = value.strip()
+
+		connection_header = headers.get("connection", "").lower()
+		if version == "HTTP/1.0":
+			keep_alive = connection_header == "keep-alive"
+		else:
+			keep_alive = connection_header != "close"
+
+		if method not in ("GET", "HEAD"):
+			self._respond(connection, 405, "text/plain", b"Method not allowed", keep_alive=False)
+			return
+
+		path = target.split("?", 1)[0]
+		with self.snapshot_lock:
+			snapshot = self.snapshot
+			event = self.event_payload
+
+		if path == "/events":
+			connection.streaming = True
+			self.streams.add(connection)
+			self._queue(connection, (
+				"HTTP/1.1 200 OK\r\n"
+				"Content-Type: text/event-stream\r\n"
+				"Cache-Control: no-cache\r\n"
+				"Connection: keep-alive\r\n"
+				"Access-Control-Allow-Origin: *\r\n\r\n"
+				f"retry: {int(config.HTTP_RETRY_TIME * 1000)}\n\n"
+			).encode("utf-8") + event)
+		elif path == "/":
+			page = OVERLAY_PAGE.format(
+				title=html.escape(config.DEFAULT_WINDOW["TITLE"]),
+				font=html.escape(snapshot.get("font", "")),
+				font_size=int(snapshot.get("fontSize", 12)),
+				text_color=html.escape(snapshot.get("textColor", "#000000")),
+				background_color=html.escape(snapshot.get("backgroundColor", "#FFFFFF")),
+				notes=snapshot.get("html", "")
+			)
+			self._respond(connection, 200, "text/html; charset=utf-8", page.encode("utf-8"), keep_alive, method)
+		elif path == "/notes":
+			self._respond(connection, 200, "text/html; charset=utf-8",
+						  snapshot.get("html", "").encode("utf-8"), keep_alive, method)
+		elif path == "/state":
+			self._respond(connection, 200, "application/json",
+						  json.dumps(snapshot).encode("utf-8"), keep_alive, method)
+		elif path == "/metrics":
+			self._respond(connection, 200, metrics.CONTENT_TYPE,
+						  metrics.registry.export().encode("utf-8"), keep_alive, method)
+		else:
+			self._respond(connection, 404, "text/plain", b"Not found", keep_alive, method)
+
+	def _respond(self, connection, status, content_type, body, keep_alive=True, method="GET"):
+		"""Queues a complete response on a connection"""
+		head = (
+			f"HTTP/1.1 {status} {STATUS_TEXT[status]}\r\n"
+			f"Content-Type: {content_type}\r\n"
+			f"Content-Length: {len(body)}\r\n"
+			"Cache-Control: no-cache\r\n"
+			"Access-Control-Allow-Origin: *\r\n"
+			f"Connection: {'keep-alive' if keep_alive else 'close'}\r\n\r\n"
+		).encode("utf-8")
+
+		if not keep_alive:
+			connection.close_when_sent = True
+		self._queue(connection, head if method == "HEAD" else head + body)
+
+	def _push_event(self):
+		"""Sends the latest state to all event streams"""
+		with self.snapshot_lock:
+			event = self.event_payload
+			self.changed = False
+
+		for connection in list(self.streams):
+			# Slow clients get disconnected instead of buffering without bound
+			if len(connection.outbuf) > config.HTTP_MAX_STREAM_BACKLOG:
+				self._close(connection)
+			else:
+				self._queue(connection, event)
+
+	def _queue(self, connection, data):
+		"""Adds data to the output buffer of a connection and tries to send it"""
+		connection.outbuf += data
+		self._write(connection)
+
+	def _write(self, connection):
+		"""Sends as much of the output buffer as possible"""
+		try:
+			sent = connection.socket.send(connection.outbuf)
+			del connection.outbuf[:sent]
+		except (BlockingIOError, InterruptedError):
+			pass
+		except Exception:
+			self._close(connection)
+			return
+
+		if connection.outbuf:
+			if not connection.writing:
+				connection.writing = True
+				self.selector.modify(connection.socket, selectors.EVENT_READ | selectors.EVENT_WRITE, connection)
+		elif connection.close_when_sent:
+			self._close(connection)
+		elif connection.writing:
+			connection.writing = False
+			self.selector.modify(connection.socket, selectors.EVENT_READ, connection)
+
+	def _close(self, connection):
+		"""Closes a connection"""
+		self.streams.discard(connection)
+		if self.connections.pop(connection.socket, None) is None:
+			return
+
+		try:
+			self.selector.unregister(connection.socket)
+		except Exception:
+			pass
+		try:
+			connection.socket.close()
+		except Exception:
+			pass
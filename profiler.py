@@ -0,0 +1,202 @@
+"""
+Sampling profiler for bug reports like "SplitNotes lags on split".
+
+Samples the stacks of all threads (Tk loop, poller, bridge and overlay
+threads) with sys._current_frames at a fixed rate for a number of seconds,
+then writes them as collapsed stacks (one "frame;frame;frame count" line
+per stack, for flamegraph.pl and most viewers) or as a speedscope file
+(https://www.speedscope.app).
+
+Started from the popup menu or with "run_splitnoes.py --profile SECONDS".
+"""
+import json
+import logging
+import os
+import sys
+import threading
+import time
+
+import config
+
+log = logging.getLogger(__name__)
+
+# Cross-platform path handling
+if getattr(sys, 'frozen', False):
+	application_path = os.path.dirname(sys.executable)
+else:
+	application_path = os.path.dirname(os.path.realpath(__file__))
+
+
+def default_output_path():
+	"""Returns a new profile file name in the resources directory"""
+	name = time.strftime(config.PROFILER_FILE)
+	return os.path.join(application_path, config.RESOURCE_FOLDER, name)
+
+
+def frame_name(code):
+	"""Returns the display name of a code object"""
+	return f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})"
+
+
+class SamplingProfiler:
+	"""
+	Samples all threads on a background thread and writes the profile when done.
+	Stacks are kept as tuples of code objects with a count, so memory
+	only grows with the number of distinct stacks.
+	"""
+
+	def __init__(self, duration=config.PROFILER_DURATION, rate=config.PROFILER_RATE, path=None, on_done=None):
+		self.duration = duration
+		self.interval = 1.0 / rate
+		self.path = path or default_output_path()
+		self.on_done = on_done
+		# Thread name to {stack: count}
+		self.stacks = {}
+		self.samples = 0
+		self.elapsed = 0.0
+		self.thread = None
+		self.stop_event = threading.Event()
+
+	def start(self):
+		"""Starts sampling, returns False if it is already running"""
+		if self.is_running():
+			return False
+
+		self.stop_event.clear()
+		self.thread = threading.Thread(target=self._run, name="profiler", daemon=True)
+		self.thread.start()
+		log.info("Profiling %d threads for %s s at %d Hz", threading.active_count(), self.duration,
+				 round(1 / self.interval))
+		return True
+
+	def stop(self):
+		"""Stops sampling early and waits until the profile is written"""
+		self.stop_event.set()
+		if self.thread and self.thread is not threading.current_thread():
+			self.thread.join()
+
+	def is_running(self):
+		"""Returns whether the profiler is sampling"""
+		return self.thread is not None and self.thread.is_alive()
+
+	def _run(self):
+		start = time.perf_counter()
+		deadline = start + self.duration
+		own_ident = threading.get_ident()
+		names = {}
+
+		next_sample = start
+		while not self.stop_event.is_set():
+			frames = sys._current_frames()
+
+			for ident, frame in frames.items():
+				if ident == own_ident:
+					continue
+
+				name = names.get(ident)
+				if name is None:
+					names.update((thread.ident, thread.name) for thread in threading.enumerate())
+					name = names.get(ident, f"thread-{ident}")
+
+				stack = []
+				while frame is not None:
+					stack.append(frame.f_code)
+					frame = frame.f_back
+				stack.reverse()
+
+				thread_stacks = self.stacks.setdefault(name, {})
+				stack = tuple(stack)
+				thread_stacks[stack] = thread_stacks.get(stack, 0) + 1
+
+			del frames
+			self.samples += 1
+
+			# Fixed rate, a slow sample shortens the next wait instead of shifting all later ones
+			next_sample += self.interval
+			now = time.perf_counter()
+			if now >= deadline:
+				break
+			if next_sample < now:
+				next_sample = now
+			self.stop_event.wait(next_sample - now)
+
+		self.elapsed = time.perf_counter() - start
+		self._finish()
+
+	def _finish(self):
+		"""Writes the profile and calls on_done with the path, or None if writing failed"""
+		try:
+			self.write(self.path)
+			log.info("Profile with %d samples written to %s", self.samples, self.path)
+			path = self.path
+		except OSError as e:
+			log.error("Could not write profile to %s: %s", self.path, e)
+			path = None
+
+		if self.on_done:
+			self.on_done(path)
+
+	def write(self, path):
+		"""Writes the profile, as collapsed stacks if path ends with .folded or .txt, otherwise speedscope"""
+		os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+		if path.endswith((".folded", ".txt")):
+			content = self.collapsed()
+		else:
+			content = json.dumps(self.speedscope())
+
+		with open(path, "w", encoding="utf-8") as profile_file:
+			profile_file.write(content)
+
+	def collapsed(self):
+		"""Returns the profile as collapsed stacks, the thread name is the root frame"""
+		lines = []
+		for thread_name, thread_stacks in sorted(self.stacks.items()):
+			for stack, count in thread_stacks.items():
+				frames = [thread_name.replace(";", ":").replace(" ", "_")]
+				frames.extend(frame_name(code).replace(";", ":") for code in stack)
+				lines.append(f"{';'.join(frames)} {count}")
+		return "\n".join(lines) + "\n"
+
+	def speedscope(self):
+		"""Returns the profile as a speedscope document with one profile per thread"""
+		frames = []
+		frame_indexes = {}
+		profiles = []
+		weight = self.interval * 1000
+
+		for thread_name, thread_stacks in sorted(self.stacks.items()):
+			samples = []
+			weights = []
+			for stack, count in thread_stacks.items():
+				indexes = []
+				for code in stack:
+					index = frame_indexes.get(code)
+					if index is None:
+						index = frame_indexes[code] = len(frames)
+						frames.append({
+							"name": code.co_name,
+							"file": code.co_filename,
+							"line": code.co_firstlineno
+						})
+					indexes.append(index)
+				samples.append(indexes)
+				weights.append(count * weight)
+
+			profiles.append({
+				"type": "sampled",
+				"name": thread_name,
+				"unit": "milliseconds",
+				"startValue": 0,
+				"endValue": sum(weights),
+				"samples": samples,
+				"weights": weights
+			})
+
+		return {
+			"$schema": "https://www.speedscope.app/file-format-schema.json",
+			"name": f"{config.APP_NAME} {config.APP_VERSION}",
+			"exporter": f"{config.APP_NAME} profiler",
+			"activeProfileIndex": 0,
+			"shared": {"frames": frames},
+			"profiles": profiles
+		}
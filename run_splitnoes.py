@@ -2,8 +2,13 @@
 """
 Cross-platform launcher for SplitNotes
 This file can be used as an alternative entry point
+
+    python run_splitnoes.py                  start the GUI
+    python run_splitnoes.py --headless       serve notes to overlays without a window
 """
 
+import argparse
+import importlib.util
 import sys
 import os
 
@@ -11,15 +16,16 @@ import os
 current_dir = os.path.dirname(os.path.abspath(__file__))
 sys.path.insert(0, current_dir)
 
-def check_requirements():
+def check_requirements(headless=False):
     """Check if all required modules are available"""
-    required_modules = ['tkinter', 'socket', 'threading', 'select']
+    required_modules = ['socket', 'threading', 'select']
+    if not headless:
+        required_modules.insert(0, 'tkinter')
     missing_modules = []
     
     for module in required_modules:
-        try:
-            __import__(module)
-        except ImportError:
+        # find_spec locates the module without the cost of importing it
+        if importlib.util.find_spec(module) is None:
             missing_modules.append(module)
     
     if missing_modules:
@@ -39,8 +45,63 @@ def check_requirements():
     
     return True
 
+def parse_arguments():
+    """Parses the command line"""
+    parser = argparse.ArgumentParser(description="SplitNotes - Cross-platform LiveSplit notes viewer")
+    parser.add_argument("--headless", action="store_true",
+                        help="run without a window, only feeding the bridge and overlay HTTP servers")
+    parser.add_argument("--notes", help="notes file to serve in headless mode (default: from settings)")
+    parser.add_argument("--bridge-port", type=int, help="start the bridge server on this port in headless mode")
+    parser.add_argument("--http-port", type=int, help="start the overlay HTTP server on this port in headless mode")
+    parser.add_argument("--record", metavar="FILE",
+                        help="append all LiveSplit commands and responses to FILE for replaying later")
+    parser.add_argument("--metrics-dump", metavar="FILE",
+                        help="write the metrics in the Prometheus text format to FILE on exit")
+    parser.add_argument("--profile", type=float, metavar="SECONDS",
+                        help="record a sampling profile of all threads for SECONDS after start")
+    parser.add_argument("--profile-rate", type=int, metavar="HZ", help="profiler samples per second (default 100)")
+    parser.add_argument("--profile-output", metavar="FILE",
+                        help="profile file, .folded or .txt for collapsed stacks, otherwise speedscope JSON")
+    parser.add_argument("--log-console", action="store_true",
+                        help="also write log messages to stdout, not only to resources/splitnotes.log")
+    return parser.parse_args()
+
+def start_recording(path):
+    """Records the LiveSplit session to given file"""
+    import ls_connection
+    import ls_recorder
+    try:
+        ls_connection.recorder = ls_recorder.SessionRecorder(path)
+    except OSError as e:
+        print(f"Error: Could not open recording file: {e}")
+        sys.exit(1)
+    print(f"Recording LiveSplit session to {path}")
+
+def start_profiling(args):
+    """Starts the sampling profiler, the profile is also written if SplitNotes exits earlier"""
+    import atexit
+    import config
+    import profiler
+    sampler = profiler.SamplingProfiler(args.profile, args.profile_rate or config.PROFILER_RATE, args.profile_output)
+    sampler.start()
+    atexit.register(sampler.stop)
+    print(f"Recording a {args.profile:g} s profile to {sampler.path}")
+
+def dump_metrics_on_exit(path):
+    """Writes the metrics to given file when the application exits"""
+    import atexit
+    import metrics
+    atexit.register(metrics.registry.dump, path)
+
+def run_headless(args):
+    """Runs headless mode, tkinter is never imported"""
+    print("Starting SplitNotes in headless mode...")
+    import headless
+    sys.exit(headless.run(args.notes, args.bridge_port, args.http_port))
+
 def main():
     """Main entry point"""
+    args = parse_arguments()
     print("SplitNotes - Cross-platform LiveSplit notes viewer")
     print("=" * 50)
     
@@ -51,8 +112,24 @@ def main():
         sys.exit(1)
     
     # Check requirements
-    if not check_requirements():
+    if not check_requirements(args.headless):
         sys.exit(1)
+
+    # Started before anything logs, main_window and headless reuse it
+    import log_handler
+    log_handler.start_logging(console=args.log_console)
+
+    if args.record:
+        start_recording(args.record)
+
+    if args.metrics_dump:
+        dump_metrics_on_exit(args.metrics_dump)
+
+    if args.profile:
+        start_profiling(args)
+
+    if args.headless:
+        run_headless(args)
     
     # Check if main_window.py exists
     main_window_path = os.path.join(current_dir, 'main_window.py')
@@ -80,7 +157,7 @@ def main():
     try:
         # Import and run the main application
         import main_window
-        # main_window.main() is called automatically when imported
+        main_window.main()
         
     except KeyboardInterrupt:
         print("\nApplication interrupted by user")
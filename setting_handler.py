@@ -1,10 +1,16 @@
-import tkinter.colorchooser as colorchooser
-from tkinter import messagebox as msgbox
-import tkinter
+import atexit
+import logging
 import os
 import sys
+import threading
+import time
 
 import config
+import metrics
+
+FLUSHES = metrics.counter("splitnotes_settings_flushes_total", "Settings file writes")
+
+log = logging.getLogger(__name__)
 
 
 # Cross-platform path handling
@@ -21,6 +27,9 @@ settings_path = os.path.join(
 	config.SETTINGS_FILE
 )
 
+# Previous settings file, used when config.cfg is missing or damaged
+backup_path = settings_path + ".bak"
+
 settings_icon_path = os.path.join(
 	application_path,
 	config.RESOURCE_FOLDER,
@@ -28,7 +37,104 @@ settings_icon_path = os.path.join(
 )
 
 
+class SettingsStore:
+	"""
+	Keeps the parsed settings in memory.
+	The settings file is only read once, changes are written back
+	after config.SETTINGS_FLUSH_DELAY so bursts of saves cause a single write.
+	"""
+
+	def __init__(self, path):
+		self.path = path
+		self.settings = None
+		self.dirty = False
+		self.lock = threading.RLock()
+		self.flush_timer = None
+		self.dirty_since = 0.0
+		self.written_content = None
+		self.typed = None
+
+	def get(self):
+		"""Returns a copy of the current settings, reading the file on first use"""
+		with self.lock:
+			if self.settings is None:
+				self.settings = read_settings_file()
+			return dict(self.settings)
+
+	def get_typed(self):
+		"""Returns the current settings as typed settings"""
+		with self.lock:
+			if self.typed is None:
+				self.typed = typed_settings(self.get())
+			return self.typed
+
+	def update(self, settings):
+		"""Replaces the current settings, they are written to disk after the debounce"""
+		with self.lock:
+			if settings == self.settings:
+				return
+			self.settings = dict(settings)
+			self.typed = None
+			now = time.monotonic()
+			if not self.dirty:
+				self.dirty = True
+				self.dirty_since = now
+
+			# Every change restarts the debounce, but never past the max delay
+			delay = min(config.SETTINGS_FLUSH_DELAY,
+						self.dirty_since + config.SETTINGS_FLUSH_MAX_DELAY - now)
+
+			if self.flush_timer:
+				self.flush_timer.cancel()
+			self.flush_timer = threading.Timer(max(0.0, delay), self.flush)
+			self.flush_timer.daemon = True
+			self.flush_timer.start()
+
+	def flush(self):
+		"""Writes pending changes to disk right away"""
+		with self.lock:
+			if self.flush_timer:
+				self.flush_timer.cancel()
+				self.flush_timer = None
+
+			if not self.dirty:
+				return
+			self.dirty = False
+			content = serialize_settings(self.settings)
+
+			if content == self.written_content:
+				return
+
+			if set_settings_file_content(content):
+				self.written_content = content
+				FLUSHES.inc()
+
+	def invalidate(self):
+		"""Drops the cached settings so the next read comes from disk"""
+		with self.lock:
+			self.flush()
+			self.settings = None
+			self.typed = None
+
+
+settings_store = SettingsStore(settings_path)
+atexit.register(settings_store.flush)
+
+
 def load_settings():
+	"""
+	Returns a dictionary with all settings.
+	Settings are served from memory, see SettingsStore.
+	"""
+	return settings_store.get()
+
+
+def flush_settings():
+	"""Writes settings changes that are still pending to disk"""
+	settings_store.flush()
+
+
+def read_settings_file():
 	"""
 	Tries to load settings from file.
 	If no working settings-file exist one is created and the default settings are returned.
@@ -39,25 +145,80 @@ def load_settings():
 	# Ensure resources directory exists
 	os.makedirs(os.path.dirname(settings_path), exist_ok=True)
 
-	# try to open default settings file
+	settings, migrated = read_settings_from(settings_path)
+
+	if migrated:
+		log.info("Settings migrated to the current format: %s", settings_path)
+		set_settings_file_content(serialize_settings(settings))
+
+	if settings is None:
+		# Settings file missing or damaged, recover the previous one
+		settings, _ = read_settings_from(backup_path)
+		if settings is not None:
+			log.warning("Settings recovered from backup: %s", backup_path)
+			# The damaged file must not replace the backup
+			set_settings_file_content(serialize_settings(settings), backup=False)
+
+	if settings is None:
+		log.warning("No working settings file found, creating default settings")
+		settings = format_settings(set_default_settings())
+
+	return settings
+
+
+def read_settings_from(path):
+	"""
+	Reads and validates the settings file at given path, never writes.
+	Settings missing from older files get their default value.
+	Returns the settings dictionary, or None if the file can't be used,
+	and whether the settings were migrated and need to be written.
+	"""
+	# try to open settings file
 	try:
-		with open(settings_path, "r", encoding='utf-8') as settings_file:
+		with open(path, "r", encoding='utf-8') as settings_file:
 			settings_content = settings_file.readlines()
 			settings_content = [line.strip() for line in settings_content]
-		print(f"Settings loaded from: {settings_path}")
+		log.debug("Settings loaded from: %s", path)
 	except:
 		# File not found
-		print("Settings file not found, creating default settings")
-		settings_content = set_default_settings()
+		log.info("Settings file not found: %s", path)
+		return None, False
 
 	settings = format_settings(settings_content)
 
-	# Check so settings file has all settings
-	if not validate_settings(settings):
-		print("Settings validation failed, creating default settings")
-		settings = format_settings(set_default_settings())
+	# Empty or garbled file, nothing to migrate
+	if not any(key in settings for key in config.REQUIRED_SETTINGS):
+		log.warning("Settings file contains no settings: %s", path)
+		return None, False
 
-	return settings
+	migrated = migrate_settings(settings)
+
+	if migrated is None:
+		log.warning("Settings validation failed: %s", path)
+		return None, False
+
+	return migrated, migrated != settings
+
+
+def migrate_settings(settings):
+	"""
+	Migrates settings written by older versions.
+	Missing settings get their default value and every value is rewritten
+	in its canonical form (ex. "True" -> "true", "arial" -> "Arial").
+	Returns the migrated settings dictionary, or None if settings are invalid.
+	"""
+	migrated = dict(settings)
+	add_missing_settings(migrated)
+
+	typed, errors = settings_schema.convert(migrated)
+	for error in errors:
+		log.warning("%s", error)
+
+	if typed is None:
+		return None
+
+	migrated.update(settings_schema.encode(typed))
+	return migrated
 
 
 def set_default_settings():
@@ -65,11 +226,28 @@ def set_default_settings():
 	Creates a config file with default settings. 
 	Returns the default config-file content.
 	"""
-	print(f"Creating default settings at: {settings_path}")
+	log.info("Creating default settings at: %s", settings_path)
 	set_settings_file_content(config.DEFAULT_CONFIG)
 	return config.DEFAULT_CONFIG.split("\n")
 
 
+def add_missing_settings(settings):
+	"""
+	Adds the default value for every setting missing in given settings dictionary.
+	Returns whether any setting was added.
+	"""
+	defaults = format_settings(config.DEFAULT_CONFIG.split("\n"))
+	added = False
+
+	for key, value in defaults.items():
+		if key not in settings:
+			log.info("Adding missing setting with default value: %s=%s", key, value)
+			settings[key] = value
+			added = True
+
+	return added
+
+
 def format_settings(file_rows):
 	"""
 	Takes a list of settings (as written in config files) and 
@@ -97,61 +275,18 @@ def format_settings(file_rows):
 
 def validate_settings(settings):
 	"""
-	Checks a settings dictionary so that all the needed settings are present.
-	Enhanced with comprehensive bridge settings validation.
+	Checks a settings dictionary so that all the needed settings are present and valid.
+	All problems are reported at once, see SettingsSchema.
 	"""
+	_, errors = settings_schema.convert(settings)
 
-	for req_setting in config.REQUIRED_SETTINGS:
-		if req_setting not in settings:
-			print(f"Missing required setting: {req_setting}")
-			return False
-
-	if not validate_font_size(settings["font_size"]):
-		print(f"Invalid font size: {settings['font_size']}")
-		return False
-
-	if not validate_server_port(settings["server_port"]):
-		print(f"Invalid server port: {settings['server_port']}")
-		return False
-
-	if not validate_color(settings["text_color"]):
-		print(f"Invalid text color: {settings['text_color']}")
-		return False
+	for error in errors:
+		log.warning("%s", error)
 
-	if not validate_color(settings["background_color"]):
-		print(f"Invalid background color: {settings['background_color']}")
+	if errors:
 		return False
 
-	if settings["font"] not in config.AVAILABLE_FONTS:
-		print(f"Invalid font: {settings['font']}")
-		return False
-
-	if settings["double_layout"].lower() not in ["true", "false"]:
-		print(f"Invalid double_layout: {settings['double_layout']}")
-		return False
-
-	if not validate_pixels(settings["width"]):
-		print(f"Invalid width: {settings['width']}")
-		return False
-
-	if not validate_pixels(settings["height"]):
-		print(f"Invalid height: {settings['height']}")
-		return False
-
-	if not validate_separator(settings["separator"]):
-		print(f"Invalid separator: {settings['separator']}")
-		return False
-
-	# Bridge settings validation
-	if settings["bridge_enabled"].lower() not in ["true", "false"]:
-		print(f"Invalid bridge_enabled: {settings['bridge_enabled']}")
-		return False
-
-	if not validate_bridge_port(settings["bridge_port"]):
-		print(f"Invalid bridge port: {settings['bridge_port']}")
-		return False
-
-	print("All settings validated successfully")
+	log.debug("All settings validated successfully")
 	return True
 
 
@@ -164,27 +299,80 @@ def validate_bridge_port(port):
 		return False
 
 
-def set_settings_file_content(content):
+def set_settings_file_content(content, backup=True):
 	"""
 	Saves given content to the config file, config.cfg, in the resources directory.
+	The content is written to a temporary file and synced to disk first,
+	the old file is linked or copied to the backup and then replaced with
+	one rename, so config.cfg always exists and a crash at any point leaves
+	either the new or the old content in it.
+	Returns whether writing succeeded.
 	"""
+	settings_dir = os.path.dirname(settings_path)
+
 	# Ensure directory exists
-	os.makedirs(os.path.dirname(settings_path), exist_ok=True)
+	os.makedirs(settings_dir, exist_ok=True)
 	
+	temp_path = settings_path + ".tmp"
 	try:
-		with open(settings_path, "w", encoding='utf-8') as settings_file:
+		with open(temp_path, "w", encoding='utf-8') as settings_file:
 			settings_file.write(content)
-		print(f"Settings content written to: {settings_path}")
+			settings_file.flush()
+			os.fsync(settings_file.fileno())
+
+		if backup and os.path.exists(settings_path):
+			backup_settings_file()
+		os.replace(temp_path, settings_path)
+		sync_directory(settings_dir)
+
+		log.debug("Settings content written to: %s", settings_path)
+		return True
 	except Exception as e:
-		print(f"Error saving settings content: {e}")
+		log.error("Error saving settings content: %s", e)
+		return False
+
+
+def backup_settings_file():
+	"""Keeps the current settings file as backup, hard linked where the file system allows it"""
+	temp_path = backup_path + ".tmp"
+	if os.path.exists(temp_path):
+		os.remove(temp_path)
+
+	try:
+		os.link(settings_path, temp_path)
+	except OSError:
+		with open(settings_path, "rb") as settings_file:
+			content = settings_file.read()
+		with open(temp_path, "wb") as backup_file:
+			backup_file.write(content)
+			backup_file.flush()
+			os.fsync(backup_file.fileno())
+
+	# Replaced in one step, so there always is a complete backup
+	os.replace(temp_path, backup_path)
+
+
+def sync_directory(path):
+	"""Syncs a directory so renames in it survive a crash (not possible on Windows)"""
+	try:
+		dir_fd = os.open(path, os.O_RDONLY)
+	except OSError:
+		return
+
+	try:
+		os.fsync(dir_fd)
+	except OSError:
+		pass
+	finally:
+		os.close(dir_fd)
 
 
 def save_settings(settings):
 	"""
 	Saves given settings to the settings file.
 	Enhanced to ensure bridge settings are properly formatted.
+	The file is written shortly after, see SettingsStore.
 	"""
-	print("Saving settings...")
 	
 	# Ensure bridge settings are present and properly formatted
 	if "bridge_enabled" not in settings:
@@ -195,14 +383,20 @@ def save_settings(settings):
 	# Convert boolean values to lowercase strings for consistency
 	if isinstance(settings.get("bridge_enabled"), bool):
 		settings["bridge_enabled"] = str(settings["bridge_enabled"]).lower()
-	
+
+	settings_store.update(settings)
+
+
+def serialize_settings(settings):
+	"""Returns the settings file content for given settings"""
 	file_content = ""
 	
 	# Write settings in a specific order for better readability
 	setting_order = [
 		"notes", "font", "font_size", "text_color", "background_color",
-		"double_layout", "server_port", "width", "height", "separator",
-		"bridge_enabled", "bridge_port"
+		"double_layout", "lookahead", "server_port", "width", "height", "separator",
+		"bridge_enabled", "bridge_port", "http_enabled", "http_port",
+		"log_level", "log_levels", "ls_connections", "viewers"
 	]
 	
 	# Write ordered settings first
@@ -215,8 +409,7 @@ def save_settings(settings):
 		if key not in setting_order:
 			file_content += f"{key}={value}\n"
 
-	set_settings_file_content(file_content)
-	print(f"Settings saved: bridge_enabled={settings.get('bridge_enabled')}, bridge_port={settings.get('bridge_port')}")
+	return file_content
 
 
 def edit_settings(root_wnd, apply_method):
@@ -225,6 +418,11 @@ def edit_settings(root_wnd, apply_method):
 	root_wnd is the main window that settings should be applied to.
 	apply_method is the method to be called to apply validated settings.
 	"""
+	# tkinter is only needed once the window is opened, headless mode never imports it
+	import tkinter
+	import tkinter.colorchooser as colorchooser
+	from tkinter import messagebox as msgbox
+
 	settings_wnd = tkinter.Toplevel(master=root_wnd,
 									width=config.SETTINGS_WINDOW["WIDTH"],
 									height=config.SETTINGS_WINDOW["HEIGHT"])
@@ -532,6 +730,195 @@ def validate_separator(separator):
 	return len(separator.strip()) > 0
 
 
+def convert_boolean(value):
+	"""Converts a boolean setting, accepting the formats older versions wrote"""
+	value = value.strip().lower()
+	if value in ("true", "1", "yes", "on"):
+		return True
+	if value in ("false", "0", "no", "off"):
+		return False
+	raise ValueError("expected true or false")
+
+
+def convert_range(low, high):
+	"""Returns a converter for integer settings between low and high"""
+	def convert(value):
+		number = int(value)
+		if not low <= number <= high:
+			raise ValueError(f"must be between {low} and {high}")
+		return number
+	return convert
+
+
+def convert_color(value):
+	"""Converts a hexadecimal color setting"""
+	if not validate_color(value):
+		raise ValueError("expected a color like #RRGGBB")
+	return value
+
+
+def convert_font(value):
+	"""Converts a font setting, the name is matched case-insensitively"""
+	for font in config.AVAILABLE_FONTS:
+		if font.lower() == value.lower():
+			return font
+	raise ValueError(f"not one of {', '.join(config.AVAILABLE_FONTS)}")
+
+
+def convert_separator(value):
+	"""Converts a split separator setting"""
+	if not validate_separator(value):
+		raise ValueError("separator can't be empty")
+	return value
+
+
+def convert_log_level(value):
+	"""Converts a log level setting"""
+	value = value.strip().lower()
+	if value not in config.LOG_LEVELS:
+		raise ValueError(f"not one of {', '.join(config.LOG_LEVELS)}")
+	return value
+
+
+def convert_log_levels(value):
+	"""Converts per module log levels like "bridge_server:debug,setting_handler:warning" to a dictionary"""
+	levels = {}
+	for entry in value.split(","):
+		if not entry.strip():
+			continue
+		module, _, level = entry.partition(":")
+		if not module.strip():
+			raise ValueError("expected module:level entries")
+		levels[module.strip()] = convert_log_level(level)
+	return levels
+
+
+def encode_log_levels(levels):
+	"""Returns the setting value for per module log levels"""
+	return ",".join(f"{module}:{level}" for module, level in levels.items())
+
+
+def convert_connections(value):
+	"""
+	Converts extra LiveSplit connections like "16844|notes.txt,16854" to a list of (port, notes path),
+	the notes path is None when not given.
+	"""
+	connections = []
+	port_converter = convert_range(1024, 65535)
+	for entry in value.split(","):
+		if not entry.strip():
+			continue
+		port, _, notes_path = entry.partition("|")
+		connections.append((port_converter(port.strip()), notes_path.strip() or None))
+	return connections
+
+
+def encode_connections(connections):
+	"""Returns the setting value for extra LiveSplit connections"""
+	return ",".join(f"{port}|{notes_path}" if notes_path else str(port) for port, notes_path in connections)
+
+
+def convert_viewers(value):
+	"""
+	Converts viewer windows like "next@600x120,double" to a list of (layout, width, height),
+	width and height are None when not given.
+	"""
+	viewers = []
+	size_converter = convert_range(50, 10000)
+	for entry in value.split(","):
+		if not entry.strip():
+			continue
+		layout, _, size = entry.partition("@")
+		layout = layout.strip().lower()
+		if layout not in config.VIEWER_LAYOUTS:
+			raise ValueError(f"layout not one of {', '.join(config.VIEWER_LAYOUTS)}")
+		width = height = None
+		if size.strip():
+			width, _, height = size.lower().partition("x")
+			width, height = size_converter(width.strip()), size_converter(height.strip())
+		viewers.append((layout, width, height))
+	return viewers
+
+
+def encode_viewers(viewers):
+	"""Returns the setting value for viewer windows"""
+	return ",".join(f"{layout}@{width}x{height}" if width else layout for layout, width, height in viewers)
+
+
+# Converter and encoder for each setting type in config.SETTING_TYPES
+SETTING_CONVERTERS = {
+	"text": (str, str),
+	"bool": (convert_boolean, encode_boolean_setting),
+	"font": (convert_font, str),
+	"font_size": (convert_range(6, 72), str),
+	"color": (convert_color, str),
+	"port": (convert_range(1024, 65535), str),
+	"pixels": (convert_range(200, 10000), str),
+	"lookahead": (convert_range(1, config.MAX_LOOKAHEAD), str),
+	"separator": (convert_separator, str),
+	"log_level": (convert_log_level, str),
+	"log_levels": (convert_log_levels, encode_log_levels),
+	"connections": (convert_connections, encode_connections),
+	"viewers": (convert_viewers, encode_viewers)
+}
+
+
+class SettingsSchema:
+	"""
+	Declarative settings schema compiled from config.REQUIRED_SETTINGS and config.SETTING_TYPES.
+	Converts a settings dictionary to a typed settings object in one pass.
+	"""
+
+	def __init__(self, names, types):
+		self.fields = tuple((name,) + SETTING_CONVERTERS[types[name]] for name in names)
+		self.settings_class = type("Settings", (TypedSettings,), {"__slots__": tuple(names)})
+
+	def convert(self, settings):
+		"""
+		Converts given settings dictionary.
+		Returns the typed settings (None on errors) and a list of all errors found.
+		"""
+		typed = self.settings_class()
+		errors = []
+
+		for name, converter, _ in self.fields:
+			if name not in settings:
+				errors.append(f"Missing required setting: {name}")
+				continue
+			try:
+				setattr(typed, name, converter(settings[name]))
+			except (ValueError, TypeError, AttributeError) as e:
+				errors.append(f"Invalid {name}: {settings[name]!r} ({e})")
+
+		return (None if errors else typed), errors
+
+	def encode(self, typed):
+		"""Returns the settings dictionary for given typed settings"""
+		return {name: encoder(getattr(typed, name)) for name, _, encoder in self.fields}
+
+
+class TypedSettings:
+	"""Settings with converted values, created by SettingsSchema"""
+	__slots__ = ()
+
+	def __repr__(self):
+		values = ", ".join(f"{name}={getattr(self, name)!r}" for name in self.__slots__)
+		return f"Settings({values})"
+
+
+settings_schema = SettingsSchema(config.REQUIRED_SETTINGS, config.SETTING_TYPES)
+
+
+def typed_settings(settings):
+	"""Returns given settings dictionary as typed settings, or None if it is invalid"""
+	return settings_schema.convert(settings)[0]
+
+
+def load_typed_settings():
+	"""Returns the current settings as typed settings, see SettingsSchema"""
+	return settings_store.get_typed()
+
+
 def debug_settings():
 	"""Debug function to print current settings"""
 	print("\n=== Settings Debug ===")
@@ -0,0 +1,118 @@
+"""
+Detects stalls of the Tk event loop.
+
+A heartbeat posted with after() every HEARTBEAT_INTERVAL records when the
+loop last ran. A watchdog thread checks it and captures the stack of the
+main thread while the loop is stuck, so the report shows what blocked it,
+not what ran after. The heartbeat that finally gets through measures the
+stall and records it in the stall histogram of the metrics export.
+"""
+import collections
+import logging
+import os
+import sys
+import threading
+import time
+import traceback
+
+import config
+import metrics
+
+STALL_SECONDS = metrics.histogram(
+	"splitnotes_ui_stall_seconds",
+	"Time the Tk event loop did not run, for stalls over the threshold",
+	(0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+)
+
+log = logging.getLogger(__name__)
+
+# A stall: when it started (time.time()), how long it lasted and the main thread stack during it
+Stall = collections.namedtuple("Stall", ("started", "duration", "stack"))
+
+
+class StallWatchdog:
+	"""Heartbeat on the Tk loop with a watchdog thread, start from the main thread"""
+
+	def __init__(self, root, threshold=config.STALL_THRESHOLD, interval=config.HEARTBEAT_INTERVAL):
+		self.root = root
+		self.threshold = threshold
+		self.interval = interval
+		self.main_ident = threading.get_ident()
+		self.last_beat = time.monotonic()
+		# Main thread stack captured during the current stall
+		self.stall_stack = None
+		self.stalls = collections.deque(maxlen=config.STALL_HISTORY)
+		self.count = 0
+		self.longest = 0.0
+		self.stop_event = threading.Event()
+		self.thread = None
+		self.after_id = None
+
+	def start(self):
+		"""Starts the heartbeat and the watchdog thread"""
+		self.main_ident = threading.get_ident()
+		self.last_beat = time.monotonic()
+		self.stop_event.clear()
+		self.after_id = self.root.after(int(self.interval * 1000), self._beat)
+		self.thread = threading.Thread(target=self._watch, name="watchdog", daemon=True)
+		self.thread.start()
+
+	def stop(self):
+		"""Stops watching"""
+		self.stop_event.set()
+		if self.after_id:
+			try:
+				self.root.after_cancel(self.after_id)
+			except Exception:
+				pass  # Window already destroyed
+			self.after_id = None
+
+	def _beat(self):
+		"""Heartbeat on the Tk loop"""
+		now = time.monotonic()
+		stalled = now - self.last_beat - self.interval
+		self.last_beat = now
+
+		if stalled > self.threshold:
+			self._record(stalled)
+
+		if not self.stop_event.is_set():
+			self.after_id = self.root.after(int(self.interval * 1000), self._beat)
+
+	def _record(self, duration):
+		"""Records a stall that just ended"""
+		stack = self.stall_stack
+		self.stall_stack = None
+
+		self.stalls.append(Stall(time.time() - duration, duration, stack))
+		self.count += 1
+		self.longest = max(self.longest, duration)
+		STALL_SECONDS.observe(duration)
+
+		log.warning("Event loop stalled for %.0f ms%s", duration * 1000,
+					":\n" + "".join(stack.format()) if stack else "")
+
+	def _watch(self):
+		"""Watchdog thread, captures the main thread stack once per stall"""
+		while not self.stop_event.wait(self.threshold / 2):
+			if self.stall_stack is None and time.monotonic() - self.last_beat > self.threshold + self.interval:
+				frame = sys._current_frames().get(self.main_ident)
+				if frame is not None:
+					self.stall_stack = traceback.extract_stack(frame)
+				del frame
+
+	def get_status(self):
+		"""Returns stall statistics"""
+		last = self.stalls[-1] if self.stalls else None
+		return {
+			'stalls': self.count,
+			'longest': self.longest,
+			'last': last,
+			'last_location': stack_location(last.stack) if last and last.stack else None
+		}
+
+
+def stack_location(stack):
+	"""Returns the innermost frame of a captured stack as "file:line in function\""""
+	frame = stack[-1]
+	return f"{os.path.basename(frame.filename)}:{frame.lineno} in {frame.name}"
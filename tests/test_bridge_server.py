@@ -0,0 +1,169 @@
+"""Bridge server ingest, run with make test"""
+import json
+import socket
+import time
+import unittest
+from unittest import mock
+
+import bridge_protocol
+import bridge_server
+
+
+class RateLimitTest(unittest.TestCase):
+
+	def setUp(self):
+		self.server = bridge_server.BridgeServer(port=0)
+		self.assertTrue(self.server.start())
+		self.port = self.server.server_socket.getsockname()[1]
+
+	def tearDown(self):
+		self.server.stop()
+
+	def wait_for(self, condition, timeout=5.0):
+		end = time.monotonic() + timeout
+		while time.monotonic() < end:
+			if condition():
+				return True
+			time.sleep(0.01)
+		return False
+
+	def test_burst_applies_latest_state(self):
+		count = 2000
+		with socket.create_connection(("localhost", self.port)) as client:
+			client.sendall(self.flood(count, "none"))
+			self.assertTrue(self.wait_for(lambda: self.server.runtime_info["active_split"] == count - 1),
+							"latest state was not applied: %s" % self.server.runtime_info["active_split"])
+
+			# Only states superseded while over the limit count as dropped
+			dropped = self.server.get_status()['dropped_messages']
+			self.assertGreater(dropped, 0)
+			self.assertLess(dropped, count)
+
+	def read_acks(self, client, count):
+		"""Reads acknowledgments until they cover count messages, returns the number of ack lines"""
+		client.settimeout(5)
+		buffer = b""
+		acked = lines = 0
+		while acked < count:
+			data = client.recv(65536)
+			self.assertTrue(data, "connection closed after %d of %d acks" % (acked, count))
+			buffer += data
+			*complete, buffer = buffer.split(b"\n")
+			for line in complete:
+				message = json.loads(line)
+				if message.get('status') == 'ok':
+					acked += message.get('count', 1)
+					lines += 1
+		return lines
+
+	def flood(self, count, ack=None):
+		return b"".join((json.dumps(dict({
+			'type': 'timer_state',
+			'running': True,
+			'currentSplit': split
+		}, **({'ack': ack} if ack else {}))) + "\n").encode() for split in range(count))
+
+	def test_acks_are_batched_by_default(self):
+		with socket.create_connection(("localhost", self.port)) as client:
+			client.sendall(self.flood(500))
+			self.assertLess(self.read_acks(client, 500), 500)
+
+	def test_parked_messages_are_not_acked_one_by_one(self):
+		with socket.create_connection(("localhost", self.port)) as client:
+			client.sendall(self.flood(2000, "each"))
+			# Messages within the burst are acked each, the parked ones in batches
+			self.assertLess(self.read_acks(client, 2000), 2000)
+
+
+class HttpRequestTest(unittest.TestCase):
+
+	def setUp(self):
+		self.server = bridge_server.BridgeServer(port=0)
+		self.assertTrue(self.server.start())
+		self.port = self.server.server_socket.getsockname()[1]
+
+	def tearDown(self):
+		self.server.stop()
+
+	def request(self, head):
+		"""Sends an HTTP request followed by a bridge message, returns everything received"""
+		message = json.dumps({'type': 'timer_state', 'running': True, 'currentSplit': 5}) + "\n"
+		with socket.create_connection(("localhost", self.port)) as client:
+			client.settimeout(5)
+			client.sendall(head + b"\r\n\r\n" + message.encode())
+			response = b""
+			while True:
+				data = client.recv(65536)
+				if not data:
+					return response
+				response += data
+
+	def test_metrics_request_ends_the_connection(self):
+		response = self.request(b"GET /metrics HTTP/1.1\r\nHost: localhost")
+		self.assertTrue(response.startswith(b"HTTP/1.1 200 OK"))
+		time.sleep(0.1)
+		self.assertEqual(self.server.runtime_info["active_split"], -1)
+
+	def test_rejected_upgrade_ends_the_connection(self):
+		response = self.request(b"GET / HTTP/1.1\r\nHost: localhost")
+		self.assertEqual(response, b"HTTP/1.1 400 Bad Request\r\nContent-Length: 0\r\nConnection: close\r\n\r\n")
+		time.sleep(0.1)
+		self.assertEqual(self.server.runtime_info["active_split"], -1)
+
+
+class RecordingSocket:
+	"""Keeps everything sent to a client"""
+
+	def __init__(self):
+		self.sent = []
+
+	def sendall(self, data):
+		self.sent.append(data)
+
+
+class BroadcastTest(unittest.TestCase):
+
+	def setUp(self):
+		self.server = bridge_server.BridgeServer(port=0)
+		self.server.runtime_info["bridge_state"] = {'splits': ["First", "Second"]}
+
+	def add_client(self, encoding):
+		client = bridge_server.BridgeClient(RecordingSocket(), ("localhost", len(self.server.clients)))
+		client.encoding = encoding
+		self.server.clients.append(client)
+		return client.socket.sent
+
+	def broadcast(self, split):
+		self.server.send_state_to_browsers({'type': 'state_update', 'currentSplit': split,
+											'timerRunning': True, 'timestamp': 1.0})
+
+	def test_state_is_encoded_once_for_all_clients(self):
+		json_sent = [self.add_client("json") for _ in range(3)]
+		binary_sent = [self.add_client("binary") for _ in range(3)]
+
+		with mock.patch.object(bridge_protocol, "encode_state", wraps=bridge_protocol.encode_state) as encode:
+			self.broadcast(1)
+		self.assertEqual(encode.call_count, 1)
+
+		# Every client of an encoding gets the very same bytes
+		self.assertEqual(len({id(sent[-1]) for sent in json_sent}), 1)
+		self.assertEqual(len({id(sent[-1]) for sent in binary_sent}), 1)
+
+	def test_split_names_are_sent_when_they_change(self):
+		sent = self.add_client("binary")
+
+		self.broadcast(0)
+		self.broadcast(1)
+		frames, _ = bridge_protocol.decode_frames(b"".join(sent))
+		self.assertEqual([frame[0] for frame in frames], [bridge_protocol.SPLIT_NAMES, bridge_protocol.STATE_UPDATE,
+														  bridge_protocol.STATE_UPDATE])
+		self.assertEqual(frames[0][1], ["First", "Second"])
+
+		self.server.runtime_info["bridge_state"]['splits'] = ["First", "Third"]
+		self.broadcast(1)
+		frames, _ = bridge_protocol.decode_frames(b"".join(sent))
+		self.assertEqual(frames[3], (bridge_protocol.SPLIT_NAMES, ["First", "Third"]))
+
+
+if __name__ == "__main__":
+	unittest.main()
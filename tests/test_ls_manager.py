@@ -0,0 +1,72 @@
+"""Extra LiveSplit connections, run with make test"""
+import os
+import socket
+import tempfile
+import threading
+import time
+import unittest
+
+import ls_manager
+
+
+class ConnectionManagerTest(unittest.TestCase):
+
+	def test_stop_closes_removed_connections(self):
+		manager = ls_manager.ConnectionManager()
+		connection = ls_manager.LSConnection("a", 1)
+		ls_socket = connection.socket = socket.socket()
+		manager.add(connection)
+		manager.remove("a")
+
+		# Not running, only the cleanup of the polling thread runs
+		manager._loop()
+		self.assertIsNone(connection.socket)
+		self.assertEqual(ls_socket.fileno(), -1)
+
+	def test_notes_are_loaded_while_polling(self):
+		with tempfile.TemporaryDirectory() as directory:
+			notes_path = os.path.join(directory, "notes.txt")
+			with open(notes_path, "w") as notes_file:
+				notes_file.write("first\n\nsecond")
+
+			loaded = threading.Event()
+			manager = ls_manager.ConnectionManager(interval=0.05, timeout=0.05)
+			# Nothing listens on port 1, the connection keeps retrying
+			manager.add(ls_manager.LSConnection("a", 1, notes_path, on_change=lambda connection: loaded.set()))
+			manager.start()
+			try:
+				self.assertTrue(loaded.wait(5))
+			finally:
+				manager.stop()
+
+			self.assertEqual(manager.get_status()[0]['notes'], 2)
+
+	def test_no_ticks_without_connections(self):
+		manager = ls_manager.ConnectionManager(interval=0.01, timeout=0.01)
+		ticks = []
+		tick = manager._tick
+		manager._tick = lambda now: (ticks.append(now), tick(now))
+		manager.start()
+		thread = manager.thread
+		try:
+			time.sleep(0.1)
+			self.assertEqual(ticks, [])
+
+			manager.add(ls_manager.LSConnection("a", 1))
+			time.sleep(0.1)
+			self.assertTrue(ticks)
+
+			# The removed connection is closed on the next tick, then polling waits again
+			manager.remove("a")
+			time.sleep(0.1)
+			count = len(ticks)
+			time.sleep(0.1)
+			self.assertEqual(len(ticks), count)
+		finally:
+			manager.stop()
+
+		self.assertFalse(thread.is_alive())
+
+
+if __name__ == "__main__":
+	unittest.main()
@@ -0,0 +1,68 @@
+"""Smoke tests of benchmarks/ls_replay.py, run with make test"""
+import os
+import subprocess
+import sys
+import tempfile
+import time
+import unittest
+
+import config
+import ls_recorder
+
+REPO_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+REPLAY = os.path.join(REPO_DIR, "benchmarks", "ls_replay.py")
+
+
+def has_display():
+	"""Returns whether Tk can open a window"""
+	import tkinter
+	try:
+		tkinter.Tk().destroy()
+	except tkinter.TclError:
+		return False
+	return True
+
+
+class ReplayTest(unittest.TestCase):
+
+	def setUp(self):
+		self.directory = tempfile.TemporaryDirectory()
+		self.recording = os.path.join(self.directory.name, "session.rec")
+		self.notes = os.path.join(self.directory.name, "notes.txt")
+		# Keeps the replay away from the settings in resources/
+		self.settings = os.path.join(self.directory.name, "config.cfg")
+
+		with open(self.settings, "w") as settings_file:
+			settings_file.write(config.DEFAULT_CONFIG)
+
+		with open(self.notes, "w") as notes_file:
+			notes_file.write("\n\n".join(f"# Split {split}\n**note** {{{{split_name}}}}" for split in range(5)))
+
+		recorder = ls_recorder.SessionRecorder(self.recording)
+		now = time.monotonic()
+		for step, index in enumerate((-1, 0, 0, 1, 2, 3, 4, -1)):
+			recorder.record("cur_split_index", f"{index}\r\n", now + step * 0.5, now + step * 0.5 + 0.001)
+			if index >= 0:
+				recorder.record("cur_split_name", f"Split {index}\r\n", now + step * 0.5, now + step * 0.5 + 0.001)
+		recorder.close()
+
+	def tearDown(self):
+		self.directory.cleanup()
+
+	def replay(self, *args):
+		process = subprocess.run([sys.executable, REPLAY, self.recording, "--fast", "--notes", self.notes,
+								  "--settings", self.settings, *args],
+								 cwd=REPO_DIR, capture_output=True, text=True, timeout=60)
+		self.assertEqual(process.returncode, 0, process.stderr)
+		self.assertIn("Replayed 8 polls", process.stdout)
+
+	def test_fast(self):
+		self.replay()
+
+	@unittest.skipUnless(has_display(), "needs a display")
+	def test_fast_gui(self):
+		self.replay("--gui")
+
+
+if __name__ == "__main__":
+	unittest.main()
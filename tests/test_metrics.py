@@ -0,0 +1,38 @@
+"""Metrics registry, run with make test"""
+import threading
+import unittest
+
+import metrics
+
+
+class ThreadCellTest(unittest.TestCase):
+
+	def run_threads(self, target, count=20):
+		for _ in range(count):
+			thread = threading.Thread(target=target)
+			thread.start()
+			thread.join()
+
+	def test_exited_threads_are_retired(self):
+		counter = metrics.Counter("test_counter", "Test counter")
+		histogram = metrics.Histogram("test_histogram", "Test histogram", (0.1, 1.0))
+		counter.inc()
+		histogram.observe(0.5)
+
+		def update():
+			counter.inc(2)
+			histogram.observe(0.05)
+
+		self.run_threads(update)
+
+		self.assertEqual(counter.value(), 41)
+		self.assertEqual(histogram.snapshot()[2], 21)
+		self.assertEqual(histogram.snapshot()[0], [20, 1, 0])
+		# The main thread's cell stays, those of the exited threads are folded
+		self.assertEqual(len(counter._cells), 1)
+		self.assertEqual(len(histogram._cells), 1)
+		self.assertEqual(len(counter._all_cells()), 2)
+
+
+if __name__ == "__main__":
+	unittest.main()
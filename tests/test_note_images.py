@@ -0,0 +1,65 @@
+"""Image cache of the notes, run with make test"""
+import unittest
+from unittest import mock
+
+import note_images
+
+
+class FakeRoot:
+	"""Runs idle callbacks when told to, like the Tk main loop"""
+
+	def __init__(self):
+		self.idle = []
+
+	def after_idle(self, function, *args):
+		self.idle.append((function, args))
+
+	def run_idle(self):
+		while self.idle:
+			function, args = self.idle.pop(0)
+			function(*args)
+
+
+class ScaleFactorsTest(unittest.TestCase):
+
+	def test_fitting_images_are_not_scaled(self):
+		self.assertEqual(note_images.scale_factors(400, 400), (1, 1))
+
+	def test_image_just_too_wide_keeps_most_of_its_size(self):
+		zoom, subsample = note_images.scale_factors(470, 464)
+		width = -(-470 // subsample) * zoom
+		self.assertLessEqual(width, 464)
+		self.assertGreater(width, 400)
+
+	def test_scaled_images_fit(self):
+		for image_width in range(101, 2000, 7):
+			zoom, subsample = note_images.scale_factors(image_width, 100)
+			width = -(-image_width // subsample) * zoom
+			self.assertLessEqual(width, 100)
+			self.assertGreater(width, 75, image_width)
+
+
+class ClearTest(unittest.TestCase):
+
+	def test_images_of_replaced_notes_are_ignored(self):
+		root = FakeRoot()
+		cache = note_images.ImageCache(root, lambda: "/notes")
+
+		with mock.patch.object(note_images, "read_image", return_value=None):
+			cache.prefetch("old.png", 100)
+			cache.clear()
+			self.assertFalse(cache.pending)
+
+			# The worker finishes the old request after the reload
+			cache.requests.put(None)
+			cache.thread.join(5)
+			cache.thread = None
+			root.run_idle()
+
+		# A failed read of the old notes does not mark the image failed for the new ones
+		self.assertFalse(cache.failed)
+		self.assertFalse(cache.images)
+
+
+if __name__ == "__main__":
+	unittest.main()
@@ -0,0 +1,90 @@
+"""Render slots of the notes, run with make test"""
+import unittest
+
+import note_markup
+import note_slots
+
+
+class FakeText:
+	"""Text box keeping the inserted strings"""
+
+	def __init__(self):
+		self.text = ""
+		self.renders = 0
+
+	def insert(self, index, text, tags=()):
+		if index == "end":
+			self.renders += 1
+			self.text += text
+		else:
+			offset = int(index.split("+")[1].split()[0])
+			self.text = self.text[:offset] + text + self.text[offset:]
+
+	def delete(self, start, end):
+		self.text = ""
+
+	def config(self, **options):
+		pass
+
+	def tag_add(self, *args):
+		pass
+
+	def tag_configure(self, *args, **options):
+		pass
+
+
+class FakeFrame:
+
+	def place(self, **options):
+		pass
+
+	def place_forget(self):
+		pass
+
+
+class FakeWindow:
+
+	def winfo_width(self):
+		return 400
+
+	def winfo_height(self):
+		return 300
+
+
+def create_slot():
+	return FakeFrame(), FakeText()
+
+
+class PlaceholderTest(unittest.TestCase):
+
+	def setUp(self):
+		self.slots = note_slots.NoteSlots(FakeWindow(), [create_slot()], create_slot)
+		self.slots.place(2)
+		self.notes = [note_markup.compile_note(note) for note in ("Go {{split_name}}", "plain", "Next {{timer}}")]
+
+	def texts(self):
+		return [text.text for text in self.slots.texts()[:self.slots.count]]
+
+	def test_values_update_without_split_change(self):
+		self.slots.show(self.notes, 0, {"split_name": ""})
+		self.assertEqual(self.texts(), ["Go ", "plain"])
+
+		# Timer started on the first split, the index stays 0
+		self.assertTrue(self.slots.show(self.notes, 0, {"split_name": "Castle"}))
+		self.assertEqual(self.texts(), ["Go Castle", "plain"])
+
+	def test_plain_notes_are_not_rendered_again(self):
+		self.slots.show(self.notes, 0, {"split_name": "Castle"})
+		renders = [text.renders for text in self.slots.texts()]
+		self.assertTrue(self.slots.show(self.notes, 0, {"split_name": "Castle"}))
+		self.assertEqual([text.renders for text in self.slots.texts()], [renders[0] + 1, renders[1]])
+
+		# Moving on renders the recycled slot and the ones with values
+		self.slots.show(self.notes, 1, {"timer": "1:02"})
+		self.assertEqual(self.texts(), ["plain", "Next 1:02"])
+		self.assertTrue(self.slots.show(self.notes, 1, {"timer": "1:03"}))
+		self.assertEqual(self.texts(), ["plain", "Next 1:03"])
+
+
+if __name__ == "__main__":
+	unittest.main()
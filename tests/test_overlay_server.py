@@ -0,0 +1,73 @@
+"""Overlay HTTP server, run with make test"""
+import socket
+import time
+import unittest
+
+import overlay_server
+
+
+class OverlayServerTest(unittest.TestCase):
+
+	def setUp(self):
+		self.server = overlay_server.OverlayServer(port=0)
+		self.assertTrue(self.server.start())
+		self.port = self.server.server_socket.getsockname()[1]
+
+	def tearDown(self):
+		self.server.stop()
+
+	def connect(self):
+		client = socket.create_connection(("localhost", self.port))
+		client.settimeout(5)
+		self.addCleanup(client.close)
+		return client
+
+	def read_until(self, client, text, received=b""):
+		"""Reads until text was received, returns everything received"""
+		while text not in received:
+			data = client.recv(65536)
+			self.assertTrue(data, "connection closed before %r" % text)
+			received += data
+		return received
+
+	def test_events_are_pushed_only_on_change(self):
+		self.server.publish({'currentSplit': 0, 'note': "first"})
+		client = self.connect()
+		client.sendall(b"GET /events HTTP/1.1\r\nHost: localhost\r\n\r\n")
+		received = self.read_until(client, b"first")
+
+		self.server.publish({'currentSplit': 0, 'note': "first"})
+		# Time to push an event, a second one would arrive before the next state
+		time.sleep(0.1)
+		self.server.publish({'currentSplit': 1, 'note': "second"})
+		received = self.read_until(client, b"second", received)
+
+		self.assertEqual(received.count(b"event: state"), 2)
+
+	def test_requests_share_a_keep_alive_connection(self):
+		self.server.publish({'currentSplit': 0, 'note': "first"})
+		client = self.connect()
+
+		client.sendall(b"GET /notes HTTP/1.1\r\nHost: localhost\r\n\r\n")
+		received = self.read_until(client, b"first</div>")
+		client.sendall(b"GET /state HTTP/1.1\r\nHost: localhost\r\n\r\n")
+		received = self.read_until(client, b'"currentSplit": 0', received)
+
+		self.assertEqual(received.count(b"HTTP/1.1 200 OK"), 2)
+		self.assertEqual(received.count(b"Connection: keep-alive"), 2)
+
+	def test_http_10_connection_is_closed(self):
+		client = self.connect()
+		client.sendall(b"GET /notes HTTP/1.0\r\n\r\n")
+		received = self.read_until(client, b"Connection: close")
+
+		while True:
+			data = client.recv(65536)
+			if not data:
+				break
+			received += data
+		self.assertTrue(received.startswith(b"HTTP/1.1 200 OK"))
+
+
+if __name__ == "__main__":
+	unittest.main()
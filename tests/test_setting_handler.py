@@ -0,0 +1,135 @@
+"""Settings file writes, run with make test"""
+import os
+import tempfile
+import time
+import unittest
+from unittest import mock
+
+import config
+import setting_handler
+
+
+class SettingsFileTest(unittest.TestCase):
+
+	def setUp(self):
+		self.directory = tempfile.TemporaryDirectory()
+		self.settings_path = os.path.join(self.directory.name, "config.cfg")
+		patches = [
+			mock.patch.object(setting_handler, "settings_path", self.settings_path),
+			mock.patch.object(setting_handler, "backup_path", self.settings_path + ".bak")
+		]
+		for patch in patches:
+			patch.start()
+			self.addCleanup(patch.stop)
+
+	def tearDown(self):
+		self.directory.cleanup()
+
+	def read(self, path):
+		with open(path, encoding="utf-8") as settings_file:
+			return settings_file.read()
+
+	def test_previous_content_is_backed_up(self):
+		self.assertTrue(setting_handler.set_settings_file_content("first"))
+		self.assertTrue(setting_handler.set_settings_file_content("second"))
+		self.assertEqual(self.read(self.settings_path), "second")
+		self.assertEqual(self.read(self.settings_path + ".bak"), "first")
+
+	def test_settings_file_exists_while_writing(self):
+		setting_handler.set_settings_file_content("first")
+
+		# A crash before the final rename leaves the old file in place
+		replace = os.replace
+
+		def crash(source, target):
+			if target == self.settings_path:
+				raise OSError("crash")
+			replace(source, target)
+
+		with mock.patch.object(os, "replace", crash):
+			self.assertFalse(setting_handler.set_settings_file_content("second"))
+		self.assertEqual(self.read(self.settings_path), "first")
+
+	def test_recovery_keeps_old_format_backup(self):
+		with open(self.settings_path, "w", encoding="utf-8") as settings_file:
+			settings_file.write("\x00\x00garbage")
+		old_format = "notes=\ndouble_layout=True\nfont=arial\nfont_size=12\n"
+		with open(self.settings_path + ".bak", "w", encoding="utf-8") as backup_file:
+			backup_file.write(old_format)
+
+		settings = setting_handler.read_settings_file()
+		self.assertEqual(settings["double_layout"], "true")
+
+		# The backup still holds good settings, the damaged file did not replace it
+		self.assertEqual(self.read(self.settings_path + ".bak"), old_format)
+		recovered = setting_handler.format_settings(self.read(self.settings_path).split("\n"))
+		self.assertEqual(recovered["double_layout"], "true")
+
+
+class SettingsStoreTest(unittest.TestCase):
+
+	def setUp(self):
+		self.directory = tempfile.TemporaryDirectory()
+		self.addCleanup(self.directory.cleanup)
+		self.settings_path = os.path.join(self.directory.name, "config.cfg")
+		patches = [
+			mock.patch.object(setting_handler, "settings_path", self.settings_path),
+			mock.patch.object(setting_handler, "backup_path", self.settings_path + ".bak"),
+			mock.patch.object(config, "SETTINGS_FLUSH_DELAY", 0.05),
+			mock.patch.object(config, "SETTINGS_FLUSH_MAX_DELAY", 0.2)
+		]
+		for patch in patches:
+			patch.start()
+			self.addCleanup(patch.stop)
+
+		self.store = setting_handler.SettingsStore(self.settings_path)
+		self.settings = self.store.get()  # Creates the default settings file
+		self.addCleanup(self.store.flush)
+
+		writer = mock.patch.object(setting_handler, "set_settings_file_content",
+								   wraps=setting_handler.set_settings_file_content)
+		self.writes = writer.start()
+		self.addCleanup(writer.stop)
+
+	def update(self, font_size):
+		self.store.update(dict(self.settings, font_size=str(font_size)))
+
+	def written(self):
+		with open(self.settings_path, encoding="utf-8") as settings_file:
+			return setting_handler.format_settings(settings_file.read().split("\n"))
+
+	def test_burst_of_updates_is_written_once(self):
+		for font_size in range(10, 20):
+			self.update(font_size)
+		self.assertEqual(self.writes.call_count, 0)
+
+		time.sleep(0.3)
+		self.assertEqual(self.writes.call_count, 1)
+		self.assertEqual(self.written()["font_size"], "19")
+
+	def test_continuous_updates_are_written_after_the_max_delay(self):
+		end = time.monotonic() + 0.5
+		font_size = 10
+		while time.monotonic() < end:
+			font_size += 1
+			self.update(font_size)
+			time.sleep(0.01)
+
+		# The debounce restarts with every update, the max delay still forces writes
+		self.assertGreaterEqual(self.writes.call_count, 1)
+
+	def test_flush_writes_pending_changes_right_away(self):
+		with mock.patch.object(config, "SETTINGS_FLUSH_DELAY", 60):
+			self.update(20)
+		self.store.flush()
+		self.assertEqual(self.writes.call_count, 1)
+		self.assertEqual(self.written()["font_size"], "20")
+
+		# Unchanged settings are not written again
+		self.update(20)
+		self.store.flush()
+		self.assertEqual(self.writes.call_count, 1)
+
+
+if __name__ == "__main__":
+	unittest.main()
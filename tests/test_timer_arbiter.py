@@ -0,0 +1,54 @@
+"""Timer arbitration, run with make test"""
+import unittest
+from unittest import mock
+
+import ls_connection as con
+import ls_poller
+import timer_arbiter
+
+
+class PreviewTest(unittest.TestCase):
+
+	def setUp(self):
+		self.runtime_info = {"active_split": -1, "timer_running": False}
+		self.arbiter = timer_arbiter.TimerArbiter(self.runtime_info)
+
+	def poll(self, index):
+		"""Polls LiveSplit answering the split index request with index"""
+		with mock.patch.object(con, "get_split_index", return_value=index):
+			return ls_poller.poll_timer_source(self.arbiter, "livesplit", None)
+
+	def test_preview_survives_polls(self):
+		self.poll(-1)
+
+		# Arrow keys while the timer is stopped
+		self.runtime_info["active_split"] = 2
+		for _ in range(3):
+			self.assertFalse(self.poll(-1))
+		self.assertEqual(self.runtime_info["active_split"], 2)
+
+	def test_timer_start_replaces_preview(self):
+		self.poll(-1)
+		self.runtime_info["active_split"] = 2
+
+		self.assertTrue(self.poll(0))
+		self.assertEqual(self.runtime_info["active_split"], 0)
+		self.assertTrue(self.runtime_info["timer_running"])
+
+		self.assertTrue(self.poll(-1))
+		self.assertEqual(self.runtime_info["active_split"], -1)
+		self.assertFalse(self.runtime_info["timer_running"])
+
+	def test_source_changes_are_applied(self):
+		self.arbiter.report("livesplit", "livesplit", 4, True, now=10.0)
+		self.assertTrue(self.arbiter.resolve(now=10.0))
+		self.assertEqual(self.runtime_info["active_split"], 4)
+
+		# Unchanged source state does not overwrite the runtime info again
+		self.runtime_info["active_split"] = 7
+		self.assertFalse(self.arbiter.resolve(now=10.1))
+		self.assertEqual(self.runtime_info["active_split"], 7)
+
+
+if __name__ == "__main__":
+	unittest.main()
@@ -0,0 +1,71 @@
+"""WebSocket handshake, run with make test"""
+import struct
+import unittest
+import zlib
+
+import websocket_protocol as ws
+
+
+def offer(extensions):
+	return {"sec-websocket-extensions": extensions}
+
+
+class NegotiateDeflateTest(unittest.TestCase):
+
+	def test_plain_offer(self):
+		self.assertEqual(ws.negotiate_deflate(offer("permessage-deflate; client_max_window_bits")), 15)
+
+	def test_window_bits_are_kept(self):
+		self.assertEqual(ws.negotiate_deflate(offer("permessage-deflate; server_max_window_bits=10")), 10)
+
+	def test_window_bits_8_are_declined(self):
+		self.assertIsNone(ws.negotiate_deflate(offer("permessage-deflate; server_max_window_bits=8")))
+
+	def test_next_offer_is_used(self):
+		headers = offer("permessage-deflate; server_max_window_bits=8, permessage-deflate; server_max_window_bits=12")
+		self.assertEqual(ws.negotiate_deflate(headers), 12)
+
+	def test_invalid_values_are_declined(self):
+		for value in ("16", "x", ""):
+			headers = offer("permessage-deflate; server_max_window_bits=" + value)
+			self.assertIsNone(ws.negotiate_deflate(headers), value)
+
+	def test_response_answers_with_offered_bits(self):
+		headers = offer("permessage-deflate; server_max_window_bits=10")
+		headers.update({
+			"upgrade": "websocket",
+			"sec-websocket-version": "13",
+			"sec-websocket-key": "dGhlIHNhbXBsZSBub25jZQ=="
+		})
+		response = ws.handshake_response(headers, ws.negotiate_deflate(headers)).decode("ascii")
+		self.assertIn("server_max_window_bits=10\r\n", response)
+
+
+def client_frame(first, payload):
+	"""Returns a masked client frame with given first byte (FIN, RSV and opcode)"""
+	mask = b"\x01\x02\x03\x04"
+	return struct.pack("!BB", first, 0x80 | len(payload)) + mask + ws.unmask(payload, mask)
+
+
+class FrameReaderTest(unittest.TestCase):
+
+	def compressed(self, text):
+		compressor = zlib.compressobj(zlib.Z_DEFAULT_COMPRESSION, zlib.DEFLATED, -15)
+		return (compressor.compress(text) + compressor.flush(zlib.Z_SYNC_FLUSH))[:-len(ws.DEFLATE_TAIL)]
+
+	def test_fragmented_compressed_message(self):
+		payload = self.compressed(b"hello")
+		reader = ws.FrameReader(deflate=True)
+		events = reader.feed(client_frame(0x40 | ws.TEXT, payload[:3]) + client_frame(0x80, payload[3:]))
+		self.assertEqual(events, [(ws.TEXT, "hello")])
+
+	def test_rsv1_on_continuation_fails(self):
+		payload = self.compressed(b"hello")
+		reader = ws.FrameReader(deflate=True)
+		with self.assertRaises(ws.WebSocketError) as error:
+			reader.feed(client_frame(0x40 | ws.TEXT, payload[:3]) + client_frame(0xC0, payload[3:]))
+		self.assertEqual(error.exception.code, ws.CLOSE_PROTOCOL_ERROR)
+
+
+if __name__ == "__main__":
+	unittest.main()
@@ -0,0 +1,164 @@
+"""
+Arbitration between timer sources.
+
+Every source (LiveSplit desktop, each bridge client) reports its own timer
+state with timestamps. resolve() picks one source and copies its state to
+"active_split" and "timer_running" of the runtime info. The choice only
+depends on the reported state, so conflicting updates always resolve the
+same way:
+	1. only healthy sources count, connected and heard from within their timeout
+	2. higher priority wins (config.TIMER_SOURCES)
+	3. a running timer wins over a stopped one
+	4. the source that was selected stays selected
+	5. the most recent state change wins, then the lower name
+"""
+import logging
+import threading
+import time
+
+import config
+
+log = logging.getLogger(__name__)
+
+
+class TimerSource:
+	"""Timer state reported by one source"""
+
+	def __init__(self, name, kind):
+		self.name = name
+		self.kind = kind
+		self.priority, self.timeout = config.TIMER_SOURCES[kind]
+		# Same keys as the runtime info, so ls_poller can update it directly
+		self.state = {"active_split": -1, "timer_running": False}
+		self.split_name = ""
+		self.connected = True
+		self.changed = 0.0  # When the state last changed (time.monotonic())
+		self.last_seen = 0.0  # When the source was last heard from
+
+	def healthy(self, now):
+		"""Returns whether the source is connected and reported recently"""
+		return self.connected and now - self.last_seen < self.timeout
+
+
+class TimerArbiter:
+	"""Timer sources of the application, safe to use from any thread"""
+
+	def __init__(self, runtime_info):
+		self.runtime_info = runtime_info
+		self.sources = {}
+		self.lock = threading.Lock()
+		self.selected = None
+		self.applied = None  # (source name, active split, timer running) last copied to the runtime info
+		runtime_info["timer_source"] = None
+
+	def source(self, name, kind):
+		"""Returns the source with given name, creating it if needed"""
+		with self.lock:
+			source = self.sources.get(name)
+			if source is None:
+				source = self.sources[name] = TimerSource(name, kind)
+			return source
+
+	def report(self, name, kind, active_split, timer_running, split_name=None, now=None):
+		"""Records the timer state of a source"""
+		now = time.monotonic() if now is None else now
+		source = self.source(name, kind)
+
+		with self.lock:
+			state = source.state
+			if state["active_split"] != active_split or state["timer_running"] != timer_running:
+				state["active_split"] = active_split
+				state["timer_running"] = timer_running
+				source.changed = now
+			if split_name is not None:
+				source.split_name = split_name
+			source.connected = True
+			source.last_seen = now
+
+	def touch(self, name, changed=False, now=None):
+		"""
+		Records that a source is alive without a new state,
+		changed tells that its state dictionary was updated in place.
+		"""
+		now = time.monotonic() if now is None else now
+		with self.lock:
+			source = self.sources.get(name)
+			if source:
+				source.connected = True
+				source.last_seen = now
+				if changed:
+					source.changed = now
+
+	def disconnect(self, name):
+		"""Marks a source as disconnected, it keeps its place in the status"""
+		with self.lock:
+			source = self.sources.get(name)
+			if source:
+				source.connected = False
+
+	def remove(self, name):
+		"""Forgets a source"""
+		with self.lock:
+			self.sources.pop(name, None)
+
+	def resolve(self, now=None):
+		"""
+		Selects the source to display and copies its state to the runtime info.
+		Returns whether the selected source or the displayed state changed.
+		The state is only copied when the selected source or its state changed,
+		and the split is left as it is while no timer runs, so a preview chosen
+		with the arrow keys survives polling. Without any healthy source the
+		displayed state is left as it is.
+		"""
+		now = time.monotonic() if now is None else now
+
+		with self.lock:
+			healthy = [source for source in self.sources.values() if source.healthy(now)]
+			best = min(healthy, key=lambda source: (
+				-source.priority,
+				not source.state["timer_running"],
+				source.name != self.selected,
+				-source.changed,
+				source.name
+			), default=None)
+
+			name = best.name if best else None
+			changed = name != self.selected
+			if changed:
+				log.info("Timer source changed from %s to %s", self.selected, name)
+				self.selected = name
+				self.runtime_info["timer_source"] = name
+
+			applied = best and (best.name, best.state["active_split"], best.state["timer_running"])
+			if best and (changed or applied != self.applied):
+				self.applied = applied
+				# A stopped timer only replaces the displayed split when it just stopped
+				if best.state["timer_running"] or self.runtime_info["timer_running"]:
+					for key in ("active_split", "timer_running"):
+						if self.runtime_info[key] != best.state[key]:
+							self.runtime_info[key] = best.state[key]
+							changed = True
+
+			return changed
+
+	def current(self):
+		"""Returns the selected source, or None"""
+		with self.lock:
+			return self.sources.get(self.selected)
+
+	def get_status(self, now=None):
+		"""Returns the state of all sources, the selected one first"""
+		now = time.monotonic() if now is None else now
+		with self.lock:
+			status = [{
+				'name': source.name,
+				'kind': source.kind,
+				'priority': source.priority,
+				'healthy': source.healthy(now),
+				'selected': source.name == self.selected,
+				'currentSplit': source.state["active_split"],
+				'timerRunning': source.state["timer_running"],
+				'age': now - source.last_seen
+			} for source in self.sources.values()]
+
+		return sorted(status, key=lambda source: (not source['selected'], -source['priority'], source['name']))
@@ -0,0 +1,298 @@
+"""
+Minimal RFC 6455 WebSocket support for the bridge server, standard library only.
+Browser overlays connect with "ws://localhost:<bridge port>/" on the same
+port as raw TCP clients, the server tells them apart by the HTTP upgrade request.
+
+Supports masking, fragmented messages, ping/pong and the
+permessage-deflate extension (RFC 7692) for large payloads.
+"""
+import base64
+import hashlib
+import struct
+import zlib
+
+WEBSOCKET_GUID = "258EAFA5-E914-47DA-95CA-C5AB0DC85B11"
+
+# Opcodes
+CONTINUATION = 0x0
+TEXT = 0x1
+BINARY = 0x2
+CLOSE = 0x8
+PING = 0x9
+PONG = 0xA
+
+# Close codes
+CLOSE_NORMAL = 1000
+CLOSE_PROTOCOL_ERROR = 1002
+CLOSE_INVALID_DATA = 1007
+CLOSE_TOO_BIG = 1009
+
+DEFLATE_TAIL = b"\x00\x00\xff\xff"
+
+
+class WebSocketError(Exception):
+	"""Raised when a client breaks the protocol, carries the close code to send"""
+
+	def __init__(self, message, code=CLOSE_PROTOCOL_ERROR):
+		super().__init__(message)
+		self.code = code
+
+
+def is_upgrade_request(buffer):
+	"""Returns whether given start of a connection looks like an HTTP request"""
+	return buffer[:4] == b"GET "
+
+
+def parse_request(head):
+	"""
+	Parses an HTTP request head (without the final empty line).
+	Returns the request path and a dictionary with lowercase header names.
+	"""
+	lines = head.decode("iso-8859-1").split("\r\n")
+	parts = lines[0].split(" ")
+	if len(parts) != 3:
+		raise WebSocketError("Malformed request line")
+
+	headers = {}
+	for line in lines[1:]:
+		if ":" in line:
+			name, value = line.split(":", 1)
+			headers[name.strip().lower()] = value.strip()
+
+	return parts[1], headers
+
+
+def accept_key(key):
+	"""Returns the Sec-WebSocket-Accept value for given client key"""
+	digest = hashlib.sha1((key + WEBSOCKET_GUID).encode("ascii")).digest()
+	return base64.b64encode(digest).decode("ascii")
+
+
+def negotiate_deflate(headers):
+	"""
+	Returns the window bits to compress with for the first permessage-deflate
+	offer of the client that can be accepted as it is, otherwise None.
+	Offers asking for a server window we can't use are declined (RFC 7692 7.1.2.2),
+	zlib does not support a raw deflate window of 8 bits.
+	"""
+	for offer in headers.get("sec-websocket-extensions", "").split(","):
+		params = [param.strip() for param in offer.split(";")]
+		if params[0] != "permessage-deflate":
+			continue
+
+		window_bits = 15
+		for param in params[1:]:
+			name, _, value = param.partition("=")
+			if name.strip() != "server_max_window_bits":
+				continue
+			try:
+				window_bits = int(value.strip().strip('"'))
+			except ValueError:
+				window_bits = None
+			break
+
+		if window_bits is not None and 9 <= window_bits <= 15:
+			return window_bits
+
+	return None
+
+
+def handshake_response(headers, deflate_bits=None):
+	"""
+	Returns the HTTP response completing the handshake.
+	Raises WebSocketError if the request is not a valid upgrade.
+	"""
+	if "websocket" not in headers.get("upgrade", "").lower():
+		raise WebSocketError("Not a WebSocket upgrade request")
+	if headers.get("sec-websocket-version") != "13":
+		raise WebSocketError("Unsupported WebSocket version")
+	if "sec-websocket-key" not in headers:
+		raise WebSocketError("Missing Sec-WebSocket-Key")
+
+	response = (
+		"HTTP/1.1 101 Switching Protocols\r\n"
+		"Upgrade: websocket\r\n"
+		"Connection: Upgrade\r\n"
+		f"Sec-WebSocket-Accept: {accept_key(headers['sec-websocket-key'])}\r\n"
+	)
+
+	if deflate_bits is not None:
+		# Every message is compressed on its own, so one compressed
+		# payload could be sent to many clients
+		extension = "permessage-deflate; server_no_context_takeover"
+		if deflate_bits != 15:
+			extension += f"; server_max_window_bits={deflate_bits}"
+		response += f"Sec-WebSocket-Extensions: {extension}\r\n"
+
+	return (response + "\r\n").encode("ascii")
+
+
+def reject_response(status="400 Bad Request"):
+	"""Returns an HTTP response for requests that are not accepted"""
+	return (f"HTTP/1.1 {status}\r\nContent-Length: 0\r\nConnection: close\r\n\r\n").encode("ascii")
+
+
+def encode_frame(opcode, payload, deflate_bits=None, compress_threshold=None):
+	"""
+	Returns a single unmasked (server to client) frame.
+	Data messages at least compress_threshold bytes long are
+	compressed if deflate_bits is given.
+	"""
+	first = 0x80 | opcode
+
+	if (deflate_bits is not None and compress_threshold is not None and
+			opcode in (TEXT, BINARY) and len(payload) >= compress_threshold):
+		compressor = zlib.compressobj(zlib.Z_DEFAULT_COMPRESSION, zlib.DEFLATED, -deflate_bits)
+		compressed = compressor.compress(payload) + compressor.flush(zlib.Z_SYNC_FLUSH)
+		if compressed.endswith(DEFLATE_TAIL):
+			compressed = compressed[:-len(DEFLATE_TAIL)]
+		payload = compressed
+		first |= 0x40  # RSV1 marks a compressed message
+
+	length = len(payload)
+	if length < 126:
+		header = struct.pack("!BB", first, length)
+	elif length < 65536:
+		header = struct.pack("!BBH", first, 126, length)
+	else:
+		header = struct.pack("!BBQ", first, 127, length)
+
+	return header + payload
+
+
+def encode_close(code=CLOSE_NORMAL, reason=""):
+	"""Returns a close frame"""
+	return encode_frame(CLOSE, struct.pack("!H", code) + reason.encode("utf-8")[:120])
+
+
+def unmask(payload, mask):
+	"""Returns given payload with the client mask removed"""
+	if not payload:
+		return b""
+	# XOR the whole payload at once as big integers
+	repeated = (mask * (len(payload) // 4 + 1))[:len(payload)]
+	return (int.from_bytes(payload, "big") ^ int.from_bytes(repeated, "big")).to_bytes(len(payload), "big")
+
+
+class FrameReader:
+	"""
+	Incremental decoder for client frames.
+	Reassembles fragmented messages and decompresses permessage-deflate messages.
+	"""
+
+	def __init__(self, deflate=False, max_message_size=1 << 20):
+		self.buffer = b""
+		self.deflate = deflate
+		self.decompressor = zlib.decompressobj(-15) if deflate else None
+		self.max_message_size = max_message_size
+		self.fragments = []
+		self.fragments_size = 0
+		self.message_opcode = None
+		self.message_compressed = False
+
+	def feed(self, data):
+		"""
+		Adds received bytes and returns a list of (opcode, payload) for all complete
+		messages and control frames. Text payloads are returned as str.
+		Raises WebSocketError on protocol errors.
+		"""
+		self.buffer += data
+		events = []
+
+		while True:
+			frame = self._next_frame()
+			if frame is None:
+				return events
+
+			fin, rsv1, opcode, payload = frame
+
+			if opcode >= CLOSE:
+				if not fin or len(payload) > 125:
+					raise WebSocketError("Invalid control frame")
+				events.append((opcode, payload))
+				continue
+
+			if opcode == CONTINUATION:
+				if self.message_opcode is None:
+					raise WebSocketError("Unexpected continuation frame")
+				if rsv1:
+					# Only the first frame of a message tells that it is compressed (RFC 7692 6.1)
+					raise WebSocketError("Compressed continuation frame")
+			else:
+				if self.message_opcode is not None:
+					raise WebSocketError("Expected continuation frame")
+				if opcode not in (TEXT, BINARY):
+					raise WebSocketError(f"Unknown opcode {opcode}")
+				if rsv1 and not self.deflate:
+					raise WebSocketError("Compressed frame without permessage-deflate")
+				self.message_opcode = opcode
+				self.message_compressed = rsv1
+
+			self.fragments.append(payload)
+			self.fragments_size += len(payload)
+			if self.fragments_size > self.max_message_size:
+				raise WebSocketError("Message too big", CLOSE_TOO_BIG)
+
+			if fin:
+				events.append(self._finish_message())
+
+	def _finish_message(self):
+		"""Returns the reassembled message and resets fragment state"""
+		payload = b"".join(self.fragments)
+		opcode = self.message_opcode
+
+		if self.message_compressed:
+			payload = self.decompressor.decompress(payload + DEFLATE_TAIL, self.max_message_size + 1)
+			if len(payload) > self.max_message_size:
+				raise WebSocketError("Message too big", CLOSE_TOO_BIG)
+
+		self.fragments = []
+		self.fragments_size = 0
+		self.message_opcode = None
+		self.message_compressed = False
+
+		if opcode == TEXT:
+			try:
+				return TEXT, payload.decode("utf-8")
+			except UnicodeDecodeError:
+				raise WebSocketError("Invalid UTF-8 in text message", CLOSE_INVALID_DATA)
+
+		return opcode, payload
+
+	def _next_frame(self):
+		"""Removes and returns the next complete frame from the buffer, or None"""
+		buffer = self.buffer
+		if len(buffer) < 2:
+			return None
+
+		first, second = buffer[0], buffer[1]
+		if first & 0x30:
+			raise WebSocketError("Reserved bits set")
+		if not second & 0x80:
+			raise WebSocketError("Client frames must be masked")
+
+		length = second & 0x7F
+		offset = 2
+		if length == 126:
+			if len(buffer) < 4:
+				return None
+			length = struct.unpack_from("!H", buffer, 2)[0]
+			offset = 4
+		elif length == 127:
+			if len(buffer) < 10:
+				return None
+			length = struct.unpack_from("!Q", buffer, 2)[0]
+			offset = 10
+
+		if length > self.max_message_size:
+			raise WebSocketError("Frame too big", CLOSE_TOO_BIG)
+
+		end = offset + 4 + length
+		if len(buffer) < end:
+			return None
+
+		mask = buffer[offset:offset + 4]
+		payload = unmask(buffer[offset + 4:end], mask)
+		self.buffer = buffer[end:]
+
+		return bool(first & 0x80), bool(first & 0x40), first & 0x0F, payload